@@ -0,0 +1,246 @@
+"""
+Module:
+Assets.py
+
+Author:
+Mark Nauman
+
+Description:
+Process wide cache of the images, fonts and text the game draws.  An
+image file is only loaded and scaled once for each size it is drawn at,
+and every tile of that type shares the same surface.  Faded copies (for
+the inactive tiles) are cached the same way, so nothing changes a shared
+surface.
+
+Fonts are looked up once for each (face, size, bold, italic) and the
+text drawn with them is kept in a least recently used cache, so drawing
+the same text again is a dictionary lookup.  The counters record the
+cache hits and misses.
+
+The surfaces are converted to the display format, so the display has to
+be set up before the first image is loaded.  Call clear() if the display
+or the font module is set up again.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import collections
+import pygame
+
+################################################################################
+# Variables
+################################################################################
+
+# Loaded images {(file name, size, alpha): surface}
+images = {}
+
+# Loaded fonts {(face, size, bold, italic): font}
+fonts = {}
+
+# Rendered text {(text, color, font): surface}, least recently used first,
+# and the most text surfaces to keep
+texts = collections.OrderedDict()
+text_limit = 256
+
+# Cache hits and misses
+counters = {"font hits": 0, "font misses": 0,
+            "text hits": 0, "text misses": 0}
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_image(file_name, size, alpha=255):
+    """
+    Function Name:
+    get_image
+
+    Description:
+    Get an image scaled to a size.  The surface is shared, so do not
+    draw on it or change its alpha.
+
+    Inputs:
+    file_name - image file
+    size - image size tuple (width, height) in pixels
+    alpha - surface alpha, 0 (transparent) to 255 (opaque)
+
+    Outputs:
+    Surface
+    """
+
+    key = (file_name, tuple(size), alpha)
+    image = images.get(key)
+    if image is None:
+
+        # Faded images are a copy of the opaque one
+        if alpha != 255:
+            image = get_image(file_name, size).copy()
+            image.set_alpha(alpha)
+
+        else:
+            image = pygame.image.load(file_name).convert()
+            image = pygame.transform.scale(image, key[1])
+
+        images[key] = image
+
+    return image
+
+
+def get_font(font):
+    """
+    Function Name:
+    get_font
+
+    Description:
+    Get a system font
+
+    Inputs:
+    font - font tuple (face, size, bold, italic)
+
+    Outputs:
+    Font
+    """
+
+    loaded = fonts.get(font)
+    if loaded is None:
+        counters["font misses"] += 1
+        loaded = pygame.font.SysFont(*font)
+        fonts[font] = loaded
+    else:
+        counters["font hits"] += 1
+
+    return loaded
+
+
+def render_text(text, color, font):
+    """
+    Function Name:
+    render_text
+
+    Description:
+    Get a surface with antialiased text drawn on it.  The surface is
+    shared, so do not draw on it.
+
+    Inputs:
+    text - text to draw
+    color - text color tuple (red, green, blue)
+    font - font tuple (face, size, bold, italic)
+
+    Outputs:
+    Surface
+    """
+
+    key = (text, color, font)
+    surface = texts.pop(key, None)
+    if surface is None:
+        counters["text misses"] += 1
+        surface = get_font(font).render(text, True, color)
+
+        # Make room by dropping the least recently used text
+        if len(texts) >= text_limit:
+            texts.popitem(last=False)
+    else:
+        counters["text hits"] += 1
+
+    # Put it back as the most recently used
+    texts[key] = surface
+
+    return surface
+
+
+def get_counters():
+    """
+    Function Name:
+    get_counters
+
+    Description:
+    Get the cache hits and misses
+
+    Inputs:
+    None
+
+    Outputs:
+    Dictionary of {counter name: count}
+    """
+
+    return dict(counters)
+
+
+def reset_counters():
+    """
+    Function Name:
+    reset_counters
+
+    Description:
+    Set the cache hits and misses back to zero
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    for name in counters.keys():
+        counters[name] = 0
+
+
+def get_memory():
+    """
+    Function Name:
+    get_memory
+
+    Description:
+    Get the memory used by the cached image pixels
+
+    Inputs:
+    None
+
+    Outputs:
+    Memory used in bytes
+    """
+
+    total = 0
+    for image in images.values():
+        total += image.get_pitch() * image.get_height()
+
+    return total
+
+
+def clear():
+    """
+    Function Name:
+    clear
+
+    Description:
+    Forget all of the cached images, fonts and text
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    images.clear()
+    fonts.clear()
+    texts.clear()
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
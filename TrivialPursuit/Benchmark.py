@@ -0,0 +1,72 @@
+"""
+Module:
+Benchmark.py
+
+Author:
+Mark Nauman
+
+Description:
+Runs the performance benchmarks for the game.  Each benchmark prints
+a small table of timings.  Run all of them with "python Benchmark.py" or
+pick some by name with "python Benchmark.py reachability ...".  The
+benchmarks are kept with the subsystem they measure:
+
+    BenchmarkEngine     the headless engine
+    BenchmarkQuestions  the question decks and stores
+    BenchmarkDisplay    drawing the game and handling the clicks
+    BenchmarkServer     the game server and its sessions
+    BenchmarkPlayers    the computer players
+    BenchmarkStorage    the event logs and the saved games
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import sys
+import BenchmarkEngine
+import BenchmarkQuestions
+import BenchmarkDisplay
+import BenchmarkServer
+import BenchmarkPlayers
+import BenchmarkStorage
+
+################################################################################
+# Variables
+################################################################################
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {}
+for module in (BenchmarkEngine,
+               BenchmarkQuestions,
+               BenchmarkDisplay,
+               BenchmarkServer,
+               BenchmarkPlayers,
+               BenchmarkStorage):
+    benchmarks.update(module.benchmarks)
+
+################################################################################
+# Classes
+################################################################################
+
+# None
+
+################################################################################
+# Functions
+################################################################################
+
+# None
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    # Run the selected benchmarks or all of them
+    names = sys.argv[1:] or sorted(benchmarks.keys())
+    for name in names:
+        print "== %s" % name
+        benchmarks[name]()
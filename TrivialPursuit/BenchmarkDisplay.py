@@ -0,0 +1,753 @@
+"""
+Module:
+BenchmarkDisplay.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of drawing the game: loading the images and
+fonts, drawing the frames, the idle main loop, the clicks, the dialogs
+and the timed draw calls.  Run them with "python Benchmark.py", which
+picks them by name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import multiprocessing
+import os
+import resource
+import time
+import random
+import pygame
+import Assets
+import Dice
+import Engine
+import GameBoard
+import Player
+import Scheduler
+import Tiles
+import Timings
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def initialize_board(layout, screen_size, cached):
+    """
+    Function Name:
+    initialize_board
+
+    Description:
+    Create and size the tiles for a board the way GameBoard does
+
+    Inputs:
+    layout - board spaces
+    screen_size - screen size tuple (width, height) in pixels
+    cached - True to use the shared images, False to load an image for
+             every tile the way the tiles used to
+
+    Outputs:
+    (game board tiles, memory used by the tile images)
+    """
+
+    board = Tiles.create_board(layout)
+    tile_width = screen_size[0] / len(board[0])
+    tile_height = screen_size[1] / len(board)
+    images = {}
+
+    for row in range(len(board)):
+        for col in range(len(board[row])):
+            tile = board[row][col]
+            if tile is None:
+                continue
+
+            position = (col * tile_width, row * tile_height)
+            if cached:
+                tile.initialize((tile_width, tile_height), position)
+            else:
+                tile.size = (tile_width, tile_height)
+                tile.position = position
+                tile.image = pygame.image.load(tile.image_file).convert()
+                tile.image = pygame.transform.scale(tile.image, tile.size)
+
+            # Count each surface once
+            for image in (tile.image, tile.inactive_image):
+                if image is not None:
+                    images[id(image)] = image.get_pitch() * image.get_height()
+
+    return (board, sum(images.values()))
+
+def benchmark_assets():
+    """
+    Function Name:
+    benchmark_assets
+
+    Description:
+    Compare loading an image for every tile with sharing the images
+    between the tiles
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen_size = (630, 630)
+    pygame.display.set_mode(screen_size)
+
+    print "%-6s %-6s %-7s %10s %10s" % ("board", "tiles", "images", "time",
+                                        "memory")
+    try:
+        for size in (9, 17, 33):
+            layout = Engine.LAYOUT
+            if size != len(layout):
+                layout = Engine.generate_layout(size)
+            tiles = sum([len([space for space in row if space is not None])
+                         for row in layout])
+
+            for cached in (False, True):
+                Assets.clear()
+                start = time.time()
+                (board, memory) = initialize_board(layout, screen_size, cached)
+                elapsed = time.time() - start
+                print "%-6s %-6d %-7s %9.4fs %9.1fK" % \
+                    ("%dx%d" % (size, size), tiles,
+                     ["loaded", "shared"][cached], elapsed, memory / 1024.0)
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def benchmark_fonts():
+    """
+    Function Name:
+    benchmark_fonts
+
+    Description:
+    Time redrawing the player pieces, the dice and the player text with
+    the fonts and text looked up every time (the caches emptied before
+    every frame) and with them cached
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((630, 630))
+    frames = 200
+
+    size = (70, 70)
+    players = [Player.Player(number, (0, 0), "Player #%d" % number)
+               for number in range(1, 5)]
+    dice = Dice.Dice((420, 420), (210, 210))
+    dice.roll = 4
+    font = ("Arial", 25, False, False)
+
+    print "%-9s %10s %10s %10s %10s %10s" % ("fonts", "per frame",
+                                             "font hits", "misses",
+                                             "text hits", "misses")
+    try:
+        for cached in (False, True):
+            Assets.clear()
+            Assets.reset_counters()
+            start = time.time()
+            for frame in range(frames):
+                if not cached:
+                    Assets.clear()
+                for player in players:
+                    player.draw(screen, (0, 0), size)
+                dice.draw(screen)
+                Assets.render_text(players[0].get_name(), (255, 255, 255),
+                                   font)
+                Assets.render_text("Player Piece #1", (255, 255, 255), font)
+            elapsed = time.time() - start
+
+            counters = Assets.get_counters()
+            print "%-9s %9.3fms %10d %10d %10d %10d" % \
+                (["lookup", "cached"][cached], elapsed / frames * 1000,
+                 counters["font hits"], counters["font misses"],
+                 counters["text hits"], counters["text misses"])
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def benchmark_sprites():
+    """
+    Function Name:
+    benchmark_sprites
+
+    Description:
+    Time drawing the player pieces by drawing each piece every frame,
+    from the cached sprites and from a pre-built atlas
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((630, 630))
+    frames = 1000
+
+    size = (70, 70)
+    length = Player.get_length(size)
+    players = [Player.Player(number, (0, 0), "Player #%d" % number)
+               for number in range(1, 5)]
+    for (player, category) in zip(players, Engine.CATEGORIES):
+        player.add_wedge(category)
+
+    print "%-9s %10s %10s" % ("pieces", "setup", "per frame")
+    try:
+        for name in ("drawn", "sprite", "atlas"):
+            Player.Player.atlas.clear()
+            Player.atlases.clear()
+            for player in players:
+                player.sprite = None
+
+            start = time.time()
+            if name == "atlas":
+                Player.build_atlas(length)
+            setup = time.time() - start
+
+            start = time.time()
+            for frame in range(frames):
+                for player in players:
+                    if name == "drawn":
+                        surface = Player.render_piece(player.player_number,
+                                                      player.get_wedges(),
+                                                      length)
+                        screen.blit(surface, (0, 0))
+                    else:
+                        player.draw(screen, (0, 0), size)
+            elapsed = time.time() - start
+            print "%-9s %9.3fms %9.3fms" % (name, setup * 1000,
+                                            elapsed / frames * 1000)
+    finally:
+        Player.Player.atlas.clear()
+        Player.atlases.clear()
+        Assets.clear()
+        pygame.display.quit()
+
+def play_frame(game_board, kind, rng):
+    """
+    Function Name:
+    play_frame
+
+    Description:
+    Change the board the way one frame of the game does, without the
+    question dialogs
+
+    Inputs:
+    game_board - GameBoard object
+    kind - "idle" (nothing happens), "roll" (the dice is rolled) or
+           "move" (a piece moves and the question is answered)
+    rng - random number generator
+
+    Outputs:
+    None
+    """
+
+    game = game_board.game
+
+    # The move frames need a rolled dice and the roll frames need it reset
+    if (kind == "move") and (game.get_state() == Engine.ROLL):
+        play_frame(game_board, "roll", rng)
+        game_board.draw()
+        game_board.get_dirty_rects()
+    elif (kind == "roll") and (game.get_state() != Engine.ROLL):
+        play_frame(game_board, "move", rng)
+        game_board.draw()
+        game_board.get_dirty_rects()
+
+    if kind == "roll":
+        game.roll(game_board.dice.throw())
+        game_board.update_tiles(game.get_player().get_location(),
+                                game_board.dice.get_roll())
+
+    elif kind == "move":
+        game.move(rng.choice(game.get_choices()))
+        if game.get_state() == Engine.CATEGORY:
+            game.choose_category(rng.choice(Engine.CATEGORIES))
+        # Never answer the winning question so the game goes on
+        if game.get_state() == Engine.ANSWER:
+            game.answer((rng.random() < 0.5) and
+                        not game.get_player().can_win())
+        game_board.reset()
+
+def benchmark_frames():
+    """
+    Function Name:
+    benchmark_frames
+
+    Description:
+    Compare the cost of a frame when the whole board is drawn and flipped
+    with drawing and updating only the parts that changed.  Covers frames
+    where nothing happens and frames where the dice is rolled or a piece
+    moves.
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((630, 630))
+    frames = 500
+
+    # Set up a four player board without asking for the names
+    game_board = GameBoard.GameBoard(screen, 4, "questions.csv",
+                                     ["Ann", "Bob", "Cyd", "Dee"])
+    screen_area = screen.get_width() * screen.get_height()
+
+    print "%-6s %-6s %10s %10s" % ("frame", "draw", "per frame", "pixels")
+    try:
+        for kind in ("idle", "roll", "move"):
+            for dirty in (False, True):
+                rng = random.Random(0)
+                pixels = 0
+                elapsed = 0.0
+                for frame in range(frames):
+                    start = time.time()
+                    if kind != "idle":
+                        play_frame(game_board, kind, rng)
+                    if dirty:
+                        game_board.draw()
+                        rects = game_board.get_dirty_rects()
+                        if len(rects) > 0:
+                            pygame.display.update(rects)
+                        pixels += sum([rect.width * rect.height
+                                       for rect in rects])
+                    else:
+                        game_board.redraw()
+                        game_board.get_dirty_rects()
+                        pygame.display.flip()
+                        pixels += screen_area
+                    elapsed += time.time() - start
+
+                print "%-6s %-6s %9.3fms %10d" % \
+                    (kind, ["full", "dirty"][dirty], elapsed / frames * 1000,
+                     pixels / frames)
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def measure_idle(mode, seconds):
+    """
+    Function Name:
+    measure_idle
+
+    Description:
+    Run a main loop with nothing happening and measure the CPU it uses.
+    Run in a fresh process so pygame starts clean.
+
+    Inputs:
+    mode - "polling" (the old 10 frames a second loop), "event" (the
+           Scheduler), "sdl wait" (the Scheduler always waiting in
+           pygame.event.wait) or "animation" (the Scheduler with a 30
+           frames a second timer running)
+    seconds - how long to run
+
+    Outputs:
+    (CPU seconds used, number of times the loop woke up)
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((630, 630))
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    pygame.event.get()
+
+    wakeups = 0
+    times = resource.getrusage(resource.RUSAGE_SELF)
+    try:
+        if mode == "polling":
+            clock = pygame.time.Clock()
+            end = pygame.time.get_ticks() + seconds * 1000
+            while pygame.time.get_ticks() < end:
+                wakeups += 1
+                pygame.event.get()
+                pygame.display.flip()
+                clock.tick(10)
+
+        else:
+            blocking = None
+            if mode == "sdl wait":
+                blocking = True
+            scheduler = Scheduler.Scheduler(blocking)
+            stop = []
+            scheduler.call_later(seconds * 1000, lambda: stop.append(True))
+            if mode == "animation":
+                scheduler.call_every(1000 / 30, lambda: None)
+            while len(stop) == 0:
+                wakeups += 1
+                scheduler.wait()
+    finally:
+        pygame.quit()
+
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    return (used.ru_utime - times.ru_utime + used.ru_stime - times.ru_stime,
+            wakeups)
+
+def benchmark_idle():
+    """
+    Function Name:
+    benchmark_idle
+
+    Description:
+    Compare the CPU used by an idle game with the polling main loop and
+    the event driven one
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    seconds = 5
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+    print "%-10s %10s %10s %10s" % ("loop", "cpu", "cpu %", "wakeups/s")
+    try:
+        for mode in ("polling", "event", "sdl wait", "animation"):
+            (used, wakeups) = pool.apply(measure_idle, (mode, seconds))
+            print "%-10s %9.3fs %9.2f%% %10.1f" % \
+                (mode, used, used / seconds * 100, float(wakeups) / seconds)
+    finally:
+        pool.close()
+        pool.join()
+
+def scan_tiles(board, pos):
+    """
+    Function Name:
+    scan_tiles
+
+    Description:
+    Find the clicked tile by checking every tile, the way GameBoard used
+    to, kept as the reference the grid lookup is measured against
+
+    Inputs:
+    board - game board tiles
+    pos - clicked coordinate tuple (x, y) in pixels
+
+    Outputs:
+    Board location tuple (row, col), or None
+    """
+
+    for row in range(len(board)):
+        for col in range(len(board[row])):
+            if (board[row][col] is not None) and board[row][col].clicked(pos):
+                return (row, col)
+
+    return None
+
+def benchmark_clicks():
+    """
+    Function Name:
+    benchmark_clicks
+
+    Description:
+    Compare finding the clicked tile by checking every tile with working
+    it out from the grid, and deactivating every tile with deactivating
+    only the active ones, as the board grows
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen_size = (630, 630)
+    pygame.display.set_mode(screen_size)
+    rng = random.Random(0)
+    clicks = 1000
+
+    print "%-8s %-6s %12s %12s %12s %12s" % ("board", "tiles", "scan",
+                                             "grid", "reset all",
+                                             "reset active")
+    try:
+        for size in (9, 33, 65, 129):
+            layout = Engine.LAYOUT
+            if size != len(layout):
+                layout = Engine.generate_layout(size)
+            (board, memory) = initialize_board(layout, screen_size, True)
+            tile_size = board[0][0].get_size()
+            game_board = Engine.Board(layout)
+
+            # Activate the tiles for a roll from a random space, then click
+            # one of them
+            locations = [(row, col) for row in range(size)
+                         for col in range(size) if layout[row][col]]
+            turns = []
+            for number in range(clicks):
+                location = rng.choice(locations)
+                active = game_board.get_reachable(location, rng.randint(1, 6))
+                if len(active) > 0:
+                    (row, col) = rng.choice(active)
+                    rect = board[row][col].rect
+                    turns.append((active, rect.center))
+
+            times = {"scan": 0.0, "grid": 0.0, "reset all": 0.0,
+                     "reset active": 0.0}
+            for (active, pos) in turns:
+                for (row, col) in active:
+                    board[row][col].activate()
+
+                start = time.time()
+                scan_tiles(board, pos)
+                times["scan"] += time.time() - start
+
+                start = time.time()
+                (row, col) = Tiles.find_tile(board, tile_size, pos)
+                board[row][col].clicked(pos)
+                times["grid"] += time.time() - start
+
+                start = time.time()
+                for row in range(len(board)):
+                    for col in range(len(board[row])):
+                        if board[row][col] is not None:
+                            board[row][col].deactivate()
+                times["reset all"] += time.time() - start
+
+                for (row, col) in active:
+                    board[row][col].activate()
+                start = time.time()
+                for (row, col) in set(active):
+                    board[row][col].deactivate()
+                times["reset active"] += time.time() - start
+
+            print "%-8s %-6d %10.2fus %10.2fus %10.2fus %10.2fus" % \
+                ("%dx%d" % (size, size), len(locations),
+                 times["scan"] / len(turns) * 1e6,
+                 times["grid"] / len(turns) * 1e6,
+                 times["reset all"] / len(turns) * 1e6,
+                 times["reset active"] / len(turns) * 1e6)
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def click(game_board, pos):
+    """
+    Function Name:
+    click
+
+    Description:
+    Click the game board the way the main loop does and show what changed
+    on the display
+
+    Inputs:
+    game_board - GameBoard object
+    pos - clicked coordinate tuple (x, y) in pixels
+
+    Outputs:
+    None
+    """
+
+    event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)
+    if not game_board.handle_event(event):
+        game_board.execute(True, pos)
+    else:
+        game_board.execute(False)
+
+    rects = game_board.get_dirty_rects()
+    if len(rects) > 0:
+        pygame.display.update(rects)
+    game_board.dialogs.shown()
+
+def benchmark_dialogs():
+    """
+    Function Name:
+    benchmark_dialogs
+
+    Description:
+    Measure the time from a click to the dialog it opens being on the
+    display, for the category pickers, the questions and the answers
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((630, 630))
+    rng = random.Random(0)
+    turns = 2000
+
+    # Set up a four player board without asking for the names
+    game_board = GameBoard.GameBoard(screen, 4, "questions.csv",
+                                     ["Ann", "Bob", "Cyd", "Dee"])
+    game = game_board.game
+    dialogs = game_board.dialogs
+    times = {"category": [], "question": [], "answer": []}
+
+    try:
+        for turn in range(turns):
+
+            # Roll the dice and pick a tile
+            click(game_board, game_board.dice.rect.center)
+            (row, col) = rng.choice(game.get_choices())
+            click(game_board, game_board.board[row][col].rect.center)
+
+            # Answer the dialogs it opened
+            while dialogs.is_open():
+                dialog = dialogs.get_dialog()
+                if dialog.title == "Category?":
+                    kind = "category"
+                elif dialog.buttons == ["OK"]:
+                    kind = "answer"
+                else:
+                    kind = "question"
+                times[kind].append(dialogs.get_latencies()[-1])
+
+                rect = rng.choice(dialog.button_rects)
+                click(game_board, rect.center)
+
+            # Stop when somebody wins
+            if game.get_winner() is not None:
+                break
+
+        print "%-10s %8s %10s %10s %10s" % ("dialog", "count", "median",
+                                             "p99", "max")
+        for kind in ("category", "question", "answer"):
+            values = sorted(times[kind])
+            if len(values) == 0:
+                continue
+            print "%-10s %8d %8.2fms %8.2fms %8.2fms" % \
+                (kind, len(values), values[len(values) / 2] * 1000,
+                 values[int(len(values) * 0.99)] * 1000, values[-1] * 1000)
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def benchmark_timings():
+    """
+    Function Name:
+    benchmark_timings
+
+    Description:
+    Measure what timing a call adds to it, and time drawing the board
+    with the draw calls timed
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # A call that does nothing, plain and timed
+    def nothing(value):
+        return value
+    timed = Timings.wrap("benchmark", nothing)
+    count = 200000
+    print "%-10s %10s" % ("", "per call")
+    for (name, function) in (("plain", nothing), ("timed", timed)):
+        start = time.time()
+        for number in xrange(count):
+            function(number)
+        print "%-10s %8.3fus" % (name, (time.time() - start) * 1e6 / count)
+
+    # Draw whole boards with the tile and piece draws timed
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+    try:
+        game_board = GameBoard.GameBoard(pygame.Surface((630, 630)), 4,
+                                         names=["A", "B", "C", "D"])
+        saved = (Tiles.Tile.draw, Player.Player.draw)
+        Tiles.Tile.draw = Timings.wrap("Tile.draw", Tiles.Tile.draw.im_func)
+        Player.Player.draw = Timings.wrap("Player.draw",
+                                          Player.Player.draw.im_func)
+        try:
+            for number in range(200):
+                game_board.redraw()
+                game_board.get_dirty_rects()
+        finally:
+            (Tiles.Tile.draw, Player.Player.draw) = saved
+
+        histograms = Timings.get_histograms()
+        print "%-12s %8s %9s %9s %9s" % ("", "calls", "p50", "p99", "max")
+        for name in ("Tile.draw", "Player.draw"):
+            histogram = histograms[name]
+            print "%-12s %8d %7.3fms %7.3fms %7.3fms" % \
+                (name, histogram["count"], histogram["p50_ms"],
+                 histogram["p99_ms"], histogram["max_ms"])
+    finally:
+        Timings.reset()
+        Assets.clear()
+        pygame.display.quit()
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "assets": benchmark_assets,
+    "fonts": benchmark_fonts,
+    "sprites": benchmark_sprites,
+    "frames": benchmark_frames,
+    "idle": benchmark_idle,
+    "clicks": benchmark_clicks,
+    "dialogs": benchmark_dialogs,
+    "timings": benchmark_timings
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
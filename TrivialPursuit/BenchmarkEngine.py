@@ -0,0 +1,277 @@
+"""
+Module:
+BenchmarkEngine.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of the headless game engine: finding the
+reachable tiles, playing whole games and playing them in lockstep with
+NumPy.  Run them with "python Benchmark.py", which picks them by name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import time
+import random
+import Dice
+import Engine
+import GameBoard
+import Simulator
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def recursive_reachable(board, (row, col), x, y, moves, found):
+    """
+    Function Name:
+    recursive_reachable
+
+    Description:
+    The original recursive GameBoard.update_tiles walk, kept as the
+    reference the reachability table is measured against
+
+    Inputs:
+    board - game board tiles
+    (row, col) - current board position
+    x - current direction in the x-axis
+    y - current direction in the y-axis
+    moves - remaining moves
+    found - set the reachable (row, col) positions are added to
+
+    Outputs:
+    None
+    """
+
+    row = row + x
+    col = col + y
+
+    if ((row < 0) or (col < 0) or
+            (row >= len(board)) or (col >= len(board[row]))):
+        return
+
+    if board[row][col] is None:
+        return
+
+    if moves == 0:
+        found.add((row, col))
+        return
+
+    moves -= 1
+
+    if (x == 0) and (y == 0):
+        recursive_reachable(board, (row, col), -1, 0, moves, found)
+        recursive_reachable(board, (row, col), 1, 0, moves, found)
+        recursive_reachable(board, (row, col), 0, -1, moves, found)
+        recursive_reachable(board, (row, col), 0, 1, moves, found)
+
+    elif x != 0:
+        recursive_reachable(board, (row, col), x, 0, moves, found)
+        recursive_reachable(board, (row, col), 0, -1, moves, found)
+        recursive_reachable(board, (row, col), 0, 1, moves, found)
+
+    elif y != 0:
+        recursive_reachable(board, (row, col), 0, y, moves, found)
+        recursive_reachable(board, (row, col), -1, 0, moves, found)
+        recursive_reachable(board, (row, col), 1, 0, moves, found)
+
+def benchmark_reachability():
+    """
+    Function Name:
+    benchmark_reachability
+
+    Description:
+    Compare the recursive walk with the precomputed reachability table
+    for every tile and every roll on the stock board and larger boards
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    boards = [("stock 9x9", Engine.LAYOUT)]
+    for size in (17, 33, 65):
+        boards.append(("generated %dx%d" % (size, size), Engine.generate_layout(size)))
+
+    print "%-16s %8s %12s %12s %12s" % ("board", "lookups", "recursive",
+                                        "build", "lookup")
+
+    for (name, board) in boards:
+
+        # Every legal starting tile and every roll
+        keys = []
+        for row in range(len(board)):
+            for col in range(len(board[row])):
+                if board[row][col] is not None:
+                    for roll in range(1, Engine.Dice.sides + 1):
+                        keys.append((row, col, roll))
+
+        # Time the recursive walk
+        start = time.time()
+        expected = {}
+        for (row, col, roll) in keys:
+            found = set()
+            recursive_reachable(board, (row, col), 0, 0, roll, found)
+            expected[(row, col, roll)] = found
+        recursive_time = time.time() - start
+
+        # Time building the table once
+        start = time.time()
+        reachable = Engine.build_reachability(board, Engine.Dice.sides)
+        build_time = time.time() - start
+
+        # Time the lookups
+        start = time.time()
+        for key in keys:
+            reachable[key]
+        lookup_time = time.time() - start
+
+        # Both approaches must agree
+        for key in keys:
+            assert set(reachable[key]) == expected[key], key
+
+        print "%-16s %8d %11.4fs %11.4fs %11.6fs" % (name, len(keys),
+                                                     recursive_time,
+                                                     build_time, lookup_time)
+
+def benchmark_engine():
+    """
+    Function Name:
+    benchmark_engine
+
+    Description:
+    Play complete games with the headless engine, a step at a time and
+    with Game.play.  Players move to a random reachable tile, pick a
+    random hub category and answer half of the questions correctly.
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    rng = random.Random(0)
+    board = Engine.Board()
+
+    # The choices of the players
+    choose_move = lambda game: rng.choice(game.get_choices())
+    choose_category = lambda game: rng.choice(Engine.CATEGORIES)
+    answer = lambda game: rng.random() < 0.5
+
+    print "%-8s %-6s %8s %10s %12s %10s" % ("players", "mode", "games",
+                                            "time", "games/sec", "rolls")
+
+    for num_players in (2, 3, 4):
+        for mode in ("steps", "play"):
+
+            games = 1000
+            rolls = 0
+            start = time.time()
+            for game_number in range(games):
+
+                # Setup a new game
+                players = [Engine.Player(number + 1, board.get_hub())
+                           for number in range(num_players)]
+                game = Engine.Game(board, players, rng=rng)
+
+                # Play until somebody wins
+                if mode == "play":
+                    game.play(choose_move, choose_category, answer)
+                while game.get_state() != Engine.OVER:
+                    state = game.get_state()
+                    if state == Engine.ROLL:
+                        game.roll()
+                    elif state == Engine.MOVE:
+                        game.move(choose_move(game))
+                    elif state == Engine.CATEGORY:
+                        game.choose_category(choose_category(game))
+                    else:
+                        game.answer(answer(game))
+                rolls += game.turns
+
+            elapsed = time.time() - start
+            print "%-8d %-6s %8d %9.3fs %12.1f %10.1f" % \
+                (num_players, mode, games, elapsed, games / elapsed,
+                 float(rolls) / games)
+
+def benchmark_vector():
+    """
+    Function Name:
+    benchmark_vector
+
+    Description:
+    Compare playing one game at a time (Simulator) with playing all of
+    the games in lockstep with NumPy (VectorSimulator)
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Only need NumPy for this benchmark
+    import Simulator
+    import VectorSimulator
+
+    model = Simulator.ConstantModel(0.5)
+
+    print "%-16s %-10s %8s %10s %12s" % ("board", "mode", "games", "time",
+                                         "games/sec")
+
+    for (name, layout) in [("stock 9x9", Engine.LAYOUT),
+                           ("generated 17x17", Engine.generate_layout(17))]:
+
+        # One game at a time on a single process
+        games = 1000
+        start = time.time()
+        Simulator.play_batch((layout, 4, model, 0, games))
+        elapsed = time.time() - start
+        per_game = games / elapsed
+        print "%-16s %-10s %8d %9.3fs %12.1f" % (name, "per-game", games,
+                                                 elapsed, per_game)
+
+        # All of the games in lockstep
+        games = 100000
+        start = time.time()
+        VectorSimulator.simulate(layout, 4, model, games, 0)
+        elapsed = time.time() - start
+        print "%-16s %-10s %8d %9.3fs %12.1f (%.0fx)" % \
+            (name, "vectorized", games, elapsed, games / elapsed,
+             games / elapsed / per_game)
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "reachability": benchmark_reachability,
+    "engine": benchmark_engine,
+    "vector": benchmark_vector
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
@@ -0,0 +1,210 @@
+"""
+Module:
+BenchmarkPlayers.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of the computer players: the tree search and the
+solved plans.  Run them with "python Benchmark.py", which picks them by
+name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import os
+import shutil
+import tempfile
+import time
+import random
+import ComputerPlayer
+import Engine
+import GameState
+import Planner
+import Simulator
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def benchmark_mcts():
+    """
+    Function Name:
+    benchmark_mcts
+
+    Description:
+    Measure how many play outs a second the computer player's tree search
+    runs, in this process and on process pools
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Collect some moves from a game played at random
+    rng = random.Random(0)
+    board = Engine.Board()
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(4)]
+    game = Engine.Game(board, players, rng=rng)
+    states = []
+    while len(states) < 5:
+        if game.get_state() == Engine.ROLL:
+            game.roll()
+        elif game.get_state() == Engine.MOVE:
+            if len(game.get_choices()) > 1:
+                states.append(GameState.pack_state(game))
+            game.move(rng.choice(game.get_choices()))
+        elif game.get_state() == Engine.CATEGORY:
+            game.choose_category(rng.choice(Engine.CATEGORIES))
+        else:
+            game.answer(rng.random() < 0.5)
+
+    print "%-10s %10s %12s" % ("processes", "playouts", "playouts/s")
+    for processes in (1, 2, 4):
+        computer = ComputerPlayer.ComputerPlayer(board, len(players),
+                                                 budget=1.0,
+                                                 processes=processes,
+                                                 rng=random.Random(0))
+        try:
+            playouts = 0
+            elapsed = 0.0
+            for state in states:
+                computer.choose_move(state)
+                playouts += computer.get_stats()["playouts"]
+                elapsed += computer.get_stats()["seconds"]
+        finally:
+            computer.close()
+        print "%-10d %10d %12.0f" % (processes, playouts, playouts / elapsed)
+
+def play_solo(board, probabilities, plan, rng):
+    """
+    Function Name:
+    play_solo
+
+    Description:
+    Play a game alone, moving by a plan or by the Simulator heuristic
+
+    Inputs:
+    board - Engine.Board object
+    probabilities - dictionary of {category: chance of answering}
+    plan - Planner.Plan object, or None to move by the heuristic
+    rng - random number generator
+
+    Outputs:
+    Number of turns to win (a turn lasts until a question is answered
+    wrong or there is nowhere to move)
+    """
+
+    model = Simulator.CategoryModel(probabilities)
+    player = Engine.Player(1, board.get_hub())
+    game = Engine.Game(board, [player], rng=rng)
+    turns = 1
+    while game.get_state() != Engine.OVER:
+        if game.get_state() == Engine.ROLL:
+            game.roll()
+            if game.get_state() == Engine.ROLL:
+                turns += 1
+        elif game.get_state() == Engine.MOVE:
+            if plan is None:
+                game.move(Simulator.choose_move(game, model, rng))
+            else:
+                game.move(plan.get_move(player.get_location(),
+                                        player.get_wedges(),
+                                        game.dice.get_roll()))
+        elif game.get_state() == Engine.CATEGORY:
+            game.choose_category(Simulator.choose_category(game, model))
+        else:
+            correct = rng.random() < probabilities[game.get_category()]
+            if (game.answer(correct) is None) and not correct:
+                turns += 1
+
+    return turns
+
+def benchmark_plan():
+    """
+    Function Name:
+    benchmark_plan
+
+    Description:
+    Time solving, loading and looking up a move plan, and check the
+    expected turns it was solved for against games played by it
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    board = Engine.Board()
+    probabilities = {"People": 0.8, "Events": 0.3, "Places": 0.5,
+                     "Holidays": 0.6}
+    directory = tempfile.mkdtemp()
+    try:
+        file_name = os.path.join(directory, "benchmark.plan")
+        start = time.time()
+        (values, moves) = Planner.solve(board, probabilities)
+        solved = time.time() - start
+        Planner.write_plan(file_name, board, probabilities, values, moves)
+
+        start = time.time()
+        plan = Planner.Plan(file_name)
+        loaded = time.time() - start
+
+        count = 100000
+        start = time.time()
+        for number in range(count):
+            plan.get_move((4, 4), number % Planner.MASKS, number % 6 + 1)
+        looked_up = time.time() - start
+
+        print "solved in %.2fs, %d bytes, mapped in %.0fus, " \
+            "%.2fus a move" % (solved, os.path.getsize(file_name),
+                               loaded * 1e6, looked_up * 1e6 / count)
+
+        # Play alone by the plan and by the heuristic
+        games = 2000
+        rng = random.Random(0)
+        for (name, moves_by) in (("plan", plan), ("heuristic", None)):
+            turns = [play_solo(board, probabilities, moves_by, rng)
+                     for number in range(games)]
+            print "%-10s %6.2f turns to win (%d games)" % \
+                (name, float(sum(turns)) / games, games)
+        print "%-10s %6.2f turns to win" % \
+            ("expected", plan.get_expected(board.get_hub(), 0))
+        plan.close()
+    finally:
+        shutil.rmtree(directory)
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "mcts": benchmark_mcts,
+    "plan": benchmark_plan
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
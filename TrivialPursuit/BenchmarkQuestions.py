@@ -0,0 +1,562 @@
+"""
+Module:
+BenchmarkQuestions.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of the question decks: reading the question
+files, the packed and database question stores and drawing the cards.
+Run them with "python Benchmark.py", which picks them by name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import csv
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import random
+import Engine
+import QuestionDatabase
+import QuestionPack
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def write_questions(file_name, count):
+    """
+    Function Name:
+    write_questions
+
+    Description:
+    Write a question CSV file with made up questions spread evenly over
+    the categories
+
+    Inputs:
+    file_name - question file (CSV) to write
+    count - number of questions
+
+    Outputs:
+    None
+    """
+
+    output = csv.writer(open(file_name, "wb"))
+    output.writerow(["Category", "Question", "Correct Answer",
+                     "Incorrect Answer 1", "Incorrect Answer 2",
+                     "Incorrect Answer 3"])
+    for number in range(count):
+        category = Engine.CATEGORIES[number % len(Engine.CATEGORIES)]
+        output.writerow([category,
+                         "Made up %s question number %d?" % (category, number),
+                         "Right answer %d" % number,
+                         "Wrong answer %d" % (number * 3),
+                         "Wrong answer %d" % (number * 3 + 1),
+                         "Wrong answer %d" % (number * 3 + 2)])
+
+def get_memory():
+    """
+    Function Name:
+    get_memory
+
+    Description:
+    Get the memory used by this process (resident set size).  Falls back
+    to the peak resident set size where /proc is not available.
+
+    Inputs:
+    None
+
+    Outputs:
+    Memory used in bytes
+    """
+
+    try:
+        pages = int(open("/proc/self/statm").read().split()[1])
+        return pages * resource.getpagesize()
+    except IOError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def measure_deck(file_name):
+    """
+    Function Name:
+    measure_deck
+
+    Description:
+    Load a deck and draw a few questions from each category.  Run in a
+    fresh process so the memory measurement is not polluted.
+
+    Inputs:
+    file_name - question file
+
+    Outputs:
+    (time to load, time to draw, memory added by the deck)
+    """
+
+    memory = get_memory()
+
+    start = time.time()
+    deck = Engine.Deck(file_name, random.Random(0))
+    load_time = time.time() - start
+
+    start = time.time()
+    for category in Engine.CATEGORIES:
+        for number in range(25):
+            deck.draw(category)
+    draw_time = time.time() - start
+
+    return (load_time, draw_time, get_memory() - memory)
+
+def read_nested_questions(file_name):
+    """
+    Function Name:
+    read_nested_questions
+
+    Description:
+    The original question reader that keeps every card as nested lists,
+    kept as the reference the streaming reader is measured against
+
+    Inputs:
+    file_name - question file (CSV) with a header row
+
+    Outputs:
+    Dictionary of {category: [[question, [[answer, correct], ...]], ...]}
+    """
+
+    questions = {}
+    input_questions = csv.reader(open(file_name, "rb"))
+
+    first = True
+    for (category, question, correct, incorrect_1,
+         incorrect_2, incorrect_3) in input_questions:
+
+        if first is False:
+
+            if category not in questions:
+                questions[category] = []
+
+            questions[category].append([question,
+                                        [[correct, True],
+                                         [incorrect_1, False],
+                                         [incorrect_2, False],
+                                         [incorrect_3, False]]])
+
+        else:
+            first = False
+
+    return questions
+
+def measure_ingest(file_name, streamed):
+    """
+    Function Name:
+    measure_ingest
+
+    Description:
+    Read a question file.  Run in a fresh process so the memory
+    measurements are not polluted.
+
+    Inputs:
+    file_name - question file (CSV)
+    streamed - True for the streaming reader, False for nested lists
+
+    Outputs:
+    (time to read, peak memory added, memory kept by the questions)
+    """
+
+    memory = get_memory()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    if streamed:
+        questions = Engine.read_questions(file_name)
+    else:
+        questions = read_nested_questions(file_name)
+    elapsed = time.time() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak
+    return (elapsed, peak * 1024, get_memory() - memory)
+
+def benchmark_ingest():
+    """
+    Function Name:
+    benchmark_ingest
+
+    Description:
+    Compare reading questions into nested lists with streaming them into
+    the compact per category layout
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    directory = tempfile.mkdtemp()
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+    print "%-9s %-9s %10s %10s %10s" % ("questions", "reader", "time",
+                                        "peak", "kept")
+    try:
+        for count in (1000, 10000, 100000, 300000):
+
+            file_name = os.path.join(directory, "questions%d.csv" % count)
+            write_questions(file_name, count)
+
+            for (name, streamed) in [("nested", False), ("streamed", True)]:
+                (elapsed, peak, kept) = \
+                    pool.apply(measure_ingest, (file_name, streamed))
+                print "%-9d %-9s %9.4fs %9.1fM %9.1fM" % \
+                    (count, name, elapsed, peak / 1048576.0,
+                     kept / 1048576.0)
+    finally:
+        pool.close()
+        pool.join()
+        shutil.rmtree(directory)
+
+def benchmark_pack():
+    """
+    Function Name:
+    benchmark_pack
+
+    Description:
+    Compare loading questions from a CSV file with loading them from a
+    memory mapped question pack as the number of questions grows
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    directory = tempfile.mkdtemp()
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+    print "%-9s %-5s %10s %10s %10s %10s" % ("questions", "file", "size",
+                                             "load", "100 draws", "memory")
+    try:
+        for count in (1000, 10000, 100000, 300000):
+
+            csv_file = os.path.join(directory, "questions%d.csv" % count)
+            pack_file = os.path.join(directory, "questions%d.pack" % count)
+            write_questions(csv_file, count)
+            QuestionPack.compile_pack(csv_file, pack_file)
+
+            for (name, file_name) in [("csv", csv_file), ("pack", pack_file)]:
+                (load_time, draw_time, memory) = \
+                    pool.apply(measure_deck, (file_name,))
+                print "%-9d %-5s %9.1fM %9.4fs %9.4fs %9.1fM" % \
+                    (count, name, os.path.getsize(file_name) / 1048576.0,
+                     load_time, draw_time, memory / 1048576.0)
+    finally:
+        pool.close()
+        pool.join()
+        shutil.rmtree(directory)
+
+def draw_shared((file_name, count)):
+    """
+    Function Name:
+    draw_shared
+
+    Description:
+    Draw questions from a question database shared with other processes
+
+    Inputs:
+    file_name - question database file
+    count - number of questions to draw
+
+    Outputs:
+    List of the questions drawn
+    """
+
+    database = QuestionDatabase.Database(file_name)
+    try:
+        return [database.draw(Engine.CATEGORIES[0])[0] for number in
+                range(count)]
+    finally:
+        database.close()
+
+def benchmark_database():
+    """
+    Function Name:
+    benchmark_database
+
+    Description:
+    Time importing questions into a question database with different
+    batch sizes, compare loading and drawing from a database with a CSV
+    file and a question pack, and check processes sharing a database
+    never draw the same card twice in a pass
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    directory = tempfile.mkdtemp()
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+    try:
+        # Import with one transaction per question and with batches
+        csv_file = os.path.join(directory, "import.csv")
+        write_questions(csv_file, 20000)
+        print "%-9s %-10s %10s %12s" % ("questions", "batch", "time",
+                                        "questions/s")
+        for batch_size in (1, 100, QuestionDatabase.BATCH_SIZE):
+            database_file = os.path.join(directory, "import%d.db" % batch_size)
+            start = time.time()
+            count = QuestionDatabase.import_questions(csv_file, database_file,
+                                                      batch_size)
+            elapsed = time.time() - start
+            print "%-9d %-10d %9.3fs %12.0f" % (count, batch_size, elapsed,
+                                                count / elapsed)
+        print
+
+        # Load and draw
+        print "%-9s %-5s %10s %10s %10s %10s" % ("questions", "file", "size",
+                                                 "load", "100 draws",
+                                                 "memory")
+        for count in (1000, 10000, 100000, 300000):
+
+            csv_file = os.path.join(directory, "questions%d.csv" % count)
+            pack_file = os.path.join(directory, "questions%d.pack" % count)
+            database_file = os.path.join(directory, "questions%d.db" % count)
+            write_questions(csv_file, count)
+            QuestionPack.compile_pack(csv_file, pack_file)
+            QuestionDatabase.import_questions(csv_file, database_file)
+
+            for (name, file_name) in [("csv", csv_file), ("pack", pack_file),
+                                      ("db", database_file)]:
+                (load_time, draw_time, memory) = \
+                    pool.apply(measure_deck, (file_name,))
+                print "%-9d %-5s %9.1fM %9.4fs %9.4fs %9.1fM" % \
+                    (count, name, os.path.getsize(file_name) / 1048576.0,
+                     load_time, draw_time, memory / 1048576.0)
+        print
+
+        # Deal one pass of a category to several processes at once
+        database_file = os.path.join(directory, "shared.db")
+        QuestionDatabase.import_questions(
+            os.path.join(directory, "questions1000.csv"), database_file)
+        processes = 4
+        per_process = 1000 / len(Engine.CATEGORIES) / processes
+        shared = multiprocessing.Pool(processes)
+        try:
+            start = time.time()
+            drawn = shared.map(draw_shared,
+                               [(database_file, per_process)] * processes)
+            elapsed = time.time() - start
+        finally:
+            shared.close()
+            shared.join()
+        questions = sum(drawn, [])
+        print "%d processes drew %d questions in %.3fs, %d repeated" % \
+            (processes, len(questions), elapsed,
+             len(questions) - len(set(questions)))
+    finally:
+        pool.close()
+        pool.join()
+        shutil.rmtree(directory)
+
+def measure_lazy(file_name, lazy):
+    """
+    Function Name:
+    measure_lazy
+
+    Description:
+    Open a CSV deck, draw from one category the way the first turn does,
+    then draw from the rest of the categories.  The lazy deck reads the
+    rest of the categories in the background in between, the way
+    GameBoard does while the player picks a tile.
+
+    Inputs:
+    file_name - question file (CSV)
+    lazy - True to read the categories as they are drawn, False to read
+           them all up front
+
+    Outputs:
+    (time to open, time to the first question, time for the rest)
+    """
+
+    start = time.time()
+    deck = Engine.Deck(file_name, random.Random(0))
+    if not lazy:
+        deck.questions.keys()
+    open_time = time.time() - start
+
+    start = time.time()
+    deck.draw(Engine.CATEGORIES[0])
+    first_time = time.time() - start
+
+    # The player picking a tile
+    deck.warm()
+    if deck.questions.warming is not None:
+        deck.questions.warming.join()
+
+    start = time.time()
+    for category in Engine.CATEGORIES[1:]:
+        deck.draw(category)
+    rest_time = time.time() - start
+
+    return (open_time, first_time, rest_time)
+
+def benchmark_lazy():
+    """
+    Function Name:
+    benchmark_lazy
+
+    Description:
+    Compare reading all of the categories of a CSV deck up front with
+    reading them as they are drawn and warming the rest in the background
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    directory = tempfile.mkdtemp()
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+    print "%-9s %-6s %10s %10s %10s" % ("questions", "deck", "open",
+                                        "first", "rest")
+    try:
+        for count in (1000, 10000, 100000, 300000):
+
+            file_name = os.path.join(directory, "questions%d.csv" % count)
+            write_questions(file_name, count)
+
+            for (name, lazy) in [("eager", False), ("lazy", True)]:
+                (open_time, first_time, rest_time) = \
+                    pool.apply(measure_lazy, (file_name, lazy))
+                print "%-9d %-6s %9.4fs %9.4fs %9.4fs" % \
+                    (count, name, open_time, first_time, rest_time)
+    finally:
+        pool.close()
+        pool.join()
+        shutil.rmtree(directory)
+
+def weighted_choice(weights, total, rng):
+    """
+    Function Name:
+    weighted_choice
+
+    Description:
+    Pick an item by weight by walking the weights, kept as the reference
+    the alias table is measured against
+
+    Inputs:
+    weights - weight of each item
+    total - sum of the weights
+    rng - random number generator
+
+    Outputs:
+    Item number
+    """
+
+    pick = rng.random() * total
+    for (item, weight) in enumerate(weights):
+        pick -= weight
+        if pick < 0:
+            return item
+    return len(weights) - 1
+
+def benchmark_cursor():
+    """
+    Function Name:
+    benchmark_cursor
+
+    Description:
+    Compare shuffling a whole category up front with the Cursor that
+    shuffles a card at a time, and picking by weight by walking the
+    weights with the alias table
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    rng = random.Random(0)
+    draws = 1000
+
+    print "%-9s %-10s %12s %12s" % ("cards", "deck", "first draw",
+                                     "per draw")
+    for count in (1000, 100000, 1000000):
+
+        # Shuffle a list of the card numbers, then walk through it
+        start = time.time()
+        order = range(count)
+        rng.shuffle(order)
+        first = time.time() - start
+        print "%-9d %-10s %11.6fs %11.6fs" % (count, "shuffle", first,
+                                               first / count)
+
+        start = time.time()
+        cursor = Engine.Cursor(count, rng)
+        cursor.next()
+        first = time.time() - start
+        start = time.time()
+        for number in range(draws):
+            cursor.next()
+        print "%-9d %-10s %11.6fs %11.6fs" % (count, "cursor", first,
+                                               (time.time() - start) / draws)
+
+        weights = [rng.randint(1, 5) for number in range(count)]
+        total = sum(weights)
+        start = time.time()
+        for number in range(draws):
+            weighted_choice(weights, total, rng)
+        print "%-9d %-10s %12s %11.6fs" % (count, "walk", "",
+                                           (time.time() - start) / draws)
+
+        start = time.time()
+        cursor = Engine.WeightedCursor(weights, rng)
+        cursor.next()
+        first = time.time() - start
+        start = time.time()
+        for number in range(draws):
+            cursor.next()
+        print "%-9d %-10s %11.6fs %11.6fs" % (count, "alias", first,
+                                               (time.time() - start) / draws)
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "ingest": benchmark_ingest,
+    "pack": benchmark_pack,
+    "database": benchmark_database,
+    "lazy": benchmark_lazy,
+    "cursor": benchmark_cursor
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
@@ -0,0 +1,286 @@
+"""
+Module:
+BenchmarkServer.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of the game server: the sessions it hosts and
+copying the game state.  Run them with "python Benchmark.py", which
+picks them by name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import copy
+import os
+import resource
+import time
+import random
+import pygame
+import Assets
+import Engine
+import GameState
+import LoadGenerator
+import Sessions
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def benchmark_server():
+    """
+    Function Name:
+    benchmark_server
+
+    Description:
+    Play more and more games at once on a game server on this computer
+    and measure the latency and how many games a core can host
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    (process, address) = LoadGenerator.start_server()
+    try:
+        for sessions in (100, 1000, 3000):
+            LoadGenerator.print_results(
+                LoadGenerator.run_load(address, sessions, seconds=5.0,
+                                       think=0.5, seed=0))
+    finally:
+        process.terminate()
+
+def check_session(game_board):
+    """
+    Function Name:
+    check_session
+
+    Description:
+    Check that the tiles of a game match its own turn, i.e., no other
+    game has changed them
+
+    Inputs:
+    game_board - GameBoard object
+
+    Outputs:
+    Number of tiles that do not match
+    """
+
+    # Only the tiles the active player can move to are active
+    game = game_board.game
+    choices = set()
+    if game.get_state() == Engine.MOVE:
+        choices = set(game.get_choices())
+    elif game.get_state() != Engine.ROLL:
+        choices = game_board.active_tiles
+
+    errors = 0
+    for row in range(len(game_board.board)):
+        for col in range(len(game_board.board[row])):
+            tile = game_board.board[row][col]
+            if (tile is not None) and (tile.active != ((row, col) in choices)):
+                errors += 1
+
+    return errors
+
+def benchmark_sessions():
+    """
+    Function Name:
+    benchmark_sessions
+
+    Description:
+    Stress test running thousands of games in one process at once.  The
+    games are played a click at a time in turn, then checked to make sure
+    no game changed another.
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(0)
+    count = 2000
+    rounds = 10
+
+    try:
+        # Start the games.  Every other game asks for the player names.
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.time()
+        sessions = Sessions.Sessions((315, 315))
+        players = {}
+        for number in range(count):
+            num_players = rng.randint(2, 4)
+            names = None
+            if number % 2 == 0:
+                names = ["Player %d" % (player + 1)
+                         for player in range(num_players)]
+            players[sessions.create(num_players, names)] = num_players
+        created = time.time() - start
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+
+        # Click each game in turn
+        clicks = 0
+        winners = 0
+        start = time.time()
+        for turn in range(rounds):
+            for number in sessions.keys():
+                game_board = sessions.get(number)
+                dialog = game_board.dialogs.get_dialog()
+                if dialog is not None:
+                    pos = rng.choice(dialog.button_rects).center
+                elif game_board.game.get_state() == Engine.ROLL:
+                    pos = game_board.dice.rect.center
+                else:
+                    (row, col) = rng.choice(game_board.game.get_choices())
+                    pos = game_board.board[row][col].rect.center
+
+                clicks += 1
+                # Replace a game somebody won with a new one
+                if sessions.click(number, pos) is not None:
+                    winners += 1
+                    sessions.remove(number)
+                    num_players = players.pop(number)
+                    players[sessions.create(num_players)] = num_players
+        elapsed = time.time() - start
+
+        # Make sure every game only has its own players and tiles
+        errors = 0
+        for number in sessions.keys():
+            game_board = sessions.get(number)
+            if len(game_board.players) != players[number]:
+                errors += 1
+            errors += check_session(game_board)
+
+        print "%d games started in %.2fs (%.0fKB each)" % \
+            (count, created, float(memory) / count)
+        print "%d clicks in %.2fs (%.0f clicks/s), %d games won" % \
+            (clicks, elapsed, clicks / elapsed, winners)
+        print "%d tiles or players changed by another game" % errors
+    finally:
+        Assets.clear()
+        pygame.display.quit()
+
+def benchmark_state():
+    """
+    Function Name:
+    benchmark_state
+
+    Description:
+    Compare copying, hashing and comparing game states packed in a
+    GameState with doing the same to the game objects
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Collect the states of a game played at random
+    rng = random.Random(0)
+    board = Engine.Board()
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(4)]
+    game = Engine.Game(board, players, rng=rng)
+    games = []
+    while (len(games) < 2000) and (game.get_winner() is None):
+        if game.get_state() == Engine.ROLL:
+            game.roll()
+        elif game.get_state() == Engine.MOVE:
+            game.move(rng.choice(game.get_choices()))
+        elif game.get_state() == Engine.CATEGORY:
+            game.choose_category(rng.choice(Engine.CATEGORIES))
+        else:
+            game.answer(rng.random() < 0.5)
+        games.append((game.get_state(), game.player, game.dice.get_roll(),
+                      game.get_category(),
+                      [(player.get_location(), dict(player.answered))
+                       for player in players]))
+    count = len(games)
+
+    # The game objects have to be deep copied and hashed field by field
+    start = time.time()
+    copies = [copy.deepcopy(state) for state in games]
+    copied = time.time() - start
+    start = time.time()
+    keys = set()
+    for (state, player, roll, category, pieces) in copies:
+        keys.add((state, player, roll, category,
+                  tuple((location, tuple(sorted(answered.items())))
+                        for (location, answered) in pieces)))
+    hashed = time.time() - start
+    start = time.time()
+    same = sum(1 for number in range(count) if copies[number] == games[number])
+    compared = time.time() - start
+    print "%-10s %10s %10s %10s %8s" % ("", "copy", "hash", "compare",
+                                        "unique")
+    print "%-10s %9.2fus %9.2fus %9.2fus %8d" % \
+        ("objects", copied * 1e6 / count, hashed * 1e6 / count,
+         compared * 1e6 / count, len(keys))
+
+    # Packed states are copied by reference and hash as an integer
+    states = []
+    for (state, player, roll, category, pieces) in games:
+        for (number, (location, answered)) in enumerate(pieces):
+            players[number].set_location(location)
+            players[number].answered = answered
+        game.dice.set_roll(roll)
+        game.set_turn(state, player, category)
+        states.append(GameState.pack_state(game))
+    start = time.time()
+    copies = [copy.deepcopy(state) for state in states]
+    copied = time.time() - start
+    start = time.time()
+    keys = set(GameState.GameState(state.value) for state in copies)
+    hashed = time.time() - start
+    start = time.time()
+    same = sum(1 for number in range(count) if copies[number] == states[number])
+    compared = time.time() - start
+    print "%-10s %9.2fus %9.2fus %9.2fus %8d" % \
+        ("GameState", copied * 1e6 / count, hashed * 1e6 / count,
+         compared * 1e6 / count, len(keys))
+    print "%d states, %d bytes each packed" % \
+        (count, len(states[-1].to_bytes()))
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "server": benchmark_server,
+    "sessions": benchmark_sessions,
+    "state": benchmark_state
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
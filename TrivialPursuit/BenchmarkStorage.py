@@ -0,0 +1,273 @@
+"""
+Module:
+BenchmarkStorage.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the benchmarks of storing games: replaying the event logs and
+saving, loading and carrying on the saved games.  Run them with
+"python Benchmark.py", which picks them by name.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import os
+import shutil
+import tempfile
+import time
+import random
+import pygame
+import Assets
+import Engine
+import GameBoard
+import GameLog
+import GameState
+import SaveGame
+import BenchmarkDisplay
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+def write_log(file_name, turns, interval, rng):
+    """
+    Function Name:
+    write_log
+
+    Description:
+    Play a game at random to a log, keeping the state at the end of
+    every turn to check the replay against
+
+    Inputs:
+    file_name - log file name
+    turns - number of dice rolls to play (fewer if somebody wins)
+    interval - dice rolls between snapshots
+    rng - random number generator
+
+    Outputs:
+    List of the GameState at the end of each turn
+    """
+
+    board = Engine.Board()
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(4)]
+    game = Engine.Game(board, players, rng=rng)
+    log = GameLog.Writer(file_name, board, interval)
+    log.attach(game)
+
+    states = []
+    while game.get_state() != Engine.OVER:
+        if game.get_state() == Engine.ROLL:
+            states.append(GameState.pack_state(game))
+            if game.turns == turns:
+                break
+            game.roll()
+        elif game.get_state() == Engine.MOVE:
+            game.move(rng.choice(game.get_choices()))
+        elif game.get_state() == Engine.CATEGORY:
+            game.choose_category(rng.choice(Engine.CATEGORIES))
+        else:
+            log.question(game.get_category(), "Question?", ["A", "B"], 0)
+            game.answer(rng.random() < 0.3)
+    if game.get_state() == Engine.OVER:
+        states.append(GameState.pack_state(game))
+    log.close()
+
+    return states
+
+def benchmark_replay():
+    """
+    Function Name:
+    benchmark_replay
+
+    Description:
+    Time reading a game log and finding the state of every turn in it,
+    with and without snapshots
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    directory = tempfile.mkdtemp()
+    try:
+        file_name = os.path.join(directory, "benchmark" + GameLog.EXTENSION)
+        print "%-10s %8s %8s %10s %10s %10s" % ("snapshots", "turns", "bytes",
+                                                "read", "last turn",
+                                                "any turn")
+
+        # No snapshots (other than the start) folds the whole game
+        for interval in (65535, GameLog.SNAPSHOT_INTERVAL):
+            states = write_log(file_name, 500, interval, random.Random(0))
+
+            start = time.time()
+            replay = GameLog.Replay(file_name)
+            read = time.time() - start
+
+            start = time.time()
+            last = replay.get_state()
+            elapsed = time.time() - start
+
+            start = time.time()
+            wrong = 0
+            for (turn, state) in enumerate(states):
+                if replay.get_state(turn) != state:
+                    wrong += 1
+            seeked = time.time() - start
+
+            if (wrong > 0) or (last != states[-1]):
+                print "%d replayed turns do not match the game" % wrong
+            print "%-10s %8d %8d %8.2fms %8.2fms %8.3fms" % \
+                ("every %d" % interval if interval < 65535 else "none",
+                 replay.get_turns(), os.path.getsize(file_name), read * 1e3,
+                 elapsed * 1e3, seeked * 1e3 / len(states))
+    finally:
+        shutil.rmtree(directory)
+
+def play_turn(game_board, rng):
+    """
+    Function Name:
+    play_turn
+
+    Description:
+    Click the game board until the turn is over, picking the tiles and
+    the dialog buttons at random
+
+    Inputs:
+    game_board - GameBoard object
+    rng - random.Random object picking the clicks
+
+    Outputs:
+    None
+    """
+
+    while game_board.get_winner() is None:
+        dialog = game_board.dialogs.get_dialog()
+        if dialog is not None:
+            pos = rng.choice(dialog.button_rects).center
+        elif game_board.game.get_state() == Engine.ROLL:
+            pos = game_board.dice.rect.center
+        else:
+            (row, col) = rng.choice(game_board.game.get_choices())
+            pos = game_board.board[row][col].rect.center
+        BenchmarkDisplay.click(game_board, pos)
+
+        if ((game_board.game.get_state() == Engine.ROLL) and
+                (not game_board.dialogs.is_open())):
+            return
+
+def benchmark_save():
+    """
+    Function Name:
+    benchmark_save
+
+    Description:
+    Compare saving a whole game after every turn with only saving the
+    sections that changed, then time loading the save into a new game
+    board and check it carries on the same as the game that was saved
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    # Draw off screen unless there is a display to use
+    if "DISPLAY" not in os.environ:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp()
+
+    try:
+        file_name = os.path.join(directory, "benchmark" + SaveGame.EXTENSION)
+        game_board = GameBoard.GameBoard(pygame.Surface((315, 315)), 4,
+                                         names=["A", "B", "C", "D"])
+        save_file = SaveGame.SaveFile(file_name)
+        checksum = game_board.game.board.get_checksum()
+
+        # Play a turn at a time, saving at the end of each
+        turns = 0
+        full = [0, 0.0]
+        changed = [0, 0.0]
+        while (turns < 200) and (game_board.get_winner() is None):
+            play_turn(game_board, rng)
+            turns += 1
+
+            start = time.time()
+            full[0] += SaveGame.write_save(
+                file_name + ".full", checksum,
+                SaveGame.get_sections(game_board))
+            full[1] += time.time() - start
+
+            start = time.time()
+            changed[0] += save_file.save(game_board)
+            changed[1] += time.time() - start
+
+        # Carry on the saved game
+        for turn in range(100):
+            play_turn(game_board, random.Random(turn))
+        expected = (game_board.game.turns, game_board.get_state())
+
+        # Load the save into a new game board and carry it on with the
+        # same clicks
+        start = time.time()
+        save_file = SaveGame.SaveFile(file_name)
+        loaded_board = GameBoard.GameBoard(pygame.Surface((315, 315)),
+                                           save_file.get_num_players())
+        save_file.restore(loaded_board)
+        loaded = time.time() - start
+        for turn in range(100):
+            play_turn(loaded_board, random.Random(turn))
+        assert (loaded_board.game.turns, loaded_board.get_state()) == \
+            expected, "the loaded game did not carry on the same"
+
+        print "%-10s %10s %10s" % ("", "bytes", "time")
+        for (name, (size, elapsed)) in (("whole", full),
+                                        ("changed", changed)):
+            print "%-10s %10d %8.3fms" % (name, size / turns,
+                                          elapsed * 1e3 / turns)
+        print "%d turns saved, %d byte file loaded into a new board in " \
+            "%.2fms and carried on" % (turns, os.path.getsize(file_name),
+                                       loaded * 1e3)
+    finally:
+        shutil.rmtree(directory)
+        Assets.clear()
+        pygame.display.quit()
+
+# Benchmarks that can be selected by name from the command line
+benchmarks = {
+    "replay": benchmark_replay,
+    "save": benchmark_save
+}
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
@@ -0,0 +1,708 @@
+"""
+Module:
+Client.py
+
+Author:
+Mark Nauman
+
+Description:
+Client for the game server (see Server and Protocol).  Client sends the
+actions and waits for the state the server sends back.  RemoteGame and
+RemoteQuestions stand in for Engine.Game and Questions.Questions, so the
+pygame front-end plays a game hosted by a server the same way it plays
+a game of its own ("python TrivialPursuit.py --server HOST:PORT").
+
+The server rolls the dice, deals the questions and checks the answers.
+The front-end only shows what the server sends it.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import socket
+import Engine
+import Protocol
+import Questions
+
+################################################################################
+# Variables
+################################################################################
+
+# Bytes read from the socket at a time
+READ_SIZE = 65536
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Client:
+    """
+    Class Name:
+    Client
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a connection to the game server.  Each action
+    waits for the server to answer.
+    """
+
+    def __init__(self, address):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Connect to the server
+
+        Inputs:
+        address - (host, port) of the server
+
+        Outputs:
+        None
+        """
+
+        self.socket = socket.create_connection(address)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Bytes received that are not a whole message yet and messages
+        # received that have not been read yet
+        self.incoming = ""
+        self.messages = []
+
+    def send(self, message_type, payload=""):
+        """
+        Method Name:
+        send
+
+        Description:
+        Send a message to the server
+
+        Inputs:
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        self.socket.sendall(Protocol.encode(message_type, payload))
+
+    def receive(self):
+        """
+        Method Name:
+        receive
+
+        Description:
+        Wait for the next message from the server
+
+        Inputs:
+        None
+
+        Outputs:
+        (message type, payload)
+        """
+
+        while len(self.messages) == 0:
+            data = self.socket.recv(READ_SIZE)
+            if not data:
+                raise IOError("The server closed the connection")
+            (self.messages, self.incoming) = \
+                Protocol.split_frames(self.incoming + data)
+
+        return self.messages.pop(0)
+
+    def request(self, message_type, payload, reply=Protocol.STATE):
+        """
+        Method Name:
+        request
+
+        Description:
+        Send a message and wait for the reply.  Errors from the server
+        are raised as ValueError, the way Engine.Game breaks the rules.
+
+        Inputs:
+        message_type - message type
+        payload - message payload
+        reply - message type that ends the reply
+
+        Outputs:
+        List of (message type, payload) received, ending with the reply
+        """
+
+        self.send(message_type, payload)
+
+        messages = []
+        while True:
+            (received_type, received) = self.receive()
+            if received_type == Protocol.ERROR:
+                raise ValueError(Protocol.unpack_error(received)[1])
+
+            messages.append((received_type, received))
+            if received_type == reply:
+                return messages
+
+    def new_game(self, num_players):
+        """
+        Method Name:
+        new_game
+
+        Description:
+        Start a game on the server
+
+        Inputs:
+        num_players - number of players
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.NEW_GAME,
+                            Protocol.COUNT.pack(num_players))
+
+    def join(self, game_number):
+        """
+        Method Name:
+        join
+
+        Description:
+        Watch a game on the server
+
+        Inputs:
+        game_number - game number
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.JOIN, Protocol.GAME.pack(game_number))
+
+    def roll(self, game_number):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Roll the dice
+
+        Inputs:
+        game_number - game number
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.ROLL, Protocol.GAME.pack(game_number))
+
+    def move(self, game_number, (row, col)):
+        """
+        Method Name:
+        move
+
+        Description:
+        Move the active player
+
+        Inputs:
+        game_number - game number
+        (row, col) - selected board location
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.MOVE,
+                            Protocol.GAME_LOCATION.pack(game_number, row, col))
+
+    def choose_category(self, game_number, category):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category on the hub
+
+        Inputs:
+        game_number - game number
+        category - question category
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.CATEGORY,
+                            Protocol.GAME_BYTE.pack(
+                                game_number,
+                                Engine.CATEGORIES.index(category)))
+
+    def answer(self, game_number, number):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Answer the question being asked
+
+        Inputs:
+        game_number - game number
+        number - number of the answer picked (from 0)
+
+        Outputs:
+        List of messages received, ending with the game STATE
+        """
+
+        return self.request(Protocol.ANSWER,
+                            Protocol.GAME_BYTE.pack(game_number, number))
+
+    def get_stats(self):
+        """
+        Method Name:
+        get_stats
+
+        Description:
+        Get the server statistics
+
+        Inputs:
+        None
+
+        Outputs:
+        (games, CPU seconds, seconds running, actions)
+        """
+
+        messages = self.request(Protocol.STATS, "", Protocol.STATS_REPLY)
+        return Protocol.STATS_PAYLOAD.unpack(messages[-1][1])
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Close the connection
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.socket.close()
+
+
+class RemoteGame:
+    """
+    Class Name:
+    RemoteGame
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a game played on the server.  Has the methods of
+    Engine.Game and keeps the players and dice in step with the states
+    the server sends.
+    """
+
+    def __init__(self, client, board, players, dice):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Start a game on the server
+
+        Inputs:
+        client - Client object
+        board - Engine.Board object (the server's board layout)
+        players - list of Player objects
+        dice - Dice object
+
+        Outputs:
+        None
+        """
+
+        self.client = client
+        self.board = board
+        self.players = players
+        self.dice = dice
+
+        # The turn as the server last sent it
+        self.number = None
+        self.state = Engine.ROLL
+        self.player = 0
+        self.choices = ()
+        self.turns = 0
+        self.winner = None
+
+        # The question being asked (category, text, answers) and the
+        # state to show once the player has been told how they did
+        self.question = None
+        self.result = None
+
+        self.apply(client.new_game(len(players)))
+
+    def apply(self, messages):
+        """
+        Method Name:
+        apply
+
+        Description:
+        Update the game from the messages the server sent
+
+        Inputs:
+        messages - list of (message type, payload)
+
+        Outputs:
+        None
+        """
+
+        for (message_type, payload) in messages:
+
+            if message_type == Protocol.QUESTION:
+                self.question = Protocol.unpack_question(payload)[1:]
+
+            elif message_type == Protocol.STATE:
+                (self.number, self.state, self.player, roll, self.turns,
+                 players, self.choices) = Protocol.unpack_state(payload)
+
+                # Only touch what changed, so the pieces are only drawn
+                # again when they have to be
+                self.dice.set_roll(roll)
+                for number in range(len(players)):
+                    (location, wedges) = players[number]
+                    player = self.players[number]
+                    if player.get_location() != location:
+                        player.set_location(location)
+                    for bit in range(len(Engine.CATEGORIES)):
+                        if (wedges & ~player.get_wedges()) & (1 << bit):
+                            player.add_wedge(Engine.CATEGORIES[bit])
+
+                if self.state == Engine.OVER:
+                    self.winner = self.players[self.player]
+                if self.state != Engine.ANSWER:
+                    self.question = None
+
+    def check_state(self, state):
+        """
+        Method Name:
+        check_state
+
+        Description:
+        Make sure the game is waiting for the given action
+
+        Inputs:
+        state - expected turn state
+
+        Outputs:
+        None
+        """
+
+        if self.state != state:
+            raise ValueError("Game is in state %s, not %s" %
+                             (self.state, state))
+
+    def roll(self, value=None):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Have the server roll the dice and find the tiles the active player
+        can move to
+
+        Inputs:
+        value - ignored, the server rolls the dice
+
+        Outputs:
+        Dice roll value
+        """
+
+        self.check_state(Engine.ROLL)
+        messages = self.client.roll(self.number)
+        self.apply(messages)
+
+        return Protocol.unpack_state(messages[-1][1])[3]
+
+    def move(self, location):
+        """
+        Method Name:
+        move
+
+        Description:
+        Move the active player to one of the reachable tiles
+
+        Inputs:
+        location - selected (row, col) board location
+
+        Outputs:
+        None
+        """
+
+        self.check_state(Engine.MOVE)
+        self.apply(self.client.move(self.number, location))
+
+    def choose_category(self, category):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category when the player is on the hub
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        None
+        """
+
+        self.check_state(Engine.CATEGORY)
+        self.apply(self.client.choose_category(self.number, category))
+
+    def check_answer(self, number):
+        """
+        Method Name:
+        check_answer
+
+        Description:
+        Send the answer picked to the server.  The state it sends back is
+        kept until answer is called, so the board does not change before
+        the player is told how they did.
+
+        Inputs:
+        number - number of the answer picked (from 0)
+
+        Outputs:
+        (True if it is correct, number of the correct answer)
+        """
+
+        self.check_state(Engine.ANSWER)
+        self.result = self.client.answer(self.number, number)
+        for (message_type, payload) in self.result:
+            if message_type == Protocol.RESULT:
+                (game_number, correct,
+                 number) = Protocol.RESULT_PAYLOAD.unpack(payload)
+                return (correct == 1, number)
+
+        raise ValueError("The server did not check the answer")
+
+    def answer(self, correct):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Show the state the server sent after the answer was checked
+
+        Inputs:
+        correct - True if the question was answered correctly (the server
+                  already knows)
+
+        Outputs:
+        Winning Player object or None
+        """
+
+        self.check_state(Engine.ANSWER)
+        self.apply(self.result)
+        self.result = None
+
+        return self.winner
+
+    def get_player(self):
+        """
+        Method Name:
+        get_player
+
+        Description:
+        Get the active player
+
+        Inputs:
+        None
+
+        Outputs:
+        Active Player object
+        """
+
+        return self.players[self.player]
+
+    def get_state(self):
+        """
+        Method Name:
+        get_state
+
+        Description:
+        Get the turn state
+
+        Inputs:
+        None
+
+        Outputs:
+        self.state
+        """
+
+        return self.state
+
+    def get_choices(self):
+        """
+        Method Name:
+        get_choices
+
+        Description:
+        Get the tiles the active player can move to
+
+        Inputs:
+        None
+
+        Outputs:
+        Tuple of (row, col) board locations
+        """
+
+        return self.choices
+
+    def get_category(self):
+        """
+        Method Name:
+        get_category
+
+        Description:
+        Get the category of the question the active player must answer
+
+        Inputs:
+        None
+
+        Outputs:
+        Question category, or None
+        """
+
+        if self.question is None:
+            return None
+
+        return self.question[0]
+
+    def get_winner(self):
+        """
+        Method Name:
+        get_winner
+
+        Description:
+        Get the winning player
+
+        Inputs:
+        None
+
+        Outputs:
+        Winning Player object or None
+        """
+
+        return self.winner
+
+
+class RemoteQuestions:
+    """
+    Class Name:
+    RemoteQuestions
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for asking the questions the server deals.  Has the
+    ask method of Questions.Questions.
+    """
+
+    def __init__(self, game):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        game - RemoteGame object
+
+        Outputs:
+        None
+        """
+
+        self.game = game
+
+    def ask(self, question_type, dialogs, callback, log=None):
+        """
+        Method Name:
+        ask
+
+        Description:
+        Ask the question the server sent.  The server checks the answer.
+
+        Inputs:
+        question_type - question type
+        dialogs - dialogs to ask the question in (Dialogs.Dialogs)
+        callback - function to call with True/False based on if the
+                   question is answered correctly
+        log - not used, games on a server are not logged here
+
+        Outputs:
+        None
+        """
+
+        (category, question_text, answers) = self.game.question
+        Questions.ask_question(dialogs, question_type, question_text,
+                               answers, self.game.check_answer, callback)
+
+    def warm(self):
+        """
+        Method Name:
+        warm
+
+        Description:
+        Nothing to read, the server has the questions
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        pass
+
+################################################################################
+# Functions
+################################################################################
+
+
+def parse_address(text, default_port):
+    """
+    Function Name:
+    parse_address
+
+    Description:
+    Split a server address of "HOST" or "HOST:PORT"
+
+    Inputs:
+    text - server address
+    default_port - port to use if none is given
+
+    Outputs:
+    (host, port)
+    """
+
+    if ":" in text:
+        (host, port) = text.rsplit(":", 1)
+        return (host, int(port))
+
+    return (text, default_port)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
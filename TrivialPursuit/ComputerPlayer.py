@@ -0,0 +1,753 @@
+"""
+Module:
+ComputerPlayer.py
+
+Author:
+Mark Nauman
+
+Description:
+Computer players that pick the tile to move to with a Monte Carlo tree
+search over the game rules.  The tree has a node for every move a player
+has to make, keyed by the packed game state (see GameState).  The dice
+rolls, the answers and the hub categories between two moves are played
+out at random by the answer model, so each move branches to the states
+the next move can be made from.
+
+Every search runs for a time budget.  The tree is kept between moves:
+the next search starts from the node the game actually got to, if the
+tree has one.  Play outs can be run on a pool of processes, in which case
+a batch of leaves is picked at a time (with a virtual loss, so the batch
+spreads over the tree) and each leaf is played out a few times.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import math
+import multiprocessing
+import random
+import time
+import Engine
+import GameState
+import Simulator
+
+################################################################################
+# Variables
+################################################################################
+
+# Seconds to think about each move
+BUDGET = 0.5
+
+# How much the search tries moves it knows little about, and how much it
+# favors the move the Simulator heuristic would make until it has tried
+# the moves enough to know better
+EXPLORATION = 1.4
+HINT = 2.0
+
+# Stop a play out after this many moves.  The player with the most
+# wedges then counts as the winner.
+MAX_MOVES = 60
+
+# Play outs of each leaf sent to the process pool, and leaves sent per
+# process at a time
+POOL_PLAYOUTS = 4
+POOL_LEAVES = 4
+
+# The play out of this process when it is a pool worker
+worker = None
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Playout:
+    """
+    Class Name:
+    Playout
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for playing a game forward from a packed state.  The
+    players move by the Simulator heuristics and answer by the answer
+    model.
+    """
+
+    def __init__(self, board, num_players, model, rng):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Setup a game to play out on
+
+        Inputs:
+        board - Engine.Board object
+        num_players - number of players
+        model - answer model (see Simulator)
+        rng - random number generator of the game (random.Random)
+
+        Outputs:
+        None
+        """
+
+        self.model = model
+        self.players = [Engine.Player(number + 1, board.get_hub())
+                        for number in range(num_players)]
+        self.game = Engine.Game(board, self.players, Engine.Dice(rng), rng)
+
+    def restore(self, state):
+        """
+        Method Name:
+        restore
+
+        Description:
+        Put the game into a packed state
+
+        Inputs:
+        state - GameState.GameState object
+
+        Outputs:
+        None
+        """
+
+        state.restore(self.game)
+
+    def advance(self, rng):
+        """
+        Method Name:
+        advance
+
+        Description:
+        Roll the dice, pick the hub categories and answer the questions
+        until a player has to move or the game is over
+
+        Inputs:
+        rng - random number generator
+
+        Outputs:
+        None
+        """
+
+        game = self.game
+        while True:
+
+            state = game.get_state()
+            if state == Engine.ROLL:
+                game.roll(rng.randint(1, Engine.Dice.sides))
+
+            elif state == Engine.CATEGORY:
+                game.choose_category(Simulator.choose_category(game,
+                                                               self.model))
+
+            elif state == Engine.ANSWER:
+                probability = self.model.get_probability(
+                    game.get_player(), game.get_category())
+                game.answer(rng.random() < probability)
+
+            else:
+                return
+
+    def play(self, rng):
+        """
+        Method Name:
+        play
+
+        Description:
+        Play the game from where it is to the end
+
+        Inputs:
+        rng - random number generator
+
+        Outputs:
+        Number of the winning player (from 0).  If nobody won in
+        MAX_MOVES moves, the player with the most wedges (ties broken at
+        random).
+        """
+
+        game = self.game
+        for move in range(MAX_MOVES):
+            self.advance(rng)
+            if game.get_state() == Engine.OVER:
+                return game.player
+            game.move(Simulator.choose_move(game, self.model, rng))
+
+        self.advance(rng)
+        if game.get_state() == Engine.OVER:
+            return game.player
+
+        return self.get_leader(rng)
+
+    def get_leader(self, rng):
+        """
+        Method Name:
+        get_leader
+
+        Description:
+        Pick the player with the most wedges
+
+        Inputs:
+        rng - random number generator (to break ties)
+
+        Outputs:
+        Player number (from 0)
+        """
+
+        counts = [bin(player.get_wedges()).count("1")
+                  for player in self.players]
+        most = max(counts)
+        return rng.choice([number for number in range(len(counts))
+                           if counts[number] == most])
+
+
+class Node:
+    """
+    Class Name:
+    Node
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a search tree node: a state where a player has
+    to move (or the game is over)
+    """
+
+    def __init__(self, state, choices, hint=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the node.  No moves have been tried yet.
+
+        Inputs:
+        state - GameState.GameState object
+        choices - tuple of (row, col) locations the player can move to
+        hint - location the Simulator heuristic would move to, or None
+
+        Outputs:
+        None
+        """
+
+        self.state = state
+        self.hint = hint
+        self.player = state.get_player()
+        self.over = state.get_state() == Engine.OVER
+
+        # Moves not tried yet and the branches of the moves tried
+        # {location: Branch}
+        self.untried = list(choices)
+        self.branches = {}
+        self.visits = 0
+
+    def select(self):
+        """
+        Method Name:
+        select
+
+        Description:
+        Pick the move to follow by how often it won and how little it
+        has been tried (UCB1), with a bias for the hinted move that fades
+        as it is tried
+
+        Inputs:
+        None
+
+        Outputs:
+        (location, Branch object)
+        """
+
+        scale = EXPLORATION * math.sqrt(math.log(self.visits))
+        best = None
+        best_score = None
+        for (location, branch) in self.branches.iteritems():
+            score = (branch.wins / branch.visits +
+                     scale / math.sqrt(branch.visits))
+            if location == self.hint:
+                score += HINT / branch.visits
+            if (best_score is None) or (score > best_score):
+                best = (location, branch)
+                best_score = score
+
+        return best
+
+    def get_best(self):
+        """
+        Method Name:
+        get_best
+
+        Description:
+        Get the move that was tried the most
+
+        Inputs:
+        None
+
+        Outputs:
+        (row, col) location
+        """
+
+        return max(self.branches.iteritems(),
+                   key=lambda (location, branch): branch.visits)[0]
+
+
+class Branch:
+    """
+    Class Name:
+    Branch
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a move tried from a node.  The same move leads to
+    different states depending on the dice and the answers.
+    """
+
+    def __init__(self):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the branch statistics
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        # Play outs through the branch, wins for the player moving and
+        # the states the move led to {GameState: Node}
+        self.visits = 0
+        self.wins = 0.0
+        self.outcomes = {}
+
+
+class ComputerPlayer:
+    """
+    Class Name:
+    ComputerPlayer
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the computer players.  One object can play for
+    any number of the players of a game; the tree covers every player's
+    moves.
+    """
+
+    def __init__(self, board, num_players, model=None, budget=BUDGET,
+                 processes=1, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Setup the search
+
+        Inputs:
+        board - Engine.Board object of the game
+        num_players - number of players
+        model - optional answer model (see Simulator, every question is a
+                coin flip if not given)
+        budget - seconds to think about each move
+        processes - number of processes to play out on (1 for none, None
+                    for one per CPU)
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        if model is None:
+            model = Simulator.CategoryModel({}, 0.5)
+        self.model = model
+        self.budget = budget
+        self.playout = Playout(board, num_players, model,
+                               random.Random(self.rng.getrandbits(64)))
+
+        # Start the pool now, so the first move does not pay for it
+        self.pool = None
+        if processes != 1:
+            self.pool = multiprocessing.Pool(processes, start_worker,
+                                             (board.layout, num_players,
+                                              model,
+                                              self.rng.getrandbits(64)))
+            if processes is None:
+                processes = multiprocessing.cpu_count()
+        self.batch = processes * POOL_LEAVES
+
+        # The tree from the last search and what the last search did
+        self.root = None
+        self.stats = {}
+
+    def choose_move(self, state):
+        """
+        Method Name:
+        choose_move
+
+        Description:
+        Search for the best tile to move to
+
+        Inputs:
+        state - GameState.GameState object of a game waiting for a move
+
+        Outputs:
+        (row, col) location to move to
+        """
+
+        if state.get_state() != Engine.MOVE:
+            raise ValueError("Game is in state %s, not %s" %
+                             (state.get_state(), Engine.MOVE))
+
+        root = self.find_root(state)
+        self.root = root
+        reused = root.visits
+
+        # A move with only one choice needs no thinking
+        choices = root.untried + root.branches.keys()
+        if len(choices) == 1:
+            self.stats = {"playouts": 0, "reused": reused, "seconds": 0.0}
+            return choices[0]
+
+        start = time.time()
+        self.search(root, start + self.budget)
+        self.stats = {"playouts": root.visits - reused, "reused": reused,
+                      "seconds": time.time() - start}
+
+        return root.get_best()
+
+    def choose_category(self, game):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category on the hub
+
+        Inputs:
+        game - Engine.Game object waiting for a category
+
+        Outputs:
+        Question category
+        """
+
+        return Simulator.choose_category(game, self.model)
+
+    def answer(self, game):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Answer the question being asked by the answer model
+
+        Inputs:
+        game - Engine.Game object waiting for an answer
+
+        Outputs:
+        True if the question was answered correctly
+        """
+
+        probability = self.model.get_probability(game.get_player(),
+                                                 game.get_category())
+        return self.rng.random() < probability
+
+    def find_root(self, state):
+        """
+        Method Name:
+        find_root
+
+        Description:
+        Find the node of a state in the tree of the last search, so what
+        it learned is kept.  The rest of the tree is thrown away.
+
+        Inputs:
+        state - GameState.GameState object
+
+        Outputs:
+        Node object
+        """
+
+        # Look through the tree a level at a time
+        if self.root is not None:
+            level = [self.root]
+            while len(level) > 0:
+                found = []
+                for node in level:
+                    if node.state == state:
+                        return node
+                    for branch in node.branches.itervalues():
+                        found.extend(branch.outcomes.itervalues())
+                level = found
+
+        self.playout.restore(state)
+        return self.make_node(state)
+
+    def search(self, root, deadline):
+        """
+        Method Name:
+        search
+
+        Description:
+        Grow the tree from a node until the deadline
+
+        Inputs:
+        root - Node object
+        deadline - time.time() to stop at
+
+        Outputs:
+        None
+        """
+
+        while time.time() < deadline:
+
+            # Play out one leaf at a time here
+            if self.pool is None:
+                path = self.descend(root)
+                self.backup(path, [self.playout.play(self.rng)])
+                continue
+
+            # Or a batch of leaves on the pool
+            paths = []
+            tasks = []
+            for number in range(self.batch):
+                path = self.descend(root)
+                paths.append(path)
+                tasks.append((GameState.pack_state(self.playout.game).value,
+                              self.rng.getrandbits(32), POOL_PLAYOUTS))
+            for (path, winners) in zip(paths, self.pool.map(play_leaf,
+                                                            tasks)):
+                self.backup(path, winners)
+
+    def descend(self, root):
+        """
+        Method Name:
+        descend
+
+        Description:
+        Follow the tree from a node to a new leaf, leaving the play out
+        game in the state of the leaf.  Every node and branch passed is
+        counted as a loss until the play outs are backed up.
+
+        Inputs:
+        root - Node object
+
+        Outputs:
+        List of (Node, Branch) passed
+        """
+
+        self.playout.restore(root.state)
+        path = []
+        node = root
+        while not node.over:
+
+            # Try every move once before following the best
+            if len(node.untried) > 0:
+                self.expand(node, path)
+                break
+
+            (location, branch) = node.select()
+            node.visits += 1
+            branch.visits += 1
+            path.append((node, branch))
+
+            self.playout.game.move(location)
+            self.playout.advance(self.rng)
+            state = GameState.pack_state(self.playout.game)
+
+            # The dice or the answers went somewhere new
+            child = branch.outcomes.get(state)
+            if child is None:
+                branch.outcomes[state] = self.make_node(state)
+                break
+            node = child
+
+        return path
+
+    def expand(self, node, path):
+        """
+        Method Name:
+        expand
+
+        Description:
+        Try a move of a node that has not been tried
+
+        Inputs:
+        node - Node object
+        path - list of (Node, Branch) passed to get to the node
+
+        Outputs:
+        None
+        """
+
+        location = node.untried.pop(self.rng.randrange(len(node.untried)))
+        branch = Branch()
+        node.branches[location] = branch
+        node.visits += 1
+        branch.visits += 1
+        path.append((node, branch))
+
+        self.playout.game.move(location)
+        self.playout.advance(self.rng)
+        state = GameState.pack_state(self.playout.game)
+        branch.outcomes[state] = self.make_node(state)
+
+    def make_node(self, state):
+        """
+        Method Name:
+        make_node
+
+        Description:
+        Make the node of the state the play out game is in
+
+        Inputs:
+        state - GameState.GameState object of the play out game
+
+        Outputs:
+        Node object
+        """
+
+        game = self.playout.game
+        if game.get_state() == Engine.OVER:
+            return Node(state, ())
+
+        return Node(state, game.get_choices(),
+                    Simulator.choose_move(game, self.model, self.rng))
+
+    def backup(self, path, winners):
+        """
+        Method Name:
+        backup
+
+        Description:
+        Count the play outs of a leaf in every branch passed to get to it
+
+        Inputs:
+        path - list of (Node, Branch) passed
+        winners - list of winning player numbers
+
+        Outputs:
+        None
+        """
+
+        # The first play out was counted as a loss on the way down
+        extra = len(winners) - 1
+        for (node, branch) in path:
+            node.visits += extra
+            branch.visits += extra
+            branch.wins += winners.count(node.player)
+
+    def get_stats(self):
+        """
+        Method Name:
+        get_stats
+
+        Description:
+        Get what the last search did
+
+        Inputs:
+        None
+
+        Outputs:
+        Dictionary of {"playouts": play outs run, "reused": play outs kept
+        from the search before, "seconds": time taken}
+        """
+
+        return self.stats
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Stop the process pool
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+################################################################################
+# Functions
+################################################################################
+
+
+def start_worker(layout, num_players, model, seed):
+    """
+    Function Name:
+    start_worker
+
+    Description:
+    Setup the play out game of a pool worker
+
+    Inputs:
+    layout - board spaces
+    num_players - number of players
+    model - answer model
+    seed - random seed of the play out game
+
+    Outputs:
+    None
+    """
+
+    global worker
+    worker = Playout(Engine.Board(layout), num_players, model,
+                     random.Random(seed))
+
+
+def play_leaf((value, seed, count)):
+    """
+    Function Name:
+    play_leaf
+
+    Description:
+    Play out a leaf on a pool worker
+
+    Inputs:
+    value - packed state of the leaf
+    seed - random seed
+    count - number of play outs
+
+    Outputs:
+    List of winning player numbers
+    """
+
+    rng = random.Random(seed)
+    state = GameState.GameState(value)
+    winners = []
+    for number in range(count):
+        worker.restore(state)
+        winners.append(worker.play(rng))
+
+    return winners
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
@@ -0,0 +1,909 @@
+"""
+Module:
+Dialogs.py
+
+Author:
+Mark Nauman
+
+Description:
+Contains the dialogs (questions, category pickers, name entry and alerts)
+drawn in the game window.  A dialog does not wait for an answer.  It is
+opened with a function to call with the answer and the main loop keeps
+running, giving the dialog the mouse clicks and key presses, so the
+window keeps repainting while the player thinks.
+
+Dialogs are modal.  Only the first one opened is shown and it gets all
+of the input until it is answered, then the next one is shown.  The
+parts of the screen a closed dialog covered are handed back to the
+screen under it to draw again.
+
+The time from a click (or key press) to the dialog it opened being on
+the display is recorded, so the question latency can be measured.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import collections
+import time
+import pygame
+import Assets
+
+################################################################################
+# Variables
+################################################################################
+
+# Fonts (face, size, bold, italic)
+TITLE_FONT = ("Arial", 24, True, False)
+TEXT_FONT = ("Arial", 20, False, False)
+
+# Colors
+BACKGROUND_COLOR = (32, 32, 64)
+BORDER_COLOR = (255, 255, 255)
+TEXT_COLOR = (255, 255, 255)
+BUTTON_COLOR = (64, 64, 128)
+FIELD_COLOR = (0, 0, 0)
+SELECTED_COLOR = (64, 64, 128)
+
+# Space around and between the parts of a dialog in pixels
+PADDING = 10
+
+# The dialogs are this fraction of the screen width
+WIDTH = 0.8
+
+# Number of click to visible times to keep
+LATENCY_LIMIT = 1000
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Dialog:
+    """
+    Class Name:
+    Dialog
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a message with a row of buttons
+    """
+
+    def __init__(self, title, text, buttons, callback=None, default=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        title - title text
+        text - message text (may have several lines)
+        buttons - list of the button labels
+        callback - optional function to call with the answer
+        default - optional button chosen by the Enter key
+
+        Outputs:
+        None
+        """
+
+        self.title = title
+        self.text = text
+        self.buttons = buttons
+        self.callback = callback
+        self.default = default
+
+        # The dialog is drawn the first time it is needed.  The button
+        # positions are on the screen.
+        self.surface = None
+        self.rect = None
+        self.button_rects = []
+
+    def layout(self, screen_rect):
+        """
+        Method Name:
+        layout
+
+        Description:
+        Draw the dialog and work out where it goes on the screen
+
+        Inputs:
+        screen_rect - screen rectangle
+
+        Outputs:
+        None
+        """
+
+        title_font = Assets.get_font(TITLE_FONT)
+        text_font = Assets.get_font(TEXT_FONT)
+        width = int(screen_rect.width * WIDTH)
+
+        # Work out the lines of text
+        lines = wrap_text(self.text, text_font, width - 2 * PADDING)
+        line_height = text_font.get_linesize()
+
+        # The buttons share a row, each as wide as its label needs
+        button_height = line_height + PADDING
+        button_widths = [text_font.size(label)[0] + 2 * PADDING
+                         for label in self.buttons]
+
+        # Title, text, the rest of the body and the buttons
+        height = PADDING + title_font.get_linesize() + PADDING
+        height += len(lines) * line_height
+        body_top = height
+        height += self.get_body_height() + PADDING
+        buttons_top = height
+        height += button_height + PADDING
+
+        # Center the dialog on the screen
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.rect.center = screen_rect.center
+        self.rect.clamp_ip(screen_rect)
+
+        # Draw the box
+        self.surface = pygame.Surface(self.rect.size)
+        self.surface.fill(BACKGROUND_COLOR)
+        pygame.draw.rect(self.surface, BORDER_COLOR,
+                         self.surface.get_rect(), 2)
+
+        # Draw the title and the text
+        y = PADDING
+        surface = Assets.render_text(self.title, TEXT_COLOR, TITLE_FONT)
+        self.surface.blit(surface, (PADDING, y))
+        y += title_font.get_linesize() + PADDING
+        for line in lines:
+            surface = text_font.render(line, True, TEXT_COLOR)
+            self.surface.blit(surface, (PADDING, y))
+            y += line_height
+
+        # Draw the rest of the body
+        self.draw_body(pygame.Rect(PADDING, body_top, width - 2 * PADDING,
+                                   self.get_body_height()))
+
+        # Draw the buttons, centered in a row
+        x = (width - sum(button_widths) -
+             PADDING * (len(self.buttons) - 1)) / 2
+        self.button_rects = []
+        for number in range(len(self.buttons)):
+            rect = pygame.Rect(x, buttons_top, button_widths[number],
+                               button_height)
+            self.surface.fill(BUTTON_COLOR, rect)
+            pygame.draw.rect(self.surface, BORDER_COLOR, rect, 1)
+            surface = Assets.render_text(self.buttons[number], TEXT_COLOR,
+                                         TEXT_FONT)
+            self.surface.blit(surface, surface.get_rect(center=rect.center))
+
+            # Remember where the button is on the screen
+            self.button_rects.append(rect.move(self.rect.topleft))
+            x += button_widths[number] + PADDING
+
+    def get_body_height(self):
+        """
+        Method Name:
+        get_body_height
+
+        Description:
+        Get the height of the part of the dialog between the text and the
+        buttons
+
+        Inputs:
+        None
+
+        Outputs:
+        Height in pixels
+        """
+
+        return 0
+
+    def draw_body(self, rect):
+        """
+        Method Name:
+        draw_body
+
+        Description:
+        Draw the part of the dialog between the text and the buttons
+
+        Inputs:
+        rect - part of the dialog surface to draw in
+
+        Outputs:
+        None
+        """
+
+        pass
+
+    def draw(self, screen):
+        """
+        Method Name:
+        draw
+
+        Description:
+        Draw the dialog on the screen
+
+        Inputs:
+        screen - screen to draw the dialog on
+
+        Outputs:
+        Rectangle that was drawn
+        """
+
+        if self.surface is None:
+            self.layout(screen.get_rect())
+
+        return screen.blit(self.surface, self.rect)
+
+    def clicked(self, pos):
+        """
+        Method Name:
+        clicked
+
+        Description:
+        Find the button under the mouse
+
+        Inputs:
+        pos - clicked coordinate tuple (x, y) in pixels
+
+        Outputs:
+        Label of the button clicked, or None
+        """
+
+        for number in range(len(self.button_rects)):
+            if self.button_rects[number].collidepoint(pos):
+                return self.buttons[number]
+
+        return None
+
+    def key(self, event):
+        """
+        Method Name:
+        key
+
+        Description:
+        Find the button chosen by a key press.  Enter chooses the default
+        button and a key matching a label (e.g., "1") chooses that button.
+
+        Inputs:
+        event - key down event
+
+        Outputs:
+        Label of the button chosen, or None
+        """
+
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            return self.default
+
+        for label in self.buttons:
+            if event.unicode and (event.unicode.lower() == label.lower()):
+                return label
+
+        return None
+
+    def get_result(self, label):
+        """
+        Method Name:
+        get_result
+
+        Description:
+        Get the answer to pass to the callback
+
+        Inputs:
+        label - label of the button chosen
+
+        Outputs:
+        The button label
+        """
+
+        return label
+
+    def is_changed(self):
+        """
+        Method Name:
+        is_changed
+
+        Description:
+        Check if the dialog looks different since it was last drawn
+
+        Inputs:
+        None
+
+        Outputs:
+        True if the dialog has to be drawn again
+        """
+
+        return False
+
+
+class TextDialog(Dialog):
+    """
+    Class Name:
+    TextDialog
+
+    Base Class:
+    Dialog
+
+    Description:
+    Define the class for a message with a text field to type in
+    """
+
+    def __init__(self, title, text, value="", callback=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        title - title text
+        text - message text
+        value - text the field starts with
+        callback - optional function to call with the text typed, or None
+                   if the dialog was cancelled
+
+        Outputs:
+        None
+        """
+
+        Dialog.__init__(self, title, text, ["OK", "Cancel"], callback, "OK")
+        self.value = value
+        self.field = None
+        self.changed = False
+
+        # The starting text is selected, so typing replaces it
+        self.selected = True
+
+    def get_body_height(self):
+        """
+        Method Name:
+        get_body_height
+
+        Description:
+        Get the height of the text field
+
+        Inputs:
+        None
+
+        Outputs:
+        Height in pixels
+        """
+
+        return Assets.get_font(TEXT_FONT).get_linesize() + PADDING
+
+    def draw_body(self, rect):
+        """
+        Method Name:
+        draw_body
+
+        Description:
+        Draw the text field
+
+        Inputs:
+        rect - part of the dialog surface to draw in
+
+        Outputs:
+        None
+        """
+
+        self.field = rect
+        self.surface.fill(FIELD_COLOR, rect)
+        pygame.draw.rect(self.surface, BORDER_COLOR, rect, 1)
+
+        # Show the end of the text if it does not fit, and a cursor.  The
+        # selected text is highlighted.
+        if self.selected and (self.value != ""):
+            surface = Assets.get_font(TEXT_FONT).render(self.value, True,
+                                                        TEXT_COLOR,
+                                                        SELECTED_COLOR)
+        else:
+            surface = Assets.get_font(TEXT_FONT).render(self.value + "|",
+                                                        True, TEXT_COLOR)
+        area = surface.get_rect()
+        area.width = min(area.width, rect.width - PADDING)
+        area.right = surface.get_width()
+        self.surface.blit(surface, (rect.x + PADDING / 2,
+                                    rect.y + PADDING / 2), area)
+        self.changed = False
+
+    def draw(self, screen):
+        """
+        Method Name:
+        draw
+
+        Description:
+        Draw the dialog on the screen, updating the text field first if
+        the text changed
+
+        Inputs:
+        screen - screen to draw the dialog on
+
+        Outputs:
+        Rectangle that was drawn
+        """
+
+        if self.changed and (self.surface is not None):
+            self.draw_body(self.field)
+
+        return Dialog.draw(self, screen)
+
+    def key(self, event):
+        """
+        Method Name:
+        key
+
+        Description:
+        Edit the text or find the button chosen by a key press.  Enter
+        chooses OK and Escape chooses Cancel.
+
+        Inputs:
+        event - key down event
+
+        Outputs:
+        Label of the button chosen, or None
+        """
+
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            return "OK"
+
+        if event.key == pygame.K_ESCAPE:
+            return "Cancel"
+
+        # Typing or deleting replaces the selected text
+        if event.key == pygame.K_BACKSPACE:
+            if self.selected:
+                self.value = ""
+            self.value = self.value[:-1]
+            self.selected = False
+            self.changed = True
+
+        elif event.unicode and (event.unicode >= u" "):
+            if self.selected:
+                self.value = ""
+            self.value += event.unicode.encode("utf-8")
+            self.selected = False
+            self.changed = True
+
+        return None
+
+    def get_result(self, label):
+        """
+        Method Name:
+        get_result
+
+        Description:
+        Get the answer to pass to the callback
+
+        Inputs:
+        label - label of the button chosen
+
+        Outputs:
+        The text typed, or None if the dialog was cancelled
+        """
+
+        if label == "OK":
+            return self.value
+
+        return None
+
+    def is_changed(self):
+        """
+        Method Name:
+        is_changed
+
+        Description:
+        Check if the text changed since the dialog was last drawn
+
+        Inputs:
+        None
+
+        Outputs:
+        True if the dialog has to be drawn again
+        """
+
+        return self.changed
+
+
+class Dialogs:
+    """
+    Class Name:
+    Dialogs
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the dialogs open on a screen
+    """
+
+    def __init__(self, screen):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        screen - screen to draw the dialogs on
+
+        Outputs:
+        None
+        """
+
+        self.screen = screen
+
+        # Dialogs waiting for an answer, the one shown first
+        self.queue = []
+
+        # If the dialog shown is on the screen and the parts of the screen
+        # closed dialogs were covering
+        self.drawn = False
+        self.exposed = []
+
+        # When the last click or key press happened, if a dialog was drawn
+        # since the display was updated, and the click to visible times in
+        # seconds
+        self.input_time = None
+        self.pending = False
+        self.latencies = collections.deque(maxlen=LATENCY_LIMIT)
+
+    def open(self, dialog):
+        """
+        Method Name:
+        open
+
+        Description:
+        Open a dialog.  It is shown once the dialogs opened before it are
+        answered.
+
+        Inputs:
+        dialog - dialog object
+
+        Outputs:
+        The dialog
+        """
+
+        self.queue.append(dialog)
+        return dialog
+
+    def alert(self, text, title, callback=None):
+        """
+        Method Name:
+        alert
+
+        Description:
+        Open a message with an OK button
+
+        Inputs:
+        text - message text
+        title - title text
+        callback - optional function to call with "OK"
+
+        Outputs:
+        The dialog
+        """
+
+        return self.open(Dialog(title, text, ["OK"], callback, "OK"))
+
+    def confirm(self, text, title, buttons, callback=None):
+        """
+        Method Name:
+        confirm
+
+        Description:
+        Open a message with a choice of buttons
+
+        Inputs:
+        text - message text
+        title - title text
+        buttons - list of the button labels
+        callback - optional function to call with the label chosen
+
+        Outputs:
+        The dialog
+        """
+
+        return self.open(Dialog(title, text, buttons, callback))
+
+    def prompt(self, text, title, value="", callback=None):
+        """
+        Method Name:
+        prompt
+
+        Description:
+        Open a message with a text field
+
+        Inputs:
+        text - message text
+        title - title text
+        value - text the field starts with
+        callback - optional function to call with the text, or None if
+                   the dialog was cancelled
+
+        Outputs:
+        The dialog
+        """
+
+        return self.open(TextDialog(title, text, value, callback))
+
+    def is_open(self):
+        """
+        Method Name:
+        is_open
+
+        Description:
+        Check if a dialog is waiting for an answer
+
+        Inputs:
+        None
+
+        Outputs:
+        True if a dialog is open
+        """
+
+        return len(self.queue) > 0
+
+    def get_dialog(self):
+        """
+        Method Name:
+        get_dialog
+
+        Description:
+        Get the dialog being shown
+
+        Inputs:
+        None
+
+        Outputs:
+        Dialog object, or None
+        """
+
+        if len(self.queue) == 0:
+            return None
+
+        return self.queue[0]
+
+    def handle_event(self, event):
+        """
+        Method Name:
+        handle_event
+
+        Description:
+        Give an event to the dialog being shown.  Every event should be
+        passed here first so the click to visible time can be measured.
+
+        Inputs:
+        event - pygame event
+
+        Outputs:
+        True if the event was used by a dialog (the screen under the
+        dialogs should ignore it)
+        """
+
+        # Only the left mouse button and the keyboard are used
+        clicked = (event.type == pygame.MOUSEBUTTONDOWN) and (event.button == 1)
+        if clicked or (event.type == pygame.KEYDOWN):
+            self.input_time = time.time()
+        elif event.type not in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return False
+
+        # Nothing gets past an open dialog
+        if len(self.queue) == 0:
+            return False
+
+        label = None
+        if clicked:
+            label = self.queue[0].clicked(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            label = self.queue[0].key(event)
+
+        if label is not None:
+            self.choose(label)
+
+        return True
+
+    def choose(self, label):
+        """
+        Method Name:
+        choose
+
+        Description:
+        Answer the dialog being shown and close it
+
+        Inputs:
+        label - label of the button chosen
+
+        Outputs:
+        None
+        """
+
+        dialog = self.queue.pop(0)
+        if self.drawn:
+            self.exposed.append(dialog.rect)
+        self.drawn = False
+
+        if dialog.callback is not None:
+            dialog.callback(dialog.get_result(label))
+
+    def clear(self):
+        """
+        Method Name:
+        clear
+
+        Description:
+        Close every dialog without answering them (their callbacks are not
+        called)
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        if self.drawn:
+            self.exposed.append(self.queue[0].rect)
+        self.drawn = False
+        del self.queue[:]
+
+    def get_exposed(self):
+        """
+        Method Name:
+        get_exposed
+
+        Description:
+        Get the parts of the screen closed dialogs were covering since the
+        last call.  These have to be drawn again by the screen under the
+        dialogs.
+
+        Inputs:
+        None
+
+        Outputs:
+        List of rectangles
+        """
+
+        rects = self.exposed
+        self.exposed = []
+        return rects
+
+    def draw(self, rects=()):
+        """
+        Method Name:
+        draw
+
+        Description:
+        Draw the dialog being shown if it is not on the screen yet, has
+        changed, or was drawn over
+
+        Inputs:
+        rects - parts of the screen drawn since the dialog was last drawn
+
+        Outputs:
+        List of rectangles that were drawn
+        """
+
+        if len(self.queue) == 0:
+            return []
+
+        dialog = self.queue[0]
+        if (self.drawn and not dialog.is_changed() and
+                (dialog.rect.collidelist(list(rects)) == -1)):
+            return []
+
+        if not self.drawn:
+            self.pending = True
+        self.drawn = True
+
+        return [dialog.draw(self.screen)]
+
+    def redraw(self):
+        """
+        Method Name:
+        redraw
+
+        Description:
+        Draw the dialog being shown again on the next draw
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.drawn = False
+
+    def shown(self):
+        """
+        Method Name:
+        shown
+
+        Description:
+        Tell the dialogs the display was updated.  Records the time from
+        the last click or key press if it opened a dialog.
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        if self.pending and (self.input_time is not None):
+            self.latencies.append(time.time() - self.input_time)
+            self.input_time = None
+        self.pending = False
+
+    def get_latencies(self):
+        """
+        Method Name:
+        get_latencies
+
+        Description:
+        Get the recent click to visible times
+
+        Inputs:
+        None
+
+        Outputs:
+        List of times in seconds
+        """
+
+        return list(self.latencies)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def wrap_text(text, font, width):
+    """
+    Function Name:
+    wrap_text
+
+    Description:
+    Break text into lines that fit a width.  Line breaks in the text are
+    kept.
+
+    Inputs:
+    text - text to break up
+    font - font the text is drawn with
+    width - most pixels a line can be
+
+    Outputs:
+    List of lines
+    """
+
+    lines = []
+    for paragraph in text.split("\n"):
+
+        # Add words to the line until the next one does not fit.  A word
+        # too long for a line gets a line of its own.
+        line = ""
+        for word in paragraph.split(" "):
+            longer = word
+            if line != "":
+                longer = line + " " + word
+            if (line != "") and (font.size(longer)[0] > width):
+                lines.append(line)
+                line = word
+            else:
+                line = longer
+
+        lines.append(line)
+
+    return lines
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
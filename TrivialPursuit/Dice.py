@@ -6,8 +6,8 @@ Author:
 Mark Nauman
 
 Description:
-Contains the class for the dice.  It draws the graphics and handle
-generating the random roll value.
+Contains the class for the dice.  It draws the graphics and handles
+clicks.  Generating the random roll value is done by Engine.Dice.
 
 Improvements/Todo:
 None at this time
@@ -18,7 +18,8 @@ None at this time
 ################################################################################
 
 import pygame
-import random
+import Assets
+import Engine
 
 ################################################################################
 # Variables
@@ -30,19 +31,19 @@ import random
 # Classes
 ################################################################################
 
-class Dice:
+class Dice(Engine.Dice):
     """
     Class Name:
-    Player
+    Dice
 
     Base Class:
-    None
+    Engine.Dice
 
     Description:
-    Define the base class for the player
+    Define the class for the dice graphics
     """
 
-    def __init__(self, pos, size):
+    def __init__(self, pos, size, rng=None):
         """
         Method Name:
         __init__
@@ -54,20 +55,23 @@ class Dice:
         Inputs:
         pos - starting position for the dice icon
         size - size available for the dice icon
+        rng - optional random number generator (random.Random)
 
         Outputs:
         None
         """
 
-        # Initialize the dice to zero
-        self.roll = 0
+        # Initialize the dice to zero.  The dice is dirty when it has
+        # changed since it was last drawn.
+        Engine.Dice.__init__(self, rng)
+        self.dirty = True
 
         # Separate the tuples
         (x, y) = pos
         (width, height) = size
 
-        # Leave a little bit of pad
-        pad = 50
+        # Leave a little bit of pad (less on small screens)
+        pad = min(50, min(width, height) / 4)
         x += pad
         y += pad
         width -= (2 * pad)
@@ -89,10 +93,10 @@ class Dice:
         font_size = 50
         while True:
 
-            # Generate the "Roll Dice" text
-            self.font = pygame.font.SysFont('Arial', font_size, True, False)
-            self.text_roll = self.font.render("Roll", True, (0, 0, 0))
-            self.text_dice = self.font.render("Dice", True, (0, 0, 0))
+            # Generate the "Roll Dice" text (font, size, bold, italic)
+            self.font = ("Arial", font_size, True, False)
+            self.text_roll = Assets.render_text("Roll", (0, 0, 0), self.font)
+            self.text_dice = Assets.render_text("Dice", (0, 0, 0), self.font)
 
             # If the width is okay
             if ((text_width > self.text_roll.get_width()) and
@@ -106,7 +110,10 @@ class Dice:
                 if text_height > total_height:
                     break
 
-            # If we get this far, we need to shrink the font and loop
+            # If we get this far, we need to shrink the font and loop.
+            # Give up at the smallest size.
+            if font_size == 1:
+                break
             font_size -= 1
 
         # X position is calculated as <pad><text><pad>
@@ -136,7 +143,7 @@ class Dice:
         screen - screen to draw the game piece on
 
         Outputs:
-        None
+        Rectangle of the screen that was drawn
         """
 
         # Setup the dice surface
@@ -148,7 +155,7 @@ class Dice:
 
             # Generate the dice roll value text and center it
             (width, height) = self.size
-            text = self.font.render("%d" % self.roll, True, (0, 0, 0))
+            text = Assets.render_text("%d" % self.roll, (0, 0, 0), self.font)
             x_text = (width - text.get_width()) / 2
             y_text = (height - text.get_height()) / 2
             surface.blit(text, (x_text, y_text))
@@ -162,33 +169,46 @@ class Dice:
 
         # Add the surface to the screen
         self.rect = screen.blit(surface, self.pos)
+        self.dirty = False
 
-    def clicked(self, pos):
+        return self.rect
+
+    def throw(self):
         """
         Method Name:
-        clicked
+        throw
 
         Description:
-        Determines if the dice was clicked
+        Roll the dice
 
         Inputs:
-        pos - clicked coordinate tuple (x, y) in pixels
+        None
 
         Outputs:
         Dice roll value
         """
 
-        # Can only click if in the initial state and it is clicked
-        was_clicked = (self.roll == 0) and self.rect.collidepoint(pos)
+        self.dirty = True
+        return Engine.Dice.throw(self)
 
-        # If clicked, generate the dice roll
-        if was_clicked:
+    def set_roll(self, value):
+        """
+        Method Name:
+        set_roll
 
-            self.roll = random.randint(1, 6)
-            return self.roll
+        Description:
+        Set the dice roll (e.g., to a roll made by the game server)
 
-        # If not clicked or already clicked return zero
-        return 0
+        Inputs:
+        value - dice roll value
+
+        Outputs:
+        None
+        """
+
+        if self.roll != value:
+            self.dirty = True
+        Engine.Dice.set_roll(self, value)
 
     def reset(self):
         """
@@ -196,7 +216,7 @@ class Dice:
         reset
 
         Description:
-        Reset the dice to the initial state
+        Reset the dice so it can be rolled again
 
         Inputs:
         None
@@ -205,8 +225,35 @@ class Dice:
         None
         """
 
-        # Reset the dice
-        self.roll = 0
+        if self.roll != 0:
+            self.dirty = True
+        Engine.Dice.reset(self)
+
+    def clicked(self, pos):
+        """
+        Method Name:
+        clicked
+
+        Description:
+        Determines if the dice was clicked
+
+        Inputs:
+        pos - clicked coordinate tuple (x, y) in pixels
+
+        Outputs:
+        Dice roll value
+        """
+
+        # Can only click if in the initial state and it is clicked
+        was_clicked = (self.roll == 0) and self.rect.collidepoint(pos)
+
+        # If clicked, generate the dice roll
+        if was_clicked:
+
+            return self.throw()
+
+        # If not clicked or already clicked return zero
+        return 0
 
 ################################################################################
 # Functions
@@ -0,0 +1,2110 @@
+"""
+Module:
+Engine.py
+
+Author:
+Mark Nauman
+
+Description:
+This contains the game rules without any graphics.  The board, players,
+dice, question deck and turn state machine live here so a game can be
+played without a window or any dialogs.  The pygame classes in the other
+modules are views over these classes.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import array
+import collections
+import copy
+import random
+import threading
+import zlib
+import QuestionDatabase
+import QuestionPack
+
+################################################################################
+# Variables
+################################################################################
+
+# Question categories (the headquarter wedges a player has to collect)
+CATEGORIES = ["People", "Events", "Places", "Holidays"]
+
+# Define the stock game board spaces [[Top Row], [Next Row], ..., [Last Row]].
+# Each space is (tile type, headquarter) or None for an illegal space.
+LAYOUT = [
+    [("People", True), ("Events", False), ("Roll Again", False),
+     ("Places", False), ("Holidays", False), ("Places", False),
+     ("Roll Again", False), ("People", False), ("Events", True)],
+    [("Holidays", False), None, None,
+     None, ("Places", False), None,
+     None, None, ("Places", False)],
+    [("Roll Again", False), None, None,
+     None, ("Events", False), None,
+     None, None, ("Roll Again", False)],
+    [("Events", False), None, None,
+     None, ("People", False), None,
+     None, None, ("Holidays", False)],
+    [("Places", False), ("Events", False), ("People", False),
+     ("Holidays", False), ("Hub", False), ("Events", False),
+     ("Places", False), ("Holidays", False), ("People", False)],
+    [("Events", False), None, None,
+     None, ("Places", False), None,
+     None, None, ("Holidays", False)],
+    [("Roll Again", False), None, None,
+     None, ("Holidays", False), None,
+     None, None, ("Roll Again", False)],
+    [("People", False), None, None,
+     None, ("People", False), None,
+     None, None, ("Events", False)],
+    [("Holidays", True), ("Places", False), ("Roll Again", False),
+     ("People", False), ("Events", False), ("People", False),
+     ("Roll Again", False), ("Holidays", False), ("Places", True)]
+]
+
+# Turn states
+ROLL = "Roll"          # Waiting for the dice to be rolled
+MOVE = "Move"          # Waiting for one of the reachable tiles to be picked
+CATEGORY = "Category"  # Waiting for a question category (hub tile)
+ANSWER = "Answer"      # Waiting for the question to be answered
+OVER = "Over"          # Somebody won the game
+
+# Reachability tables already built {layout: table}.  Boards with the same
+# layout share a table (nothing changes a table once it is built), so
+# lots of games in one process only build it once.  At most
+# REACHABILITY_LIMIT tables are kept.
+reachability_tables = {}
+REACHABILITY_LIMIT = 16
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Board:
+    """
+    Class Name:
+    Board
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the board spaces and which spaces can be
+    reached from each other
+    """
+
+    def __init__(self, layout=LAYOUT):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the board spaces and precompute the tiles reachable
+        from every tile for every possible dice roll
+
+        Inputs:
+        layout - board spaces [[Top Row], ..., [Last Row]]
+
+        Outputs:
+        None
+        """
+
+        # Take a copy so changing this board does not change the layout
+        self.layout = [list(row) for row in layout]
+
+        # Precompute the tiles reachable from every tile for every roll
+        self.reachable = None
+        self.build_reachability()
+
+    def build_reachability(self):
+        """
+        Method Name:
+        build_reachability
+
+        Description:
+        Build the table of tiles reachable from every tile for every
+        possible dice roll.  The table is keyed by (row, col, roll).  A
+        table already built for the same layout is used instead.
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        key = tuple(tuple(row) for row in self.layout)
+        self.reachable = reachability_tables.get(key)
+        if self.reachable is None:
+            self.reachable = build_reachability(self.layout, Dice.sides)
+
+            # Make room by forgetting the other tables
+            if len(reachability_tables) >= REACHABILITY_LIMIT:
+                reachability_tables.clear()
+            reachability_tables[key] = self.reachable
+
+    def invalidate_reachability(self):
+        """
+        Method Name:
+        invalidate_reachability
+
+        Description:
+        Throw away the reachability table.  It is rebuilt the next time
+        it is needed.  Must be called whenever the board layout changes.
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.reachable = None
+
+    def set_space(self, (row, col), space):
+        """
+        Method Name:
+        set_space
+
+        Description:
+        Change the space at a board location
+
+        Inputs:
+        (row, col) - board location to change
+        space - (tile type, headquarter) or None for an illegal space
+
+        Outputs:
+        None
+        """
+
+        self.layout[row][col] = space
+
+        # The board layout changed so the reachable tiles are stale
+        self.invalidate_reachability()
+
+    def get_reachable(self, (row, col), roll):
+        """
+        Method Name:
+        get_reachable
+
+        Description:
+        Look up the tiles reachable from a board position with a roll
+
+        Inputs:
+        (row, col) - current board position
+        roll - dice roll value
+
+        Outputs:
+        Tuple of reachable (row, col) board positions
+        """
+
+        # Rebuild the table if the board layout changed
+        if self.reachable is None:
+            self.build_reachability()
+
+        return self.reachable.get((row, col, roll), ())
+
+    def get_type(self, (row, col)):
+        """
+        Method Name:
+        get_type
+
+        Description:
+        Return the tile type of a board location
+
+        Inputs:
+        (row, col) - board location
+
+        Outputs:
+        Tile type
+        """
+
+        return self.layout[row][col][0]
+
+    def get_headquarter(self, (row, col)):
+        """
+        Method Name:
+        get_headquarter
+
+        Description:
+        Return the headquarter status of a board location
+
+        Inputs:
+        (row, col) - board location
+
+        Outputs:
+        True if the tile is a headquarter tile; False it not
+        """
+
+        return self.layout[row][col][1]
+
+    def get_space(self, (row, col)):
+        """
+        Method Name:
+        get_space
+
+        Description:
+        Return the space at a board location
+
+        Inputs:
+        (row, col) - board location
+
+        Outputs:
+        (tile type, headquarter)
+        """
+
+        return self.layout[row][col]
+
+    def get_hub(self):
+        """
+        Method Name:
+        get_hub
+
+        Description:
+        Return the location of the hub (the center of the board)
+
+        Inputs:
+        None
+
+        Outputs:
+        (row, col) of the hub
+        """
+
+        row = len(self.layout) / 2
+        col = len(self.layout[row]) / 2
+        return (row, col)
+
+    def get_checksum(self):
+        """
+        Method Name:
+        get_checksum
+
+        Description:
+        Get the checksum of the board layout, to tell which board a saved
+        file (e.g., a plan, game log or saved game) was made for
+
+        Inputs:
+        None
+
+        Outputs:
+        Checksum
+        """
+
+        return zlib.crc32(repr(self.layout)) & 0xFFFFFFFF
+
+
+class Player:
+    """
+    Class Name:
+    Player
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the player.  Keeps track of the player location
+    and what questions have been answered.
+    """
+
+    def __init__(self, player_number, location, name=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the player information including
+        the player number and questions answered
+
+        Inputs:
+        player_number - player number
+        location - location tuple (row, col) of the player on the board
+        name - optional player name
+
+        Outputs:
+        None
+        """
+
+        # Store the player number
+        self.player_number = player_number
+
+        # Initialize the questions the player has answered
+        self.answered = {}
+        for category in CATEGORIES:
+            self.answered[category] = False
+
+        # Store the player location
+        self.location = location
+
+        # Default the name to the player number
+        if name is None:
+            name = "Player #%d" % player_number
+        self.name = name
+
+    def add_wedge(self, category):
+        """
+        Method Name:
+        add_wedge
+
+        Description:
+        Add a scoring wedge to the player piece
+
+        Inputs:
+        category - question category to add the wedge
+
+        Outputs:
+        None
+        """
+
+        self.answered[category] = True
+
+    def get_wedges(self):
+        """
+        Method Name:
+        get_wedges
+
+        Description:
+        Get the scoring wedges as a bitmask (bit N is set if the player has
+        the wedge for CATEGORIES[N])
+
+        Inputs:
+        None
+
+        Outputs:
+        Wedge bitmask
+        """
+
+        wedges = 0
+        for (number, category) in enumerate(CATEGORIES):
+            if self.answered[category] is True:
+                wedges |= 1 << number
+
+        return wedges
+
+    def set_wedges(self, wedges):
+        """
+        Method Name:
+        set_wedges
+
+        Description:
+        Set the scoring wedges from a bitmask (e.g., when a saved game
+        state is restored)
+
+        Inputs:
+        wedges - wedge bitmask (bit N for CATEGORIES[N])
+
+        Outputs:
+        None
+        """
+
+        for (number, category) in enumerate(CATEGORIES):
+            self.answered[category] = (wedges & (1 << number)) != 0
+
+    def can_win(self):
+        """
+        Method Name:
+        can_win
+
+        Description:
+        Determine if the player can win (i.e., has all scoring wedges)
+
+        Inputs:
+        None
+
+        Outputs:
+        True if the player has all of the scoring wedges
+        """
+
+        # Determine if the user has answered all of the questions
+        can_win = True
+        for category in self.answered.keys():
+            if self.answered[category] is False:
+                can_win = False
+
+        # Return the status
+        return can_win
+
+    def set_location(self, location):
+        """
+        Method Name:
+        set_location
+
+        Description:
+        Set the player location
+
+        Inputs:
+        location - location tuple (row, col)
+
+        Outputs:
+        None
+        """
+
+        self.location = location
+
+    def get_location(self):
+        """
+        Method Name:
+        get_location
+
+        Description:
+        Get the player location
+
+        Inputs:
+        None
+
+        Outputs:
+        self.location
+        """
+
+        return self.location
+
+    def get_name(self):
+        """
+        Method Name:
+        get_name
+
+        Description:
+        Get the player name
+
+        Inputs:
+        None
+
+        Outputs:
+        self.name
+        """
+
+        return self.name
+
+    def set_name(self, name):
+        """
+        Method Name:
+        set_name
+
+        Description:
+        Set the player name
+
+        Inputs:
+        name - player name
+
+        Outputs:
+        None
+        """
+
+        self.name = name
+
+
+class Dice:
+    """
+    Class Name:
+    Dice
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the dice.  Generates the random roll value.
+    """
+
+    # Number of sides on the dice (highest possible roll)
+    sides = 6
+
+    def __init__(self, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the dice roll value
+
+        Inputs:
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        # Initialize the dice to zero
+        self.roll = 0
+
+    def throw(self):
+        """
+        Method Name:
+        throw
+
+        Description:
+        Generate a new dice roll
+
+        Inputs:
+        None
+
+        Outputs:
+        Dice roll value
+        """
+
+        # The same roll as rng.randint(1, self.sides) without the calls
+        # randint makes to get it
+        self.roll = int(self.rng.random() * self.sides) + 1
+        return self.roll
+
+    def get_roll(self):
+        """
+        Method Name:
+        get_roll
+
+        Description:
+        Get the dice roll value (zero if not rolled)
+
+        Inputs:
+        None
+
+        Outputs:
+        self.roll
+        """
+
+        return self.roll
+
+    def set_roll(self, value):
+        """
+        Method Name:
+        set_roll
+
+        Description:
+        Set the dice roll (e.g., to a roll made somewhere else)
+
+        Inputs:
+        value - dice roll value
+
+        Outputs:
+        None
+        """
+
+        self.roll = value
+
+    def reset(self):
+        """
+        Method Name:
+        reset
+
+        Description:
+        Reset the dice to the initial state
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        # Reset the dice
+        self.roll = 0
+
+
+class Deck:
+    """
+    Class Name:
+    Deck
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the question cards.  Reads the questions and
+    deals them out in a shuffled order with a Cursor per category, so the
+    questions do not all have to be read before the first one is drawn.
+    The questions of a CSV file are read a category at a time, the first
+    time the category is drawn.
+    """
+
+    def __init__(self, file_name="questions.csv", rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Open the questions.  Nothing is read until a question is drawn.
+
+        Inputs:
+        file_name - question file (CSV, question pack or question database)
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        # Open the questions.  The questions in a pack or database are only
+        # read when they are drawn and the questions in a CSV file are read
+        # a category at a time.
+        if QuestionPack.is_pack(file_name):
+            self.questions = QuestionPack.Pack(file_name)
+        elif QuestionDatabase.is_database(file_name):
+            self.questions = QuestionDatabase.Database(file_name, rng)
+        else:
+            self.questions = LazyQuestions(file_name)
+
+        # The cursor dealing each category.  A category starts its shuffle
+        # when it is first drawn.
+        self.cursors = {}
+
+        # The difficulties a question database deals each weighed category
+        # from {category: (list of difficulties, AliasTable)}
+        self.difficulties = {}
+
+    def draw(self, question_type):
+        """
+        Method Name:
+        draw
+
+        Description:
+        Draw the next question card for a category.  The answers are
+        shuffled each time the card is drawn.
+
+        Inputs:
+        question_type - question type
+
+        Outputs:
+        (question text, list of answer text, index of the correct answer)
+        """
+
+        # Get the next question.  A database deals its own cards so it can
+        # be shared with other games, from the difficulty picked by weight
+        # if the category is weighed.
+        if isinstance(self.questions, QuestionDatabase.Database):
+            difficulty = None
+            if question_type in self.difficulties:
+                (difficulties, table) = self.difficulties[question_type]
+                difficulty = difficulties[table.sample()]
+            (question, answers) = self.questions.draw(question_type,
+                                                      difficulty)
+        else:
+            index = self.get_cursor(question_type).next()
+            (question, answers) = self.questions[question_type][index]
+
+        # Shuffle the answers
+        self.rng.shuffle(answers)
+
+        # Find the correct answer
+        correct = 0
+        for number in range(len(answers)):
+            if answers[number][1]:
+                correct = number
+
+        return (question, [answer[0] for answer in answers], correct)
+
+    def share(self, rng=None):
+        """
+        Method Name:
+        share
+
+        Description:
+        Get a deck dealing the same questions (read once for both) with
+        its own shuffle.  Cards from a question database are dealt from
+        the one deck in the database.
+
+        Inputs:
+        rng - optional random number generator of the new deck (shares
+              this deck's generator if not given)
+
+        Outputs:
+        Deck object
+        """
+
+        deck = copy.copy(self)
+        deck.cursors = {}
+        deck.difficulties = {}
+        if rng is not None:
+            deck.rng = rng
+        return deck
+
+    def warm(self):
+        """
+        Method Name:
+        warm
+
+        Description:
+        Start reading the categories that have not been drawn yet in the
+        background, so they are ready by the time they are drawn
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        if isinstance(self.questions, LazyQuestions):
+            self.questions.warm()
+
+    def get_cursor(self, question_type):
+        """
+        Method Name:
+        get_cursor
+
+        Description:
+        Get the cursor dealing a category, starting a shuffle of the
+        category if it does not have one yet
+
+        Inputs:
+        question_type - question type
+
+        Outputs:
+        Cursor object
+        """
+
+        cursor = self.cursors.get(question_type)
+        if cursor is None:
+            cursor = Cursor(len(self.questions[question_type]), self.rng)
+            self.cursors[question_type] = cursor
+
+        return cursor
+
+    def weigh(self, question_type, weights):
+        """
+        Method Name:
+        weigh
+
+        Description:
+        Deal a category by weight instead of in a shuffled order.  A card
+        with twice the weight comes up twice as often.  Unlike the
+        shuffled order, a card can come up again before the others have.
+
+        Inputs:
+        question_type - question type
+        weights - weight of each card (in question order)
+
+        Outputs:
+        None
+        """
+
+        if isinstance(self.questions, QuestionDatabase.Database):
+            raise ValueError("A question database deals its own cards")
+
+        if len(weights) != len(self.questions[question_type]):
+            raise ValueError("%s has %d questions, found %d weights" %
+                             (question_type,
+                              len(self.questions[question_type]),
+                              len(weights)))
+
+        self.cursors[question_type] = WeightedCursor(weights, self.rng)
+
+    def weigh_difficulty(self, question_type, weights):
+        """
+        Method Name:
+        weigh_difficulty
+
+        Description:
+        Deal a category by the difficulty of the cards.  A question
+        database picks a difficulty by the weights (and how many cards
+        have it) and deals the next card of that difficulty.
+
+        Inputs:
+        question_type - question type
+        weights - {difficulty: weight}.  Difficulties left out have no
+                  weight, so those cards are not dealt.  Cards from a
+                  question file without difficulties are difficulty 0.
+
+        Outputs:
+        None
+        """
+
+        if isinstance(self.questions, QuestionDatabase.Database):
+            counts = self.questions.get_difficulties(question_type)
+            difficulties = sorted([difficulty for difficulty in counts
+                                   if weights.get(difficulty, 0) > 0])
+            if len(difficulties) == 0:
+                raise ValueError("No %s questions have a difficulty with a "
+                                 "weight (difficulties %s)" %
+                                 (question_type, sorted(counts)))
+            self.difficulties[question_type] = (
+                difficulties,
+                AliasTable([weights[difficulty] * counts[difficulty]
+                            for difficulty in difficulties], self.rng))
+            return
+
+        cards = self.questions[question_type]
+        card_weights = [weights.get(cards.get_difficulty(index), 0)
+                        for index in range(len(cards))]
+        if max(card_weights or [0]) <= 0:
+            raise ValueError("No %s questions have a difficulty with a "
+                             "weight (difficulties %s)" %
+                             (question_type,
+                              sorted(set([cards.get_difficulty(index)
+                                          for index in range(len(cards))]))))
+
+        self.weigh(question_type, card_weights)
+
+
+class Cursor:
+    """
+    Class Name:
+    Cursor
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for dealing the cards of a category in a shuffled
+    order.  The shuffle is done a card at a time as the cards are drawn
+    (a Fisher-Yates shuffle that only keeps the cards it has moved), so
+    each draw is O(1) and nothing is shuffled up front.  When every card
+    has been drawn the deck is shuffled again, keeping the last few cards
+    out of the start of the next pass so they do not come straight back.
+    """
+
+    # Most cards kept out of the start of the next pass (never more than
+    # half of the deck)
+    spacing = 16
+
+    def __init__(self, count, rng):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Start the first pass through the deck
+
+        Inputs:
+        count - number of cards
+        rng - random number generator (random.Random or random)
+
+        Outputs:
+        None
+        """
+
+        self.count = count
+        self.rng = rng
+
+        # The location is how far through the deck we are and the swaps
+        # are the cards moved by the shuffle so far {location: card}
+        self.location = 0
+        self.swaps = {}
+
+        # The last cards drawn and how many of them are being kept at the
+        # end of the deck this pass
+        self.recent = collections.deque(maxlen=min(self.spacing, count / 2))
+        self.held = 0
+
+    def next(self):
+        """
+        Method Name:
+        next
+
+        Description:
+        Do the next step of the shuffle.  Swaps a random card from the
+        rest of the deck into the next location and returns it.
+
+        Inputs:
+        None
+
+        Outputs:
+        Card number
+        """
+
+        location = self.location
+        swaps = self.swaps
+
+        # The held cards wait at the end of the deck for the first few
+        # draws of the pass
+        last = self.count - 1
+        if location < self.held:
+            last -= self.held
+
+        # Swap a random card into this location.  Nothing reads this
+        # location again, so only the other card has to be remembered.
+        other = self.rng.randint(location, last)
+        card = swaps.get(other, other)
+        swaps[other] = swaps.get(location, location)
+        swaps.pop(location, None)
+        self.recent.append(card)
+
+        # Move to the next location, shuffling again at the end
+        self.location += 1
+        if self.location >= self.count:
+            self.reshuffle()
+
+        return card
+
+    def reshuffle(self):
+        """
+        Method Name:
+        reshuffle
+
+        Description:
+        Start the next pass through the deck with the last cards drawn
+        moved to the end of the deck
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.location = 0
+        self.swaps.clear()
+        self.held = len(self.recent)
+
+        # Swap each of the last cards drawn with the card at the end
+        where = {}
+        for (number, card) in enumerate(self.recent):
+            end = self.count - 1 - number
+            location = where.get(card, card)
+            other = self.swaps.get(end, end)
+            self.swaps[end] = card
+            self.swaps[location] = other
+            where[other] = location
+
+
+class WeightedCursor:
+    """
+    Class Name:
+    WeightedCursor
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for dealing the cards of a category by weight.  The
+    cards are picked with an AliasTable, so each draw is O(1) no matter
+    how the weights are spread.  Every draw is independent, so a card
+    with twice the weight comes up twice as often, and a card can come
+    up again straight away.
+    """
+
+    def __init__(self, weights, rng):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Build the alias table for the weights
+
+        Inputs:
+        weights - weight of each card
+        rng - random number generator (random.Random or random)
+
+        Outputs:
+        None
+        """
+
+        self.table = AliasTable(weights, rng)
+
+    def next(self):
+        """
+        Method Name:
+        next
+
+        Description:
+        Pick the next card
+
+        Inputs:
+        None
+
+        Outputs:
+        Card number
+        """
+
+        return self.table.sample()
+
+
+class AliasTable:
+    """
+    Class Name:
+    AliasTable
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for picking items by weight in O(1) time (Vose's
+    alias method).  Each item gets a column holding the chance of picking
+    the item and the item to pick otherwise (its alias).
+    """
+
+    def __init__(self, weights, rng):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Build the table
+
+        Inputs:
+        weights - weight of each item (not negative, not all zero)
+        rng - random number generator (random.Random or random)
+
+        Outputs:
+        None
+        """
+
+        total = float(sum(weights))
+        if (total <= 0) or (min(weights) < 0):
+            raise ValueError("Weights have to be positive")
+
+        self.rng = rng
+        self.count = len(weights)
+        self.chance = array.array("d", [1.0]) * self.count
+        self.alias = array.array("i", range(self.count))
+
+        # Scale the weights so the average is 1, then fill up each column
+        # that is short with part of a column that is over
+        scaled = [weight * self.count / total for weight in weights]
+        small = [item for item in range(self.count) if scaled[item] < 1]
+        large = [item for item in range(self.count) if scaled[item] >= 1]
+        while (len(small) > 0) and (len(large) > 0):
+            short = small.pop()
+            over = large.pop()
+            self.chance[short] = scaled[short]
+            self.alias[short] = over
+            scaled[over] -= 1 - scaled[short]
+            if scaled[over] < 1:
+                small.append(over)
+            else:
+                large.append(over)
+
+        # Whatever is left is full (up to rounding)
+        for item in small + large:
+            self.chance[item] = 1.0
+
+    def sample(self):
+        """
+        Method Name:
+        sample
+
+        Description:
+        Pick an item
+
+        Inputs:
+        None
+
+        Outputs:
+        Item number
+        """
+
+        column = self.rng.randint(0, self.count - 1)
+        if self.rng.random() < self.chance[column]:
+            return column
+        return self.alias[column]
+
+
+class CardList:
+    """
+    Class Name:
+    CardList
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the questions of one category.  Instead of a
+    list of lists of strings per card, the text of all of the cards is
+    kept in one byte array with an array of where each field starts and
+    how long it is.  Short text that repeats (e.g., the same answer on
+    lots of cards) is only stored once.  Behaves like a read only list of
+    [question, [[answer, correct], ...]] entries.
+    """
+
+    # Number of text fields per card (question plus four answers)
+    fields = 5
+
+    # Only text up to this length is checked for repeats and at most this
+    # many different repeats are remembered
+    intern_length = 32
+    intern_limit = 4096
+
+    def __init__(self):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize an empty list of cards
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.text = bytearray()
+        self.starts = array.array("I")
+        self.lengths = array.array("H")
+        self.difficulties = array.array("i")
+
+        # Where repeated text is stored {text: start}
+        self.interned = {}
+
+    def append(self, card, difficulty=0):
+        """
+        Method Name:
+        append
+
+        Description:
+        Add a card
+
+        Inputs:
+        card - [question, correct, incorrect_1, incorrect_2, incorrect_3]
+        difficulty - difficulty of the card
+
+        Outputs:
+        None
+        """
+
+        if len(card) != self.fields:
+            raise ValueError("Card needs %d fields, found %d" %
+                             (self.fields, len(card)))
+
+        for text in card:
+
+            if len(text) > 0xFFFF:
+                raise ValueError("Card text is too long: %r..." % text[:40])
+
+            # Reuse text we already have
+            start = self.interned.get(text)
+            if start is None:
+                start = len(self.text)
+                self.text.extend(text)
+
+                # Remember short text in case it repeats
+                if ((len(text) <= self.intern_length) and
+                        (len(self.interned) < self.intern_limit)):
+                    self.interned[text] = start
+
+            self.starts.append(start)
+            self.lengths.append(len(text))
+
+        self.difficulties.append(difficulty)
+
+    def get_text(self, field):
+        """
+        Method Name:
+        get_text
+
+        Description:
+        Get the text of a field
+
+        Inputs:
+        field - field number (card number * fields + field in the card)
+
+        Outputs:
+        Text of the field
+        """
+
+        start = self.starts[field]
+        return str(self.text[start:start + self.lengths[field]])
+
+    def get_difficulty(self, index):
+        """
+        Method Name:
+        get_difficulty
+
+        Description:
+        Get the difficulty of a card
+
+        Inputs:
+        index - card number
+
+        Outputs:
+        Difficulty of the card
+        """
+
+        return self.difficulties[index]
+
+    def __len__(self):
+        """
+        Method Name:
+        __len__
+
+        Description:
+        Get the number of cards
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of cards
+        """
+
+        return len(self.starts) / self.fields
+
+    def __getitem__(self, index):
+        """
+        Method Name:
+        __getitem__
+
+        Description:
+        Get a card
+
+        Inputs:
+        index - card number
+
+        Outputs:
+        [question, [[correct, True], [incorrect, False], ...]]
+        """
+
+        if (index < 0) or (index >= len(self)):
+            raise IndexError("card %d out of range" % index)
+
+        field = index * self.fields
+        answers = [[self.get_text(field + 1), True]]
+        for number in range(2, self.fields):
+            answers.append([self.get_text(field + number), False])
+
+        return [self.get_text(field), answers]
+
+
+class LazyQuestions:
+    """
+    Class Name:
+    LazyQuestions
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the questions of a CSV file read a category at a
+    time.  Behaves like the {category: CardList} dictionary read_questions
+    returns, except a category is only read from the file when it is
+    first used.  The rest of the categories can be read in the background
+    while the game waits on the player.
+    """
+
+    def __init__(self, file_name):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Remember the question file.  Nothing is read yet.
+
+        Inputs:
+        file_name - question file (CSV) with a header row
+
+        Outputs:
+        None
+        """
+
+        self.file_name = file_name
+        self.categories = {}
+        self.complete = False
+
+        # Categories looked for and not in the file, so they are not
+        # looked for again
+        self.missing = set()
+
+        # Only one thread reads the file at a time
+        self.lock = threading.Lock()
+        self.warming = None
+
+    def keys(self):
+        """
+        Method Name:
+        keys
+
+        Description:
+        Get the question categories.  Reads all of the categories.
+
+        Inputs:
+        None
+
+        Outputs:
+        List of categories
+        """
+
+        self.load(None)
+        return self.categories.keys()
+
+    def __contains__(self, category):
+        """
+        Method Name:
+        __contains__
+
+        Description:
+        Check if the file has a question category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        True if the file has the category
+        """
+
+        self.load([category])
+        return category in self.categories
+
+    def __getitem__(self, category):
+        """
+        Method Name:
+        __getitem__
+
+        Description:
+        Get the questions for a category, reading them if necessary
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        CardList object
+        """
+
+        self.load([category])
+        return self.categories[category]
+
+    def is_loaded(self, categories):
+        """
+        Method Name:
+        is_loaded
+
+        Description:
+        Check if categories have been read (or looked for and not found)
+
+        Inputs:
+        categories - list of categories, None for all of them
+
+        Outputs:
+        True if they have all been read
+        """
+
+        if self.complete:
+            return True
+        if categories is None:
+            return False
+        for category in categories:
+            if (category not in self.categories) and \
+                    (category not in self.missing):
+                return False
+        return True
+
+    def load(self, categories):
+        """
+        Method Name:
+        load
+
+        Description:
+        Read categories that have not been read yet.  If the background
+        read is running this waits for it instead.
+
+        Inputs:
+        categories - list of categories to read, None for all of them
+
+        Outputs:
+        None
+        """
+
+        if self.is_loaded(categories):
+            return
+
+        self.lock.acquire()
+        try:
+            # Another thread may have read them while we waited
+            if self.is_loaded(categories):
+                return
+
+            # The categories already read keep the cards they have, since
+            # a shuffle may be part way through them
+            questions = read_questions(self.file_name, categories)
+            for (category, cards) in questions.items():
+                self.categories.setdefault(category, cards)
+
+            if categories is None:
+                self.complete = True
+            else:
+                self.missing.update([category for category in categories
+                                     if category not in self.categories])
+        finally:
+            self.lock.release()
+
+    def warm(self):
+        """
+        Method Name:
+        warm
+
+        Description:
+        Start reading all of the categories in a background thread, if
+        we have not already
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        if (self.warming is None) and not self.complete:
+            self.warming = threading.Thread(target=self.load_all)
+            self.warming.daemon = True
+            self.warming.start()
+
+    def load_all(self):
+        """
+        Method Name:
+        load_all
+
+        Description:
+        Read all of the categories (the background thread)
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        # A bad question file is reported when a category is drawn
+        try:
+            self.load(None)
+        except (IOError, ValueError):
+            pass
+
+
+class Game:
+    """
+    Class Name:
+    Game
+
+    Base Class:
+    None
+
+    Description:
+    Define the turn state machine.  A turn goes ROLL -> MOVE ->
+    (CATEGORY ->) ANSWER and back to ROLL, or to OVER when somebody wins.
+    """
+
+    def __init__(self, board, players, dice=None, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the game and pick the starting player
+
+        Inputs:
+        board - Board object
+        players - list of Player objects
+        dice - optional Dice object
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+
+        # Store the game pieces
+        self.board = board
+        self.players = players
+        if dice is None:
+            dice = Dice(rng)
+        self.dice = dice
+
+        # Starting player is random
+        self.player = rng.randint(0, len(players)-1)
+
+        # Initialize the turn
+        self.state = ROLL
+        self.choices = ()
+        self.category = None
+        self.winner = None
+
+        # Number of dice rolls so far
+        self.turns = 0
+
+        # Optional event log every action is recorded in (GameLog.Writer)
+        self.log = None
+
+    def roll(self, value=None):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Roll the dice and find the tiles the active player can move to
+
+        Inputs:
+        value - optional dice roll value (rolls the dice if not given)
+
+        Outputs:
+        Dice roll value
+        """
+
+        self.check_state(ROLL)
+
+        # Roll the dice if somebody did not do it for us, otherwise show
+        # their roll on the dice
+        if value is None:
+            value = self.dice.throw()
+        else:
+            self.dice.set_roll(value)
+
+        if self.log is not None:
+            self.log.roll(self, value)
+
+        self.turns += 1
+
+        # Find the tiles the player can move to
+        location = self.players[self.player].location
+        self.choices = self.board.get_reachable(location, value)
+        self.state = MOVE
+
+        # If there is nowhere to go, move to the next player
+        if len(self.choices) == 0:
+            self.end_turn(False)
+
+        return value
+
+    def move(self, location):
+        """
+        Method Name:
+        move
+
+        Description:
+        Move the active player to one of the reachable tiles
+
+        Inputs:
+        location - selected (row, col) board location
+
+        Outputs:
+        None
+        """
+
+        self.check_state(MOVE)
+
+        if location not in self.choices:
+            raise ValueError("Can not move to %s" % (location,))
+
+        if self.log is not None:
+            self.log.move(location)
+
+        # Move the player piece
+        self.players[self.player].set_location(location)
+        tile_type = self.board.get_type(location)
+
+        # Roll again tiles do not ask a question
+        if tile_type == "Roll Again":
+            self.end_turn(True)
+
+        # Hub tiles need a question category to be picked
+        elif tile_type == "Hub":
+            self.state = CATEGORY
+
+        # Everything else asks a question of the tile type
+        else:
+            self.category = tile_type
+            self.state = ANSWER
+
+    def choose_category(self, category):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category when the player is on the hub
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        None
+        """
+
+        self.check_state(CATEGORY)
+
+        if category not in CATEGORIES:
+            raise ValueError("Unknown category %s" % category)
+
+        if self.log is not None:
+            self.log.choose_category(category)
+
+        self.category = category
+        self.state = ANSWER
+
+    def answer(self, correct):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Update the game based on if the player answers the
+        question correctly
+
+        Inputs:
+        correct - True if the question was answered correctly
+
+        Outputs:
+        Winning Player object or None
+        """
+
+        self.check_state(ANSWER)
+
+        if self.log is not None:
+            self.log.answer(correct)
+
+        if correct is True:
+
+            player = self.players[self.player]
+            (tile_type, headquarter) = self.board.get_space(player.location)
+
+            # If the tile is a headquarter, add the scoring wedge
+            if headquarter is True:
+                player.add_wedge(tile_type)
+
+            # If it is a hub and the player can win the game
+            if (tile_type == "Hub") and player.can_win():
+                self.winner = player
+
+        self.end_turn(correct)
+        return self.winner
+
+    def end_turn(self, correct):
+        """
+        Method Name:
+        end_turn
+
+        Description:
+        Finish the turn.  The player keeps going after a correct answer,
+        otherwise it is the next player's turn.
+
+        Inputs:
+        correct - True if the player keeps their turn
+
+        Outputs:
+        None
+        """
+
+        # Reset the turn
+        self.dice.reset()
+        self.choices = ()
+        self.category = None
+
+        # Somebody won
+        if self.winner is not None:
+            self.state = OVER
+            return
+
+        # If the player answers incorrectly, move to the next player
+        if correct is False:
+            self.player = (self.player + 1) % len(self.players)
+
+        self.state = ROLL
+
+    def play(self, choose_move, choose_category, answer, max_turns=None):
+        """
+        Method Name:
+        play
+
+        Description:
+        Play the game until somebody wins, making the players' choices
+        with the functions given.  Does the same as calling roll, move,
+        choose_category and answer in turn, but with their work done in
+        one loop, so a headless game (e.g., in a simulation) plays
+        several times faster.  The functions see the game in the state
+        the choice is made in.  A logged game is played a step at a time
+        so every action is logged.
+
+        Inputs:
+        choose_move - function(game) returning the (row, col) to move to
+        choose_category - function(game) returning the hub category
+        answer - function(game) returning True if the question is
+                 answered correctly
+        max_turns - optional number of dice rolls to stop after
+
+        Outputs:
+        Winning Player object or None
+        """
+
+        if max_turns is None:
+            max_turns = float("inf")
+
+        # Finish the turn being played, and play a logged game, a step at
+        # a time
+        while (self.state != OVER) and \
+                ((self.state != ROLL) or
+                 ((self.log is not None) and (self.turns < max_turns))):
+            if self.state == ROLL:
+                self.roll()
+            elif self.state == MOVE:
+                self.move(choose_move(self))
+            elif self.state == CATEGORY:
+                self.choose_category(choose_category(self))
+            else:
+                self.answer(answer(self))
+
+        if self.state == OVER:
+            return self.winner
+
+        # The board lookups
+        if self.board.reachable is None:
+            self.board.build_reachability()
+        reachable = self.board.reachable
+        layout = self.board.layout
+        players = self.players
+        count = len(players)
+        throw = self.dice.throw
+
+        while self.turns < max_turns:
+
+            # Roll the dice and find the tiles the player can move to
+            player = players[self.player]
+            value = throw()
+            self.turns += 1
+            (row, col) = player.location
+            choices = reachable.get((row, col, value), ())
+            if not choices:
+                self.player = (self.player + 1) % count
+                continue
+
+            # Move the player piece.  Roll again tiles keep the turn.
+            self.choices = choices
+            self.state = MOVE
+            location = choose_move(self)
+            if location not in choices:
+                raise ValueError("Can not move to %s" % (location,))
+            player.set_location(location)
+            (tile_type, headquarter) = layout[location[0]][location[1]]
+            if tile_type == "Roll Again":
+                self.choices = ()
+                self.state = ROLL
+                continue
+
+            # Ask a question of the tile type or the category picked on
+            # the hub
+            self.choices = ()
+            if tile_type == "Hub":
+                self.state = CATEGORY
+                category = choose_category(self)
+                if category not in CATEGORIES:
+                    raise ValueError("Unknown category %s" % category)
+                self.category = category
+            else:
+                self.category = tile_type
+            self.state = ANSWER
+            correct = answer(self)
+            self.category = None
+            self.state = ROLL
+
+            if correct is not True:
+                self.player = (self.player + 1) % count
+            elif headquarter is True:
+                player.add_wedge(tile_type)
+            elif (tile_type == "Hub") and player.can_win():
+                self.winner = player
+                self.state = OVER
+                break
+
+        self.dice.reset()
+        return self.winner
+
+    def set_turn(self, state, player, category=None):
+        """
+        Method Name:
+        set_turn
+
+        Description:
+        Jump to a point of a turn (e.g., when a saved game state is
+        restored).  The dice and players have to be set first, the tiles
+        the player can move to are found from them.
+
+        Inputs:
+        state - turn state
+        player - active player number (from 0)
+        category - question category being asked, or None
+
+        Outputs:
+        None
+        """
+
+        if state not in (ROLL, MOVE, CATEGORY, ANSWER, OVER):
+            raise ValueError("Unknown state %s" % state)
+        if not 0 <= player < len(self.players):
+            raise ValueError("Unknown player %d" % player)
+
+        self.state = state
+        self.player = player
+        self.category = category
+        self.choices = ()
+        self.winner = None
+
+        if state == MOVE:
+            location = self.get_player().get_location()
+            self.choices = self.board.get_reachable(location,
+                                                    self.dice.get_roll())
+        elif state == OVER:
+            self.winner = self.get_player()
+
+    def check_state(self, state):
+        """
+        Method Name:
+        check_state
+
+        Description:
+        Make sure the game is waiting for the given action
+
+        Inputs:
+        state - expected turn state
+
+        Outputs:
+        None
+        """
+
+        if self.state != state:
+            raise ValueError("Game is in state %s, not %s" %
+                             (self.state, state))
+
+    def get_player(self):
+        """
+        Method Name:
+        get_player
+
+        Description:
+        Get the active player
+
+        Inputs:
+        None
+
+        Outputs:
+        Active Player object
+        """
+
+        return self.players[self.player]
+
+    def get_state(self):
+        """
+        Method Name:
+        get_state
+
+        Description:
+        Get the turn state
+
+        Inputs:
+        None
+
+        Outputs:
+        self.state
+        """
+
+        return self.state
+
+    def get_choices(self):
+        """
+        Method Name:
+        get_choices
+
+        Description:
+        Get the tiles the active player can move to
+
+        Inputs:
+        None
+
+        Outputs:
+        Tuple of (row, col) board locations
+        """
+
+        return self.choices
+
+    def get_category(self):
+        """
+        Method Name:
+        get_category
+
+        Description:
+        Get the category of the question the active player must answer
+
+        Inputs:
+        None
+
+        Outputs:
+        self.category
+        """
+
+        return self.category
+
+    def get_winner(self):
+        """
+        Method Name:
+        get_winner
+
+        Description:
+        Get the winning player
+
+        Inputs:
+        None
+
+        Outputs:
+        Winning Player object or None
+        """
+
+        return self.winner
+
+################################################################################
+# Functions
+################################################################################
+
+
+def build_reachability(board, max_roll):
+    """
+    Function Name:
+    build_reachability
+
+    Description:
+    Build the table of tiles reachable from every tile for every roll
+    from 1 to max_roll.  A piece may turn but may not reverse direction
+    between steps.  Instead of walking every path, the walk keeps the set
+    of (row, col, x, y) states after each step, so the work grows linearly
+    with the roll and the board size.
+
+    Inputs:
+    board - board spaces [[Top Row], ..., [Last Row]] (None is illegal)
+    max_roll - highest dice roll value
+
+    Outputs:
+    Dictionary of {(row, col, roll): tuple of reachable (row, col)}
+    """
+
+    # Possible directions to move in (x, y)
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+    reachable = {}
+    for start_row in range(len(board)):
+        for start_col in range(len(board[start_row])):
+
+            # Nothing can start on an illegal space
+            if board[start_row][start_col] is None:
+                continue
+
+            # The first step can go in any direction
+            states = set([(start_row, start_col, 0, 0)])
+            for roll in range(1, max_roll + 1):
+
+                # Take one step from every state, never reversing
+                next_states = set()
+                for (row, col, x, y) in states:
+                    for (next_x, next_y) in directions:
+
+                        # Can not turn around
+                        if (next_x == -x) and (next_y == -y):
+                            continue
+
+                        next_row = row + next_x
+                        next_col = col + next_y
+
+                        # If we are outside the board area, skip
+                        if ((next_row < 0) or (next_col < 0) or
+                                (next_row >= len(board)) or
+                                (next_col >= len(board[next_row]))):
+                            continue
+
+                        # If we are on an illegal space, skip
+                        if board[next_row][next_col] is None:
+                            continue
+
+                        next_states.add((next_row, next_col, next_x, next_y))
+
+                states = next_states
+
+                # Store the tiles we landed on for this roll
+                tiles = set([(row, col) for (row, col, x, y) in states])
+                reachable[(start_row, start_col, roll)] = tuple(sorted(tiles))
+
+    return reachable
+
+
+def read_questions(file_name, categories=None):
+    """
+    Function Name:
+    read_questions
+
+    Description:
+    Stream the questions from a CSV file into a CardList per category.
+    Only one row is read at a time.
+
+    Inputs:
+    file_name - question file (CSV) with a header row
+    categories - optional list of the only categories to keep
+
+    Outputs:
+    Dictionary of {category: CardList}
+    """
+
+    questions = {}
+    for row in QuestionPack.read_rows(file_name, categories):
+
+        # Add this category, if necessary
+        category = row[0]
+        if category not in questions:
+            questions[category] = CardList()
+
+        # Add this question
+        if len(row) > 6:
+            questions[category].append(row[1:6], int(row[6]))
+        else:
+            questions[category].append(row[1:6])
+
+    return questions
+
+
+def generate_layout(size):
+    """
+    Function Name:
+    generate_layout
+
+    Description:
+    Generate a square board laid out like the stock board (an outer ring
+    plus a cross through the hub) with the tile types cycling around it.
+    The corners are the headquarters.
+
+    Inputs:
+    size - number of rows and columns (odd number)
+
+    Outputs:
+    Board spaces [[Top Row], ..., [Last Row]]
+    """
+
+    tile_types = ["People", "Events", "Roll Again", "Places", "Holidays"]
+    middle = size / 2
+
+    layout = []
+    index = 0
+    for row in range(size):
+        layout.append([])
+        for col in range(size):
+
+            # Only the outer ring and the cross are legal spaces
+            if ((row in (0, middle, size - 1)) or
+                    (col in (0, middle, size - 1))):
+                layout[row].append((tile_types[index % len(tile_types)],
+                                    False))
+                index += 1
+            else:
+                layout[row].append(None)
+
+    # Put the hub in the middle and a headquarter in each corner
+    layout[middle][middle] = ("Hub", False)
+    corners = [(0, 0), (0, size - 1), (size - 1, size - 1), (size - 1, 0)]
+    for (category, (row, col)) in zip(CATEGORIES, corners):
+        layout[row][col] = (category, True)
+
+    return layout
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
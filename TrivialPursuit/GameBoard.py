@@ -6,7 +6,10 @@ Author:
 Mark Nauman
 
 Description:
-This contains the classes for the game board
+This contains the classes for the game board.  The game rules are in
+Engine.Game, this draws the board and asks the players for their choices.
+The questions and choices are asked in dialogs drawn over the board, so a
+turn carries on when the dialog is answered instead of waiting for it.
 
 Improvements/Todo:
 None at this time
@@ -17,12 +20,20 @@ None at this time
 ################################################################################
 
 import pygame
-import pymsgbox
+import Assets
+import Dialogs
 import Tiles
 import Player
-import random
 import Dice
 import Questions
+import Engine
+import GameState
+import GameLog
+import SaveGame
+import ComputerPlayer
+import Client
+import RandomStreams
+import Timings
 
 ################################################################################
 # Variables
@@ -47,113 +58,9 @@ class GameBoard:
     Define the base class for the game board
     """
 
-    # Define the game board tiles [[Top Row], [Next Row], ..., [Last Row]]
-    board = [
-        [   #
-            Tiles.People(True),
-            Tiles.Events(),
-            Tiles.RollAgain(),
-            Tiles.Places(),
-            Tiles.Holidays(),
-            Tiles.Places(),
-            Tiles.RollAgain(),
-            Tiles.People(),
-            Tiles.Events(True)
-        ],
-        [
-            Tiles.Holidays(),
-            None,
-            None,
-            None,
-            Tiles.Places(),
-            None,
-            None,
-            None,
-            Tiles.Places()
-        ],
-        [
-            Tiles.RollAgain(),
-            None,
-            None,
-            None,
-            Tiles.Events(),
-            None,
-            None,
-            None,
-            Tiles.RollAgain()
-        ],
-        [
-            Tiles.Events(),
-            None,
-            None,
-            None,
-            Tiles.People(),
-            None,
-            None,
-            None,
-            Tiles.Holidays()
-        ],
-        [
-            Tiles.Places(),
-            Tiles.Events(),
-            Tiles.People(),
-            Tiles.Holidays(),
-            Tiles.Hub(),
-            Tiles.Events(),
-            Tiles.Places(),
-            Tiles.Holidays(),
-            Tiles.People()
-        ],
-        [
-            Tiles.Events(),
-            None,
-            None,
-            None,
-            Tiles.Places(),
-            None,
-            None,
-            None,
-            Tiles.Holidays()
-        ],
-        [
-            Tiles.RollAgain(),
-            None,
-            None,
-            None,
-            Tiles.Holidays(),
-            None,
-            None,
-            None,
-            Tiles.RollAgain()
-        ],
-        [
-            Tiles.People(),
-            None,
-            None,
-            None,
-            Tiles.People(),
-            None,
-            None,
-            None,
-            Tiles.Events()
-        ],
-        [
-            Tiles.Holidays(True),
-            Tiles.Places(),
-            Tiles.RollAgain(),
-            Tiles.People(),
-            Tiles.Events(),
-            Tiles.People(),
-            Tiles.RollAgain(),
-            Tiles.Holidays(),
-            Tiles.Places(True)
-        ]
-    ]
-
-    # Define the players
-    players = []
-
-    def __init__(self, screen, num_players):
+    def __init__(self, screen, num_players, question_file="questions.csv",
+                 names=None, server=None, questions=None, computers=(),
+                 computer=None, log=None, save=None, seed=None):
         """
         Method Name:
         __init__
@@ -164,19 +71,47 @@ class GameBoard:
         Inputs:
         screen - screen to draw the welcome page on
         num_players - number of players to create
+        question_file - question file (CSV, question pack or question database)
+        names - optional list of the player names (asked for if not given)
+        server - optional (host, port) of a game server to play the game on
+        questions - optional Questions object to share the question cards
+                    of (the game gets its own shuffle)
+        computers - optional list of the numbers of the players (from 0)
+                    the computer plays for
+        computer - optional class of the computer players, made from the
+                   Engine.Board, the number of players and a random number
+                   generator (defaults to ComputerPlayer.ComputerPlayer)
+        log - optional file name to write the event log of the game to
+              (see GameLog).  A game carrying on from a save adds to the
+              log.
+        save - optional file name to save the game to after every turn.
+               If the file has a saved game, the game carries on from it
+               (see SaveGame).
+        seed - optional random seed.  The same seed and the same choices
+               play the same game.  A new seed is picked if not given.
 
         Outputs:
         None
         """
 
-        # Initialize the questions
-        self.questions = Questions.Questions()
-
         # Store the screen for access in other methods
         self.screen = screen
 
+        # The dice, questions, starting player and computer players each
+        # get their own random numbers from the game's seed
+        self.streams = RandomStreams.RandomStreams(seed)
+
+        # Define the game board tiles [[Top Row], [Next Row], ..., [Last
+        # Row]] and the players.  Every game has its own, so games in the
+        # same process do not change each other.
+        self.board = Tiles.create_board(Engine.LAYOUT)
+        self.players = []
+
+        # The dialogs drawn over the board
+        self.dialogs = Dialogs.Dialogs(screen)
+
         # Set the font we will use for text (font, size, bold, italic)
-        self.font = pygame.font.SysFont('Arial', 25, False, False)
+        self.font = ("Arial", 25, False, False)
 
         # Initialize the tile sizes and positions
         (screen_width, screen_height) = self.screen.get_size()
@@ -191,16 +126,49 @@ class GameBoard:
                 x_pos += tile_width
             y_pos += tile_height
 
-        # Figure out where the hub is located
-        hub_row = (len(self.board) / 2)
-        hub_col = (len(self.board[hub_row]) / 2)
-
-        # Initialize the players
+        # Remember the tile size so clicks can be found on the grid
+        self.tile_size = (tile_width, tile_height)
+
+        # Draw every look of the player pieces up front
+        self.atlas = Player.build_atlas(Player.get_length((tile_width,
+                                                           tile_height)))
+
+        # Setup the game rules for the board layout and figure out
+        # where the hub is located
+        board = Engine.Board(Tiles.get_layout(self.board))
+        hub = board.get_hub()
+
+        # The computer players share one search (or plan).  A server plays
+        # its games by its own rules, so the search can not look ahead in
+        # them.
+        self.computers = set(computers)
+        self.computer = None
+        if len(self.computers) > 0:
+            if server is not None:
+                raise ValueError("Computer players can not play on a server")
+            if computer is None:
+                computer = ComputerPlayer.ComputerPlayer
+            self.computer = computer(
+                board, num_players,
+                rng=self.streams.get(RandomStreams.COMPUTER))
+
+        # Initialize the players.  If we were not given their names, ask
+        # for them over the board (the computer players are named for
+        # their number).
         for player in range(num_players):
-            self.players.append(Player.Player(player+1, (hub_row, hub_col)))
-
-        # Starting player is random
-        self.player = random.randint(0, num_players-1)
+            if (names is None) and (player in self.computers):
+                self.players.append(Player.Player(player+1, hub,
+                                                  "Computer #%d" % (player+1)))
+            elif names is None:
+                self.players.append(Player.Player(player+1, hub))
+                self.dialogs.prompt(
+                    "Enter Player Name?", "Player Name?",
+                    self.players[-1].get_name(),
+                    lambda name, player=self.players[-1]:
+                        self.set_name(player, name))
+            else:
+                self.players.append(Player.Player(player+1, hub,
+                                                  names[player]))
 
         # Figure out the starting coordinate for the lower right
         # empty quadrant
@@ -219,7 +187,58 @@ class GameBoard:
         height = height - y
 
         # Initialize the dice
-        self.dice = Dice.Dice((x, y), (width, height))
+        self.dice = Dice.Dice((x, y), (width, height),
+                              self.streams.get(RandomStreams.DICE))
+
+        # Initialize the turn state machine and the questions (they are
+        # read when first asked).  Starting player is random.  A game on a
+        # server is played by its rules and questions instead.
+        if server is None:
+            self.game = Engine.Game(board, self.players, self.dice,
+                                    self.streams.get(RandomStreams.GAME))
+            deck_rng = self.streams.get(RandomStreams.DECK)
+            if questions is None:
+                self.questions = Questions.Questions(question_file, deck_rng)
+            else:
+                self.questions = questions.share(deck_rng)
+        else:
+            self.game = Client.RemoteGame(Client.Client(server), board,
+                                          self.players, self.dice)
+            self.questions = Client.RemoteQuestions(self.game)
+
+        # The tiles that are active and the tiles that may need drawing
+        self.active_tiles = set()
+        self.touched_tiles = set()
+
+        # The parts of the screen that have changed since the display was
+        # last updated, the player text on the screen and if everything
+        # has to be drawn
+        self.dirty_rects = []
+        self.text = None
+        self.text_rects = []
+        self.full_redraw = True
+
+        # Save the game after every turn, carrying on from the last save
+        self.log = None
+        self.save_file = None
+        self.saved_turn = None
+        resumed = False
+        if save is not None:
+            if server is not None:
+                raise ValueError("Games on a server can not be saved")
+            self.save_file = SaveGame.SaveFile(save)
+            if not self.save_file.is_empty():
+                self.save_file.restore(self)
+                resumed = True
+
+        # Write every action to the log, once the game is in the state it
+        # starts from.  A game carrying on from a save adds to its old log.
+        # A server keeps the log of its own games.
+        if log is not None:
+            if server is not None:
+                raise ValueError("Games on a server can not be logged")
+            self.log = GameLog.Writer(log, board, append=resumed)
+            self.log.attach(self.game)
 
         # Draw the initial board
         self.draw()
@@ -240,16 +259,84 @@ class GameBoard:
         None
         """
 
-        # Loop through all of the tiles on the game board and deactivate
-        for row in range(len(self.board)):
-            for col in range(len(self.board[row])):
-                if self.board[row][col] is not None:
-                    self.board[row][col].deactivate()
+        # Deactivate the tiles that were activated
+        for (row, col) in self.active_tiles:
+            self.board[row][col].deactivate()
+        self.touched_tiles.update(self.active_tiles)
+        self.active_tiles.clear()
 
         # Reset the dice
         self.dice.reset()
 
-    def update_tiles(self, (row, col), x, y, moves):
+    def set_name(self, player, name):
+        """
+        Method Name:
+        set_name
+
+        Description:
+        Set a player name typed in the name dialog
+
+        Inputs:
+        player - player object
+        name - player name, or None if the dialog was cancelled
+
+        Outputs:
+        None
+        """
+
+        # If they hit cancel the name stays the player number
+        if name:
+            player.set_name(name)
+
+    def set_tile(self, (row, col), tile):
+        """
+        Method Name:
+        set_tile
+
+        Description:
+        Change the tile at a board location (None for an illegal space)
+
+        Inputs:
+        (row, col) - board location to change
+        tile - new tile object or None
+
+        Outputs:
+        None
+        """
+
+        self.board[row][col] = tile
+        self.active_tiles.discard((row, col))
+        if tile is not None:
+            tile.dirty = True
+            self.touched_tiles.add((row, col))
+
+        # Keep the game rules in step with the tiles.  This also throws
+        # away the stale reachable tiles.
+        if tile is None:
+            self.game.board.set_space((row, col), None)
+        else:
+            self.game.board.set_space((row, col), tile.get_space())
+
+    def get_reachable(self, (row, col), roll):
+        """
+        Method Name:
+        get_reachable
+
+        Description:
+        Look up the tiles reachable from a board position with a roll
+
+        Inputs:
+        (row, col) - current board position
+        roll - dice roll value
+
+        Outputs:
+        Tuple of reachable (row, col) board positions
+        """
+
+        return self.game.board.get_reachable((row, col), roll)
+
+    @Timings.timed("GameBoard.update_tiles")
+    def update_tiles(self, (row, col), roll):
         """
         Method Name:
         update_tiles
@@ -260,61 +347,64 @@ class GameBoard:
 
         Inputs:
         (row, col) - current board position
-        x - current direction in the x-axis
-        y - current direction in the y-axis
-        moves - remaining moves
+        roll - dice roll value
 
         Outputs:
         None
         """
 
-        # Move the player piece
-        row = row + x
-        col = col + y
-
-        # If we are outside the board area, quit
-        if ((row < 0) or (col < 0) or
-                (row >= len(self.board)) or (col >= len(self.board[row]))):
-            return
+        # Activate every tile the player can land on
+        for (row, col) in self.get_reachable((row, col), roll):
+            self.board[row][col].activate()
+            self.active_tiles.add((row, col))
+            self.touched_tiles.add((row, col))
 
-        # If we are on an illegal space, quit
-        if self.board[row][col] is None:
-            return
+    def invalidate(self, rect):
+        """
+        Method Name:
+        invalidate
 
-        # If we have exhausted all moves, activate the tile and quit
-        if moves == 0:
-            self.board[row][col].activate()
-            return
+        Description:
+        Clear part of the screen (e.g., where a dialog was) and mark the
+        tiles, dice and text in it to be drawn again
 
-        # Update the number of moves
-        moves -= 1
+        Inputs:
+        rect - part of the screen to draw again
 
-        # If this is the first move, try all directions
-        if (x == 0) and (y == 0):
-            self.update_tiles((row, col), -1, 0, moves)
-            self.update_tiles((row, col), 1, 0, moves)
-            self.update_tiles((row, col), 0, -1, moves)
-            self.update_tiles((row, col), 0, 1, moves)
+        Outputs:
+        None
+        """
 
-        # If we are moving left or right, try that direction also up and down
-        elif x != 0:
-            self.update_tiles((row, col), x, 0, moves)
-            self.update_tiles((row, col), 0, -1, moves)
-            self.update_tiles((row, col), 0, 1, moves)
+        self.screen.fill((0, 0, 0), rect)
+        self.dirty_rects.append(rect)
+
+        # Find the tiles on the grid under the rectangle
+        (width, height) = self.tile_size
+        for row in range(max(rect.top / height, 0),
+                         min((rect.bottom - 1) / height + 1,
+                             len(self.board))):
+            for col in range(max(rect.left / width, 0),
+                             min((rect.right - 1) / width + 1,
+                                 len(self.board[row]))):
+                if self.board[row][col] is not None:
+                    self.board[row][col].dirty = True
+                    self.touched_tiles.add((row, col))
 
-        # If we are moving up or down, try that direction also left and right
-        elif y != 0:
-            self.update_tiles((row, col), 0, y, moves)
-            self.update_tiles((row, col), -1, 0, moves)
-            self.update_tiles((row, col), 1, 0, moves)
+        # The dice and the text may be under it as well
+        if (self.dice.rect is None) or self.dice.rect.colliderect(rect):
+            self.dice.dirty = True
+        if rect.collidelist(self.text_rects) != -1:
+            self.text = None
 
+    @Timings.timed("GameBoard.draw")
     def draw(self):
         """
         Method Name:
         draw
 
         Description:
-        Draw the board on the screen
+        Draw the parts of the board that have changed on the screen and
+        add them to the dirty rectangles
 
         Inputs:
         None
@@ -323,28 +413,88 @@ class GameBoard:
         None
         """
 
-        # Redraw the game board
-        self.screen.fill((0, 0, 0))
-        for row in range(len(self.board)):
-            for col in range(len(self.board[row])):
-                if self.board[row][col] is not None:
-                    self.board[row][col].draw(self.screen)
-
-        # Redraw the player pieces
+        # Start from a clean screen the first time (or when asked to)
+        full_redraw = self.full_redraw
+        if full_redraw:
+            self.screen.fill((0, 0, 0))
+            self.dirty_rects = [self.screen.get_rect()]
+            self.text = None
+            self.text_rects = []
+            self.full_redraw = False
+            self.dialogs.get_exposed()
+            self.dialogs.redraw()
+
+        # Draw again where the dialogs that closed were
+        for rect in self.dialogs.get_exposed():
+            self.invalidate(rect)
+
+        # A piece that moved or changed dirties the tile it was on and the
+        # tile it is on now
         for player in self.players:
+            if player.dirty:
+                for location in (player.drawn_location,
+                                 player.get_location()):
+                    if location is not None:
+                        (row, col) = location
+                        self.board[row][col].dirty = True
+                        self.touched_tiles.add(location)
+
+        # Only the tiles that were touched can have changed, unless
+        # everything is being drawn
+        if full_redraw:
+            locations = [(row, col) for row in range(len(self.board))
+                         for col in range(len(self.board[row]))
+                         if self.board[row][col] is not None]
+        else:
+            locations = sorted(self.touched_tiles)
+        self.touched_tiles.clear()
+
+        # Redraw the changed tiles and the pieces on them
+        for (row, col) in locations:
+            tile = self.board[row][col]
+            if (tile is not None) and (tile.dirty or full_redraw):
+
+                # Draw the tile
+                rect = tile.draw(self.screen)
+                self.dirty_rects.append(rect)
+
+                # Draw the player pieces on it
+                for player in self.players:
+                    if player.get_location() == (row, col):
+                        player.draw(self.screen, tile.get_position(),
+                                    tile.get_size())
 
-            # Get the player location
-            (row, col) = player.get_location()
+        # Redraw the dice
+        if self.dice.dirty or full_redraw:
+            self.dirty_rects.append(self.dice.draw(self.screen))
 
-            # Get the tile position and size
-            size = self.board[row][col].get_size()
-            position = self.board[row][col].get_position()
+        # Redraw the player text if the active player changed
+        text = (self.game.get_player().get_name(), self.game.player+1)
+        if text != self.text:
+            self.draw_text(text)
 
-            # Draw the player piece
-            player.draw(self.screen, position, size)
+        # Draw the dialog on top of anything drawn over it
+        self.dirty_rects.extend(self.dialogs.draw(self.dirty_rects))
 
-        # Redraw the dice
-        self.dice.draw(self.screen)
+    def draw_text(self, text):
+        """
+        Method Name:
+        draw_text
+
+        Description:
+        Draw the text telling the active player it is their turn
+
+        Inputs:
+        text - (player name, player piece number)
+
+        Outputs:
+        None
+        """
+
+        # Clear the old text
+        for rect in self.text_rects:
+            self.screen.fill((0, 0, 0), rect)
+        self.dirty_rects.extend(self.text_rects)
 
         # Figure out the starting coordinates for the upper left
         # empty quadrant
@@ -356,69 +506,208 @@ class GameBoard:
         y += height
 
         # Generate the text for the active player
-        temp = self.players[self.player].get_name()
+        temp = text[0]
 
         # Add the text to the screen
-        text1 = self.font.render(temp, True, (255, 255, 255))
-        self.screen.blit(text1, (x, y))
+        text1 = Assets.render_text(temp, (255, 255, 255), self.font)
+        rect1 = self.screen.blit(text1, (x, y))
 
         # Also, need to tell the player which piece they are
-        temp = "Player Piece #%d" % (self.player+1)
+        temp = "Player Piece #%d" % text[1]
 
         # Add the text to the screen
-        text2 = self.font.render(temp, True, (255, 255, 255))
-        self.screen.blit(text2, (x, y + text1.get_height()))
+        text2 = Assets.render_text(temp, (255, 255, 255), self.font)
+        rect2 = self.screen.blit(text2, (x, y + text1.get_height()))
+
+        # Remember what was drawn
+        self.text = text
+        self.text_rects = [rect1, rect2]
+        self.dirty_rects.extend(self.text_rects)
+
+    def redraw(self):
+        """
+        Method Name:
+        redraw
+
+        Description:
+        Draw the whole board again (e.g., after the window was covered)
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.full_redraw = True
+        self.draw()
+
+    def get_dirty_rects(self):
+        """
+        Method Name:
+        get_dirty_rects
 
-    def execute(self, clicked):
+        Description:
+        Get the parts of the screen that have changed since the last call
+
+        Inputs:
+        None
+
+        Outputs:
+        List of rectangles to update on the display
+        """
+
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
+
+    def handle_event(self, event):
+        """
+        Method Name:
+        handle_event
+
+        Description:
+        Give an event to the dialogs over the board
+
+        Inputs:
+        event - pygame event
+
+        Outputs:
+        True if the event was used by a dialog (the board should ignore it)
+        """
+
+        return self.dialogs.handle_event(event)
+
+    def execute(self, clicked, pos=None):
         """
         Method Name:
         execute
 
         Description:
         If the mouse is clicked it will determine if the user selected a
-        valid tile.
+        valid tile.  Clicks are ignored while a dialog is open.
 
         Inputs:
         clicked - flag to indicate if the screen was clicked
+        pos - optional clicked coordinate tuple (x, y) in pixels (defaults
+              to where the mouse is)
 
         Outputs:
         Name of the game winner
         """
 
         # If the mouse is clicked we need to see if we recognize
-        # what was clicked
-        if clicked is True:
+        # what was clicked.  The computer players take their own turns.
+        if ((clicked is True) and not self.dialogs.is_open() and
+                (self.game.player not in self.computers)):
 
             # Get the mouse position
-            pos = pygame.mouse.get_pos()
+            if pos is None:
+                pos = pygame.mouse.get_pos()
 
             # Check if the dice was clicked
             roll = self.dice.clicked(pos)
             if roll != 0:
+                self.roll(roll)
+
+            else:
+
+                # Find the tile under the mouse
+                location = Tiles.find_tile(self.board, self.tile_size, pos)
+                if location is not None:
+
+                    # Get the tile clicked status
+                    (row, col) = location
+                    is_clicked = self.board[row][col].clicked(pos)
+
+                    # If clicked, move the player
+                    if is_clicked:
+                        self.update(row, col)
+
+        # Save the game once a turn is over
+        turn = (self.game.turns, self.game.get_state())
+        if ((self.save_file is not None) and (turn != self.saved_turn) and
+                (turn[1] in (Engine.ROLL, Engine.OVER))):
+            self.save_file.save(self)
+            self.saved_turn = turn
+
+        # Redraw the board (and whatever a dialog answered since the last
+        # call changed)
+        self.draw()
+
+        return self.get_winner()
+
+    def roll(self, value=None):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Roll the dice and activate the tiles the player can move to
+
+        Inputs:
+        value - optional dice roll value (the dice are thrown if not
+                given)
+
+        Outputs:
+        None
+        """
+
+        # Find the tiles the player can move to (a server rolls the dice
+        # itself)
+        roll = self.game.roll(value)
+
+        # Read the rest of the questions while the player picks a tile
+        self.questions.warm()
+
+        # Activate/Deactivate tiles
+        pos = self.game.get_player().get_location()
+        self.update_tiles(pos, roll)
+
+    def is_computer_turn(self):
+        """
+        Method Name:
+        is_computer_turn
+
+        Description:
+        Determine if a computer player has something to do
+
+        Inputs:
+        None
+
+        Outputs:
+        True if it is a computer player's turn and no dialog is open
+        """
+
+        return ((self.game.player in self.computers) and
+                (self.game.get_state() != Engine.OVER) and
+                not self.dialogs.is_open())
 
-                # Activate/Deactivate tiles
-                pos = self.players[self.player].get_location()
-                self.update_tiles(pos, 0, 0, roll)
+    def play_computer(self):
+        """
+        Method Name:
+        play_computer
 
-                # Redraw the board
-                self.draw()
+        Description:
+        Take the next step of a computer player's turn: roll the dice, or
+        search for the tile to move to and move there
 
-                # Save some processing and just quit this function
-                return None
+        Inputs:
+        None
 
-            # Loop through all of the tiles on the game board
-            for row in range(len(self.board)):
-                for col in range(len(self.board[row])):
-                    if self.board[row][col] is not None:
+        Outputs:
+        None
+        """
 
-                        # Get the tile clicked status
-                        is_clicked = \
-                            self.board[row][col].clicked(pos)
+        if not self.is_computer_turn():
+            return
 
-                        # If clicked, set the text to display
-                        if is_clicked:
+        if self.game.get_state() == Engine.ROLL:
+            self.roll()
 
-                            return self.update(row, col)
+        elif self.game.get_state() == Engine.MOVE:
+            (row, col) = self.computer.choose_move(self.get_state())
+            self.update(row, col)
 
     def update(self, row, col):
         """
@@ -426,78 +715,225 @@ class GameBoard:
         update
 
         Description:
-        Update the game board based on if the player answers the
-        question correctly
+        Move the player to the selected tile and start asking them a
+        question
 
         Inputs:
         (row, col) - location of the selected game board tile
 
         Outputs:
-        Name of the game winner
+        None
         """
 
-        # Assume not the end of the game
-        winner = None
-
-        # Grab the tile type / question category
-        tile_type = self.board[row][col].get_type()
-        question_category = tile_type
-
         # Move the player piece
-        self.players[self.player].set_location((row, col))
+        self.game.move((row, col))
 
         # If it is a hub tile, we need to select the
         # question category
-        if tile_type == "Hub":
+        if self.game.get_state() == Engine.CATEGORY:
+            self.ask_category()
+
+        else:
+            self.ask()
+
+    def ask_category(self):
+        """
+        Method Name:
+        ask_category
+
+        Description:
+        Ask for the question category when the player is on the hub
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        # A computer player picks for itself, unless it can win and there
+        # are other players to pick for it
+        player = self.game.get_player()
+        if ((self.game.player in self.computers) and
+                not (player.can_win() and
+                     (len(self.computers) < len(self.players)))):
+            self.choose_category(self.computer.choose_category(self.game))
+            return
+
+        # If the player can win, the other players
+        # select the category for the active player
+        text = ""
+        if player.can_win():
+            text = "Other Players, "
+
+        # Generate the text to select a question category
+        text += "Please select a question category:"
+
+        # Display the prompt to the user
+        self.dialogs.confirm(text, "Category?", Engine.CATEGORIES,
+                             self.choose_category)
+
+    def choose_category(self, question_category):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Ask a question from the category picked in the category dialog
+
+        Inputs:
+        question_category - question category
+
+        Outputs:
+        None
+        """
 
-            # If the player can win, the other players
-            # select the category for the active player
-            text = ""
-            if self.players[self.player].can_win():
-                text = "Other Players, "
+        self.game.choose_category(question_category)
+        self.ask()
 
-            # Generate the text to select a question category
-            text += "Please select a question category:\n"
+    def ask(self):
+        """
+        Method Name:
+        ask
 
-            # Configure the buttons
-            buttons = ["People", "Events", "Places", "Holidays"]
+        Description:
+        Ask the player a question, unless they landed on a roll again tile
 
-            # Display the prompt to the user
-            question_category = pymsgbox.confirm(text, "Category?", buttons)
+        Inputs:
+        None
 
-        # If not a roll again tile, ask the player a question
-        correct_answer = True
-        if tile_type != "Roll Again":
+        Outputs:
+        None
+        """
 
-            # Display the question
-            correct_answer = self.questions.ask(question_category)
+        # If not a roll again tile, ask the player a question.  The
+        # computer players answer by how likely they are to be right.
+        if self.game.get_state() == Engine.ANSWER:
+            if self.game.player in self.computers:
+                self.answer(self.computer.answer(self.game))
+            else:
+                self.questions.ask(self.game.get_category(), self.dialogs,
+                                   self.answer, self.log)
 
-        # If the player answers incorrectly, move to the next player
-        if correct_answer is False:
+        else:
+            self.reset()
 
-            # Move next player
-            self.player = (self.player + 1) % len(self.players)
+    def answer(self, correct_answer):
+        """
+        Method Name:
+        answer
 
-        # If the tile is a headquarter
-        elif self.board[row][col].get_headquarter() is True:
+        Description:
+        Update the game board based on if the player answered the
+        question correctly
 
-            # Add the scoring wedge
-            self.players[self.player].add_wedge(self.board[row][col].get_type())
+        Inputs:
+        correct_answer - True if the question was answered correctly
 
-        # If it is a hub and the player can win the game
-        if (tile_type == "Hub") and self.players[self.player].can_win():
+        Outputs:
+        None
+        """
 
-                # Set the game winner
-                winner = self.players[self.player].get_name()
+        self.game.answer(correct_answer)
 
         # Reset the board
         self.reset()
 
-        # Redraw the board
-        self.draw()
+    def get_state(self):
+        """
+        Method Name:
+        get_state
+
+        Description:
+        Get the packed state of the game
+
+        Inputs:
+        None
+
+        Outputs:
+        GameState.GameState object
+        """
+
+        return GameState.pack_state(self.game)
+
+    def set_state(self, state):
+        """
+        Method Name:
+        set_state
+
+        Description:
+        Put the game into a packed state.  The open dialogs are closed,
+        the tiles the player can move to are activated and the category
+        or question dialog is opened if the state is waiting for one.
+
+        Inputs:
+        state - GameState.GameState object
+
+        Outputs:
+        None
+        """
+
+        # The server decides the state of its games
+        if not isinstance(self.game, Engine.Game):
+            raise ValueError("Can not change a game played on a server")
+
+        # Put the pieces and the turn back
+        state.restore(self.game)
+        if self.log is not None:
+            self.log.snapshot(self.game)
+
+        # Throw away what the old turn was waiting for
+        self.dialogs.clear()
+        for (row, col) in self.active_tiles:
+            self.board[row][col].deactivate()
+        self.touched_tiles.update(self.active_tiles)
+        self.active_tiles.clear()
+
+        # Show what the new turn is waiting for
+        if self.game.get_state() == Engine.MOVE:
+            location = self.game.get_player().get_location()
+            self.update_tiles(location, self.dice.get_roll())
+        elif self.game.get_state() == Engine.CATEGORY:
+            self.ask_category()
+        elif self.game.get_state() == Engine.ANSWER:
+            self.ask()
+
+    def get_seed(self):
+        """
+        Method Name:
+        get_seed
+
+        Description:
+        Get the random seed of the game, to play it again
+
+        Inputs:
+        None
+
+        Outputs:
+        Seed
+        """
+
+        return self.streams.get_seed()
+
+    def get_winner(self):
+        """
+        Method Name:
+        get_winner
+
+        Description:
+        Get the name of the game winner
+
+        Inputs:
+        None
+
+        Outputs:
+        Name of the game winner, or None
+        """
+
+        if self.game.get_winner() is None:
+            return None
 
-        # Return the status
-        return winner
+        return self.game.get_winner().get_name()
 
 
 ################################################################################
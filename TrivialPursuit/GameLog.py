@@ -0,0 +1,712 @@
+"""
+Module:
+GameLog.py
+
+Author:
+Mark Nauman
+
+Description:
+Binary event log of a game, to check what happened in it afterwards.
+Every dice roll, tile picked, question category, question drawn, answer
+picked and answer result is appended to the log as it happens.  Every
+few dice rolls a snapshot of the packed game state (GameState) is
+written as well, so the state at any turn can be found by restoring the
+last snapshot before it and playing the few events after it through an
+Engine.Game, instead of playing the whole game again.
+
+Check a log with "python GameLog.py game.log [turn ...]".
+
+Log layout (little endian):
+    Header   magic "TPGL", version (H), board layout checksum (I),
+             dice rolls between snapshots (H)
+    Events   type (B), payload length (H), payload
+
+Event payloads:
+    START     dice rolls so far (I), packed state (GameState.to_bytes)
+    SNAPSHOT  dice rolls so far (I), packed state (GameState.to_bytes)
+    ROLL      dice roll value (B)
+    MOVE      row (B), column (B)
+    CATEGORY  category number (B, in Engine.CATEGORIES)
+    QUESTION  category number (B), number of the correct answer (B), then
+              the UTF-8 question and answer texts separated by NUL
+              characters
+    PICK      number of the answer picked (B)
+    ANSWER    1 if answered correctly (B)
+
+A log cut short (e.g., the game crashed while writing it) is read up to
+the last whole event.  A saved game carried on later (see SaveGame) is
+appended to the log it was logged to: a START event with the restored
+state begins the new part, and anything logged after the save that was
+loaded is left in the log but is not part of the game any more.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import bisect
+import os
+import random
+import struct
+import sys
+import time
+import Engine
+import GameState
+
+################################################################################
+# Variables
+################################################################################
+
+# File extension used for game logs
+EXTENSION = ".log"
+
+# Log format identification
+MAGIC = "TPGL"
+VERSION = 1
+
+# Event types
+START = 1
+SNAPSHOT = 2
+ROLL = 3
+MOVE = 4
+CATEGORY = 5
+QUESTION = 6
+PICK = 7
+ANSWER = 8
+
+# Event type names, for printing a log
+EVENT_NAMES = {START: "start", SNAPSHOT: "snapshot", ROLL: "roll",
+               MOVE: "move", CATEGORY: "category", QUESTION: "question",
+               PICK: "pick", ANSWER: "answer"}
+
+# Binary layouts
+HEADER = struct.Struct("<4sHIH")
+EVENT = struct.Struct("<BH")
+TURNS = struct.Struct("<I")
+BYTE = struct.Struct("<B")
+LOCATION = struct.Struct("<BB")
+CARD = struct.Struct("<BB")
+
+# Largest payload an event can hold
+MAX_PAYLOAD = 65535
+
+# Separator between the text fields of a question
+SEPARATOR = "\0"
+
+# Dice rolls between snapshots
+SNAPSHOT_INTERVAL = 32
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Writer:
+    """
+    Class Name:
+    Writer
+
+    Base Class:
+    None
+
+    Description:
+    Define the class appending the events of a game to a log.  The game
+    calls it for every action once it is its log (see attach).
+    """
+
+    def __init__(self, file_name, board, interval=SNAPSHOT_INTERVAL,
+                 append=False):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Create the log file and write its header, or open an old log to
+        add to
+
+        Inputs:
+        file_name - log file name
+        board - Engine.Board object the game is played on
+        interval - dice rolls between snapshots (an old log keeps its own)
+        append - True to add to an old log (e.g., when a saved game
+                 carries on), False to replace it
+
+        Outputs:
+        None
+        """
+
+        if append and os.path.exists(file_name):
+            self.output = open(file_name, "r+b")
+            data = self.output.read()
+            self.interval = check_header(data, file_name, board)
+
+            # Drop an event cut short, so the new events follow the last
+            # whole one
+            self.output.seek(split_events(data)[1])
+            self.output.truncate()
+        else:
+            self.interval = interval
+            self.output = open(file_name, "wb")
+            self.output.write(HEADER.pack(MAGIC, VERSION,
+                                          board.get_checksum(), interval))
+
+    def attach(self, game):
+        """
+        Method Name:
+        attach
+
+        Description:
+        Start logging a game.  The state it is in is written first, so a
+        game can be logged from the middle (e.g., once it is restored,
+        which has to be done before it is attached).
+
+        Inputs:
+        game - Engine.Game object
+
+        Outputs:
+        None
+        """
+
+        game.log = self
+        self.write(START, TURNS.pack(game.turns) +
+                   GameState.pack_state(game).to_bytes())
+        self.output.flush()
+
+    def snapshot(self, game):
+        """
+        Method Name:
+        snapshot
+
+        Description:
+        Write the state the game is in (e.g., after it is put into a saved
+        state)
+
+        Inputs:
+        game - Engine.Game object
+
+        Outputs:
+        None
+        """
+
+        self.write(SNAPSHOT, TURNS.pack(game.turns) +
+                   GameState.pack_state(game).to_bytes())
+
+    def roll(self, game, value):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Write a dice roll.  Every interval dice rolls, the state the game
+        was in before the roll is written first.
+
+        Inputs:
+        game - Engine.Game object about to move on to the roll
+        value - dice roll value
+
+        Outputs:
+        None
+        """
+
+        if (game.turns > 0) and (game.turns % self.interval == 0):
+            state = GameState.pack_state(game).replace_turn(Engine.ROLL,
+                                                            game.player)
+            self.write(SNAPSHOT, TURNS.pack(game.turns) + state.to_bytes())
+            self.output.flush()
+
+        self.write(ROLL, BYTE.pack(value))
+
+    def move(self, (row, col)):
+        """
+        Method Name:
+        move
+
+        Description:
+        Write the tile the player moved to
+
+        Inputs:
+        (row, col) - board location
+
+        Outputs:
+        None
+        """
+
+        self.write(MOVE, LOCATION.pack(row, col))
+
+    def choose_category(self, category):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Write the question category picked on the hub
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        None
+        """
+
+        self.write(CATEGORY, BYTE.pack(Engine.CATEGORIES.index(category)))
+
+    def question(self, category, question_text, answers, correct):
+        """
+        Method Name:
+        question
+
+        Description:
+        Write the question card drawn
+
+        Inputs:
+        category - question category
+        question_text - question text
+        answers - list of answer text, in the order they were shown
+        correct - number of the correct answer (from 0)
+
+        Outputs:
+        None
+        """
+
+        texts = []
+        for text in [question_text] + list(answers):
+            if isinstance(text, unicode):
+                text = text.encode("utf-8")
+            texts.append(text)
+
+        self.write(QUESTION,
+                   CARD.pack(Engine.CATEGORIES.index(category), correct) +
+                   SEPARATOR.join(texts))
+
+    def pick(self, number):
+        """
+        Method Name:
+        pick
+
+        Description:
+        Write the answer the player picked
+
+        Inputs:
+        number - number of the answer picked (from 0)
+
+        Outputs:
+        None
+        """
+
+        self.write(PICK, BYTE.pack(number))
+
+    def answer(self, correct):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Write if the question was answered correctly.  This is the end of
+        a question, so the log is flushed.
+
+        Inputs:
+        correct - True if the question was answered correctly
+
+        Outputs:
+        None
+        """
+
+        self.write(ANSWER, BYTE.pack(correct is True))
+        self.output.flush()
+
+    def write(self, event_type, payload):
+        """
+        Method Name:
+        write
+
+        Description:
+        Append an event
+
+        Inputs:
+        event_type - event type
+        payload - event payload bytes
+
+        Outputs:
+        None
+        """
+
+        if len(payload) > MAX_PAYLOAD:
+            raise ValueError("Event of %d bytes is too long" % len(payload))
+
+        self.output.write(EVENT.pack(event_type, len(payload)) + payload)
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Close the log file
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.output.close()
+
+
+class Replay:
+    """
+    Class Name:
+    Replay
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for reading a log back.  The events are read once
+    and the states are found by folding them into an Engine.Game from the
+    nearest snapshot.
+    """
+
+    def __init__(self, file_name, board=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Read the log and index its snapshots and dice rolls
+
+        Inputs:
+        file_name - log file name
+        board - optional Engine.Board object the game was played on
+                (defaults to the stock board)
+
+        Outputs:
+        None
+        """
+
+        if board is None:
+            board = Engine.Board()
+        self.board = board
+
+        with open(file_name, "rb") as log_file:
+            data = log_file.read()
+        self.interval = check_header(data, file_name, board)
+
+        # Decode the events [(event type, value), ...], with the events
+        # the snapshots are at and the event each dice roll is at
+        self.events = []
+        self.snapshots = []
+        self.snapshot_turns = []
+        self.rolls = []
+        for (event_type, payload) in split_events(data)[0]:
+            value = decode(event_type, payload)
+
+            if event_type in (START, SNAPSHOT):
+                (turns, state) = value
+
+                # A game carrying on from an older save drops the
+                # snapshots logged after that save
+                if event_type == START:
+                    while (len(self.snapshot_turns) > 0 and
+                           turns < self.snapshot_turns[-1]):
+                        self.snapshots.pop()
+                        self.snapshot_turns.pop()
+                if (len(self.snapshot_turns) > 0 and
+                        turns < self.snapshot_turns[-1]):
+                    raise ValueError("Snapshot of turn %d is out of order" %
+                                     turns)
+                self.snapshots.append(len(self.events))
+                self.snapshot_turns.append(turns)
+            elif event_type == ROLL:
+                self.rolls.append(len(self.events))
+
+            self.events.append((event_type, value))
+
+        if len(self.snapshots) == 0 or self.snapshots[0] != 0:
+            raise ValueError("%s does not start with a game state" %
+                             file_name)
+
+        # The game the events are folded into
+        (turns, state) = self.events[0][1]
+        players = [Engine.Player(number + 1, board.get_hub())
+                   for number in range(state.get_num_players())]
+        self.game = Engine.Game(board, players, Engine.Dice(),
+                                random.Random(0))
+
+    def get_turns(self):
+        """
+        Method Name:
+        get_turns
+
+        Description:
+        Get the number of dice rolls in the log
+
+        Inputs:
+        None
+
+        Outputs:
+        Dice rolls so far at the end of the log
+        """
+
+        # The dice rolls of the last snapshot and the ones after it
+        start = self.snapshots[-1]
+        return (self.snapshot_turns[-1] + len(self.rolls) -
+                bisect.bisect_right(self.rolls, start))
+
+    def get_state(self, turn=None):
+        """
+        Method Name:
+        get_state
+
+        Description:
+        Find the state of the game at the end of a turn, i.e., after the
+        dice have been rolled turn times and before they are rolled again
+
+        Inputs:
+        turn - number of dice rolls (defaults to the end of the log)
+
+        Outputs:
+        GameState.GameState object
+        """
+
+        if turn is None:
+            turn = self.get_turns()
+
+        # Start from the last snapshot at or before the turn
+        number = bisect.bisect_right(self.snapshot_turns, turn) - 1
+        if number < 0:
+            raise ValueError("Turn %d is before the log starts" % turn)
+        start = self.snapshots[number]
+        (turns, state) = self.events[start][1]
+        game = self.game
+        state.restore(game)
+        game.turns = turns
+
+        # Fold the events after it up to the next dice roll, or to the
+        # game carrying on from a save
+        for (event_type, value) in self.events[start + 1:]:
+            if event_type == START:
+                break
+            elif event_type == ROLL:
+                if game.turns == turn:
+                    break
+                game.roll(value)
+            elif event_type == MOVE:
+                game.move(value)
+            elif event_type == CATEGORY:
+                game.choose_category(value)
+            elif event_type == ANSWER:
+                game.answer(value)
+
+        return GameState.pack_state(game)
+
+    def get_events(self, turn):
+        """
+        Method Name:
+        get_events
+
+        Description:
+        Get the events of a turn: the dice roll and everything up to the
+        next dice roll
+
+        Inputs:
+        turn - dice roll number (from 1)
+
+        Outputs:
+        List of (event type, value)
+        """
+
+        # Count the dice rolls from the last snapshot before the turn
+        snapshot = bisect.bisect_right(self.snapshot_turns, turn - 1) - 1
+        if snapshot < 0:
+            raise ValueError("Turn %d is not in the log" % turn)
+        start = self.snapshots[snapshot]
+        number = (bisect.bisect_right(self.rolls, start) + turn - 1 -
+                  self.snapshot_turns[snapshot])
+
+        # The roll has to come before the game carries on from a save
+        end = len(self.events)
+        for later in self.snapshots[snapshot + 1:]:
+            if self.events[later][0] == START:
+                end = later
+                break
+        if (number >= len(self.rolls)) or (self.rolls[number] >= end):
+            raise ValueError("Turn %d is not in the log" % turn)
+
+        if (number + 1 < len(self.rolls)) and (self.rolls[number + 1] < end):
+            end = self.rolls[number + 1]
+
+        return [event for event in self.events[self.rolls[number]:end]
+                if event[0] != SNAPSHOT]
+
+    def __len__(self):
+        """
+        Method Name:
+        __len__
+
+        Description:
+        Get the number of events in the log
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of events
+        """
+
+        return len(self.events)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def check_header(data, file_name, board):
+    """
+    Function Name:
+    check_header
+
+    Description:
+    Check the header of a log
+
+    Inputs:
+    data - log bytes
+    file_name - log file name (for the errors)
+    board - Engine.Board object the game is played on
+
+    Outputs:
+    Dice rolls between snapshots
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError("%s is not a game log" % file_name)
+    (magic, version, checksum, interval) = HEADER.unpack_from(data, 0)
+    if (magic != MAGIC) or (version != VERSION):
+        raise ValueError("%s is not a version %d game log" %
+                         (file_name, VERSION))
+    if checksum != board.get_checksum():
+        raise ValueError("%s was played on another board" % file_name)
+
+    return interval
+
+
+def split_events(data):
+    """
+    Function Name:
+    split_events
+
+    Description:
+    Split the events of a log, up to the last whole event
+
+    Inputs:
+    data - log bytes
+
+    Outputs:
+    ([(event type, payload bytes), ...], offset of the end of the last
+    whole event)
+    """
+
+    events = []
+    offset = HEADER.size
+    while len(data) - offset >= EVENT.size:
+        (event_type, length) = EVENT.unpack_from(data, offset)
+        if len(data) - offset - EVENT.size < length:
+            break
+        offset += EVENT.size
+        events.append((event_type, data[offset:offset + length]))
+        offset += length
+
+    return (events, offset)
+
+
+def decode(event_type, payload):
+    """
+    Function Name:
+    decode
+
+    Description:
+    Decode the payload of an event
+
+    Inputs:
+    event_type - event type
+    payload - event payload bytes
+
+    Outputs:
+    Event value: (dice rolls, GameState) for START and SNAPSHOT, the roll
+    value, (row, col), category, (category, question text, list of
+    answer text, number of the correct answer), answer number picked, or
+    True/False if answered correctly
+    """
+
+    if event_type in (START, SNAPSHOT):
+        return (TURNS.unpack_from(payload, 0)[0],
+                GameState.from_bytes(payload[TURNS.size:]))
+    elif event_type in (ROLL, PICK):
+        return BYTE.unpack(payload)[0]
+    elif event_type == MOVE:
+        return LOCATION.unpack(payload)
+    elif event_type == CATEGORY:
+        return Engine.CATEGORIES[BYTE.unpack(payload)[0]]
+    elif event_type == QUESTION:
+        (category, correct) = CARD.unpack_from(payload, 0)
+        texts = payload[CARD.size:].split(SEPARATOR)
+        return (Engine.CATEGORIES[category], texts[0], texts[1:], correct)
+    elif event_type == ANSWER:
+        return BYTE.unpack(payload)[0] == 1
+
+    raise ValueError("Unknown event type %d" % event_type)
+
+
+def describe(event_type, value):
+    """
+    Function Name:
+    describe
+
+    Description:
+    Describe an event for printing
+
+    Inputs:
+    event_type - event type
+    value - decoded event value
+
+    Outputs:
+    Text
+    """
+
+    if event_type in (START, SNAPSHOT):
+        return "%-9s turn %d %r" % ((EVENT_NAMES[event_type],) + value)
+    elif event_type == QUESTION:
+        (category, question_text, answers, correct) = value
+        return "%-9s %s: %s [%s]" % (EVENT_NAMES[event_type], category,
+                                     question_text, answers[correct])
+
+    return "%-9s %s" % (EVENT_NAMES[event_type], value)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print "Usage: python GameLog.py game.log [turn ...]"
+        sys.exit(1)
+
+    start = time.time()
+    replay = Replay(sys.argv[1])
+    print "%d events, %d dice rolls, read in %.2fms" % \
+        (len(replay), replay.get_turns(), (time.time() - start) * 1e3)
+
+    # Show the turns asked for, or the state the game ended in
+    if len(sys.argv) == 2:
+        print "end: %r" % replay.get_state()
+    for turn in [int(arg) for arg in sys.argv[2:]]:
+        start = time.time()
+        state = replay.get_state(turn)
+        print "turn %d: %r (%.2fms)" % (turn, state,
+                                        (time.time() - start) * 1e3)
+        if turn > 0:
+            for (event_type, value) in replay.get_events(turn):
+                print "    %s" % describe(event_type, value)
@@ -0,0 +1,563 @@
+"""
+Module:
+GameState.py
+
+Author:
+Mark Nauman
+
+Description:
+Compact game state for the AI search, caches and the network.  The whole
+state is packed in one integer: the turn state, the active player, the
+dice roll, the question category and, for every player, the board
+location and a 4 bit wedge mask.  A GameState is never changed once it
+is made, so copying it is free and it can be hashed, compared and used
+as a dictionary key as cheaply as the integer.
+
+Bits from the lowest up:
+    3  turn state (number in STATES)
+    4  active player
+    3  dice roll (zero if not rolled)
+    3  question category (number in Engine.CATEGORIES plus one, zero if
+       none)
+    4  number of players
+    then for every player, the first player lowest:
+    8  row
+    8  column
+    4  wedges (bit N for Engine.CATEGORIES[N])
+
+The tiles a player can move to are not stored.  They are looked up from
+the location and roll again when the state is restored.  Neither are the
+player names or the number of turns played.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import binascii
+import Engine
+
+################################################################################
+# Variables
+################################################################################
+
+# Turn states in the order they are numbered
+STATES = [Engine.ROLL, Engine.MOVE, Engine.CATEGORY, Engine.ANSWER,
+          Engine.OVER]
+
+# Field sizes in bits
+STATE_BITS = 3
+PLAYER_BITS = 4
+ROLL_BITS = 3
+CATEGORY_BITS = 3
+COUNT_BITS = 4
+ROW_BITS = 8
+COL_BITS = 8
+WEDGE_BITS = len(Engine.CATEGORIES)
+
+# Where the fields start
+PLAYER_SHIFT = STATE_BITS
+ROLL_SHIFT = PLAYER_SHIFT + PLAYER_BITS
+CATEGORY_SHIFT = ROLL_SHIFT + ROLL_BITS
+COUNT_SHIFT = CATEGORY_SHIFT + CATEGORY_BITS
+PLAYERS_SHIFT = COUNT_SHIFT + COUNT_BITS
+
+# Where the fields start inside the bits of a player
+COL_SHIFT = ROW_BITS
+WEDGE_SHIFT = COL_SHIFT + COL_BITS
+PIECE_BITS = WEDGE_SHIFT + WEDGE_BITS
+
+# Most players a state can hold
+MAX_PLAYERS = (1 << COUNT_BITS) - 1
+
+################################################################################
+# Classes
+################################################################################
+
+
+class GameState:
+    """
+    Class Name:
+    GameState
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a packed game state.  Never changed once made;
+    the replace methods make a new state instead.
+    """
+
+    def __init__(self, value):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Wrap a packed state (see pack_state to make one)
+
+        Inputs:
+        value - packed state integer
+
+        Outputs:
+        None
+        """
+
+        self.value = value
+        self.hash = hash(value)
+
+    def __hash__(self):
+        """
+        Method Name:
+        __hash__
+
+        Description:
+        Hash the state
+
+        Inputs:
+        None
+
+        Outputs:
+        Hash value
+        """
+
+        return self.hash
+
+    def __eq__(self, other):
+        """
+        Method Name:
+        __eq__
+
+        Description:
+        Determine if two states are the same
+
+        Inputs:
+        other - object to compare with
+
+        Outputs:
+        True if other is a GameState with the same value
+        """
+
+        return (isinstance(other, GameState) and
+                (self.value == other.value))
+
+    def __ne__(self, other):
+        """
+        Method Name:
+        __ne__
+
+        Description:
+        Determine if two states are different
+
+        Inputs:
+        other - object to compare with
+
+        Outputs:
+        True if other is not a GameState with the same value
+        """
+
+        return not self.__eq__(other)
+
+    def __copy__(self):
+        """
+        Method Name:
+        __copy__
+
+        Description:
+        Copy the state.  It never changes, so the copy is itself.
+
+        Inputs:
+        None
+
+        Outputs:
+        self
+        """
+
+        return self
+
+    def __deepcopy__(self, memo):
+        """
+        Method Name:
+        __deepcopy__
+
+        Description:
+        Copy the state.  It never changes, so the copy is itself.
+
+        Inputs:
+        memo - objects already copied
+
+        Outputs:
+        self
+        """
+
+        return self
+
+    def __repr__(self):
+        """
+        Method Name:
+        __repr__
+
+        Description:
+        Describe the state
+
+        Inputs:
+        None
+
+        Outputs:
+        Text
+        """
+
+        return "GameState(%#x)" % self.value
+
+    def get_field(self, shift, bits):
+        """
+        Method Name:
+        get_field
+
+        Description:
+        Get a field out of the packed state
+
+        Inputs:
+        shift - lowest bit of the field
+        bits - size of the field in bits
+
+        Outputs:
+        Field value
+        """
+
+        return int((self.value >> shift) & ((1 << bits) - 1))
+
+    def get_state(self):
+        """
+        Method Name:
+        get_state
+
+        Description:
+        Get the turn state
+
+        Inputs:
+        None
+
+        Outputs:
+        Turn state (Engine.ROLL, ...)
+        """
+
+        return STATES[self.get_field(0, STATE_BITS)]
+
+    def get_player(self):
+        """
+        Method Name:
+        get_player
+
+        Description:
+        Get the active player
+
+        Inputs:
+        None
+
+        Outputs:
+        Active player number (from 0)
+        """
+
+        return self.get_field(PLAYER_SHIFT, PLAYER_BITS)
+
+    def get_roll(self):
+        """
+        Method Name:
+        get_roll
+
+        Description:
+        Get the dice roll
+
+        Inputs:
+        None
+
+        Outputs:
+        Dice roll value (zero if not rolled)
+        """
+
+        return self.get_field(ROLL_SHIFT, ROLL_BITS)
+
+    def get_category(self):
+        """
+        Method Name:
+        get_category
+
+        Description:
+        Get the category of the question being asked
+
+        Inputs:
+        None
+
+        Outputs:
+        Question category, or None
+        """
+
+        category = self.get_field(CATEGORY_SHIFT, CATEGORY_BITS)
+        if category == 0:
+            return None
+
+        return Engine.CATEGORIES[category - 1]
+
+    def get_num_players(self):
+        """
+        Method Name:
+        get_num_players
+
+        Description:
+        Get the number of players
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of players
+        """
+
+        return self.get_field(COUNT_SHIFT, COUNT_BITS)
+
+    def get_location(self, number):
+        """
+        Method Name:
+        get_location
+
+        Description:
+        Get the location of a player
+
+        Inputs:
+        number - player number (from 0)
+
+        Outputs:
+        Location tuple (row, col)
+        """
+
+        shift = PLAYERS_SHIFT + number * PIECE_BITS
+        return (self.get_field(shift, ROW_BITS),
+                self.get_field(shift + COL_SHIFT, COL_BITS))
+
+    def get_wedges(self, number):
+        """
+        Method Name:
+        get_wedges
+
+        Description:
+        Get the scoring wedges of a player
+
+        Inputs:
+        number - player number (from 0)
+
+        Outputs:
+        Wedge bitmask (bit N for Engine.CATEGORIES[N])
+        """
+
+        shift = PLAYERS_SHIFT + number * PIECE_BITS + WEDGE_SHIFT
+        return self.get_field(shift, WEDGE_BITS)
+
+    def replace_player(self, number, location, wedges):
+        """
+        Method Name:
+        replace_player
+
+        Description:
+        Make a state with a player somewhere else or with other wedges
+
+        Inputs:
+        number - player number (from 0)
+        location - location tuple (row, col)
+        wedges - wedge bitmask
+
+        Outputs:
+        New GameState object
+        """
+
+        shift = PLAYERS_SHIFT + number * PIECE_BITS
+        value = self.value & ~(((1 << PIECE_BITS) - 1) << shift)
+        return GameState(value | (pack_piece(location, wedges) << shift))
+
+    def replace_turn(self, state, player, roll=0, category=None):
+        """
+        Method Name:
+        replace_turn
+
+        Description:
+        Make a state at another point of the turn
+
+        Inputs:
+        state - turn state (Engine.ROLL, ...)
+        player - active player number (from 0)
+        roll - dice roll value (zero if not rolled)
+        category - question category, or None
+
+        Outputs:
+        New GameState object
+        """
+
+        value = self.value & ~((1 << COUNT_SHIFT) - 1)
+        return GameState(value | pack_turn(state, player, roll, category))
+
+    def to_bytes(self):
+        """
+        Method Name:
+        to_bytes
+
+        Description:
+        Get the state as bytes (e.g., to send it over the network)
+
+        Inputs:
+        None
+
+        Outputs:
+        Bytes, most significant first
+        """
+
+        bits = PLAYERS_SHIFT + self.get_num_players() * PIECE_BITS
+        length = (bits + 7) / 8
+        return binascii.unhexlify("%0*x" % (length * 2, self.value))
+
+    def restore(self, game):
+        """
+        Method Name:
+        restore
+
+        Description:
+        Put a game back into this state.  Only the pieces that differ are
+        changed, so the views over them only draw what changed.
+
+        Inputs:
+        game - Engine.Game object with the same number of players
+
+        Outputs:
+        None
+        """
+
+        if len(game.players) != self.get_num_players():
+            raise ValueError("State has %d players, game has %d" %
+                             (self.get_num_players(), len(game.players)))
+
+        for (number, player) in enumerate(game.players):
+            location = self.get_location(number)
+            if player.get_location() != location:
+                player.set_location(location)
+            wedges = self.get_wedges(number)
+            if player.get_wedges() != wedges:
+                player.set_wedges(wedges)
+
+        game.dice.set_roll(self.get_roll())
+        game.set_turn(self.get_state(), self.get_player(),
+                      self.get_category())
+
+################################################################################
+# Functions
+################################################################################
+
+
+def pack_piece((row, col), wedges):
+    """
+    Function Name:
+    pack_piece
+
+    Description:
+    Pack the bits of a player
+
+    Inputs:
+    (row, col) - player location
+    wedges - wedge bitmask
+
+    Outputs:
+    Packed player bits
+    """
+
+    if (row >> ROW_BITS) or (col >> COL_BITS):
+        raise ValueError("Location %s is too far to pack" % ((row, col),))
+
+    return row | (col << COL_SHIFT) | (wedges << WEDGE_SHIFT)
+
+
+def pack_turn(state, player, roll, category):
+    """
+    Function Name:
+    pack_turn
+
+    Description:
+    Pack the bits of the turn
+
+    Inputs:
+    state - turn state (Engine.ROLL, ...)
+    player - active player number (from 0)
+    roll - dice roll value (zero if not rolled)
+    category - question category, or None
+
+    Outputs:
+    Packed turn bits
+    """
+
+    if category is None:
+        category = 0
+    else:
+        category = Engine.CATEGORIES.index(category) + 1
+
+    return (STATES.index(state) | (player << PLAYER_SHIFT) |
+            (roll << ROLL_SHIFT) | (category << CATEGORY_SHIFT))
+
+
+def pack_state(game):
+    """
+    Function Name:
+    pack_state
+
+    Description:
+    Pack the state of a game
+
+    Inputs:
+    game - Engine.Game object (or anything with its methods, e.g., a
+           Client.RemoteGame)
+
+    Outputs:
+    GameState object
+    """
+
+    if len(game.players) > MAX_PLAYERS:
+        raise ValueError("Can not pack %d players" % len(game.players))
+
+    value = pack_turn(game.get_state(), game.player, game.dice.get_roll(),
+                      game.get_category())
+    value |= len(game.players) << COUNT_SHIFT
+
+    shift = PLAYERS_SHIFT
+    for player in game.players:
+        value |= pack_piece(player.get_location(),
+                            player.get_wedges()) << shift
+        shift += PIECE_BITS
+
+    return GameState(value)
+
+
+def from_bytes(data):
+    """
+    Function Name:
+    from_bytes
+
+    Description:
+    Make a state from the bytes of GameState.to_bytes
+
+    Inputs:
+    data - bytes
+
+    Outputs:
+    GameState object
+    """
+
+    if len(data) == 0:
+        raise ValueError("No state to unpack")
+
+    return GameState(int(binascii.hexlify(data), 16))
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
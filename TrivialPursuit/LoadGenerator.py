@@ -0,0 +1,703 @@
+"""
+Module:
+LoadGenerator.py
+
+Author:
+Mark Nauman
+
+Description:
+Plays lots of games on a game server at once to see how many it can
+host.  Every game is played by random players that wait a random think
+time (half to one and a half times --think) before each action.  The
+games share a few connections, each carrying many games, and all of them
+run on one asyncore event loop, so thousands of games only need one
+process.  A game that ends is replaced by a new one.
+
+Reports the time from an action to the state the server sends back
+(action latency), the time the server took over a whole turn (the
+action latencies of the turn added up, so without the think time) and
+how many games the server could host on one core at this pace (the games
+divided by the share of a core the server used).
+
+Run "python LoadGenerator.py --help" for the options.  Without --server
+a server is started on a free port on this computer.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import argparse
+import asyncore
+import heapq
+import multiprocessing
+import random
+import socket
+import time
+import Client
+import Engine
+import Protocol
+import Server
+
+################################################################################
+# Variables
+################################################################################
+
+# Bytes read from a socket at a time
+READ_SIZE = 65536
+
+################################################################################
+# Classes
+################################################################################
+
+
+class LoadSession:
+    """
+    Class Name:
+    LoadSession
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a game played by the load generator
+    """
+
+    def __init__(self, connection):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        connection - LoadConnection object the game is played over
+
+        Outputs:
+        None
+        """
+
+        self.connection = connection
+        self.number = None
+
+        # When the last action was sent, the server time of the turn so
+        # far and the number of answers to the question being asked
+        self.sent = None
+        self.turn_time = None
+        self.answers = 0
+
+
+class LoadConnection(asyncore.dispatcher):
+    """
+    Class Name:
+    LoadConnection
+
+    Base Class:
+    asyncore.dispatcher
+
+    Description:
+    Define the class for a connection carrying the actions of many games
+    """
+
+    def __init__(self, address, generator, socket_map):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Connect to the server
+
+        Inputs:
+        address - (host, port) of the server
+        generator - LoadGenerator object
+        socket_map - asyncore socket map
+
+        Outputs:
+        None
+        """
+
+        asyncore.dispatcher.__init__(self, map=socket_map)
+        self.generator = generator
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connect(address)
+
+        # Bytes received that are not a whole message yet and frames
+        # waiting to be sent
+        self.incoming = ""
+        self.outgoing = []
+
+        # Games waiting for the server to number them (the server answers
+        # in order) and the games being played {game number: LoadSession}
+        self.starting = []
+        self.sessions = {}
+
+    def handle_connect(self):
+        """
+        Method Name:
+        handle_connect
+
+        Description:
+        Nothing to do, the frames waiting are sent once connected
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        pass
+
+    def handle_read(self):
+        """
+        Method Name:
+        handle_read
+
+        Description:
+        Read from the server and hand the messages to their games
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        data = self.recv(READ_SIZE)
+        if not data:
+            return
+
+        (messages, self.incoming) = Protocol.split_frames(self.incoming + data)
+        for (message_type, payload) in messages:
+            (game_number,) = Protocol.GAME.unpack_from(payload)
+            session = self.sessions.get(game_number)
+
+            # The first state of a new game tells us its number
+            if (session is None) and (message_type == Protocol.STATE):
+                session = self.starting.pop(0)
+                session.number = game_number
+                self.sessions[game_number] = session
+
+            if session is not None:
+                self.generator.handle_message(session, message_type, payload)
+
+    def writable(self):
+        """
+        Method Name:
+        writable
+
+        Description:
+        Check if there is anything to send
+
+        Inputs:
+        None
+
+        Outputs:
+        True if there are frames waiting to be sent (or we are still
+        connecting)
+        """
+
+        return (len(self.outgoing) > 0) or not self.connected
+
+    def handle_write(self):
+        """
+        Method Name:
+        handle_write
+
+        Description:
+        Send as much as the socket will take
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        data = "".join(self.outgoing)
+        sent = self.send(data)
+        if sent < len(data):
+            self.outgoing = [data[sent:]]
+        else:
+            self.outgoing = []
+
+    def handle_close(self):
+        """
+        Method Name:
+        handle_close
+
+        Description:
+        Stop playing the games of the connection when the server goes
+        away.  They are counted as errors.
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.close()
+        self.generator.errors += len(self.sessions) + len(self.starting)
+        self.sessions = {}
+        self.starting = []
+
+    def send_message(self, message_type, payload=""):
+        """
+        Method Name:
+        send_message
+
+        Description:
+        Send a message to the server
+
+        Inputs:
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        self.outgoing.append(Protocol.encode(message_type, payload))
+
+
+class LoadGenerator:
+    """
+    Class Name:
+    LoadGenerator
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for playing many games on a server at once
+    """
+
+    def __init__(self, address, sessions, connections=10, think=0.5,
+                 players=4, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Connect to the server
+
+        Inputs:
+        address - (host, port) of the server
+        sessions - number of games to keep going
+        connections - number of connections the games share
+        think - average time in seconds players wait before an action
+        players - number of players in a game
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        self.address = address
+        self.think = think
+        self.players = players
+
+        # Actions waiting for their think time to be over
+        # [(due time, number, session, message type, payload)]
+        self.timers = []
+        self.count = 0
+
+        # Results
+        self.action_times = []
+        self.turn_times = []
+        self.games = 0
+        self.errors = 0
+
+        # Connect and spread the games over the connections
+        self.socket_map = {}
+        self.connections = [LoadConnection(address, self, self.socket_map)
+                            for number in range(connections)]
+        self.sessions = []
+        for number in range(sessions):
+            connection = self.connections[number % connections]
+            self.sessions.append(LoadSession(connection))
+
+    def run(self, seconds):
+        """
+        Method Name:
+        run
+
+        Description:
+        Play the games for a while
+
+        Inputs:
+        seconds - how long to play
+
+        Outputs:
+        None
+        """
+
+        for session in self.sessions:
+            self.start(session)
+
+        end = time.time() + seconds
+        while True:
+            now = time.time()
+            if now >= end:
+                break
+
+            # Wait for messages until the next action is due
+            timeout = end - now
+            if len(self.timers) > 0:
+                timeout = min(timeout, self.timers[0][0] - now)
+            asyncore.loop(timeout=max(timeout, 0), use_poll=True,
+                          map=self.socket_map, count=1)
+
+            # Send the actions that are due
+            now = time.time()
+            while (len(self.timers) > 0) and (self.timers[0][0] <= now):
+                (due, number, session, message_type,
+                 payload) = heapq.heappop(self.timers)
+                self.send(session, message_type, payload)
+
+        for connection in self.connections:
+            connection.close()
+
+    def start(self, session):
+        """
+        Method Name:
+        start
+
+        Description:
+        Start a new game
+
+        Inputs:
+        session - LoadSession object
+
+        Outputs:
+        None
+        """
+
+        session.number = None
+        session.turn_time = None
+        session.connection.starting.append(session)
+        self.send(session, Protocol.NEW_GAME,
+                  Protocol.COUNT.pack(self.players))
+
+    def send(self, session, message_type, payload):
+        """
+        Method Name:
+        send
+
+        Description:
+        Send an action for a game now
+
+        Inputs:
+        session - LoadSession object
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        session.sent = time.time()
+        session.connection.send_message(message_type, payload)
+
+    def send_later(self, session, message_type, payload):
+        """
+        Method Name:
+        send_later
+
+        Description:
+        Send an action for a game after the player thinks about it
+
+        Inputs:
+        session - LoadSession object
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        if self.think <= 0:
+            self.send(session, message_type, payload)
+            return
+
+        delay = self.think * self.rng.uniform(0.5, 1.5)
+        self.count += 1
+        heapq.heappush(self.timers, (time.time() + delay, self.count,
+                                     session, message_type, payload))
+
+    def handle_message(self, session, message_type, payload):
+        """
+        Method Name:
+        handle_message
+
+        Description:
+        Play the next action of a game when the server sends its state
+
+        Inputs:
+        session - LoadSession object
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        if message_type == Protocol.QUESTION:
+            session.answers = len(Protocol.unpack_question(payload)[3])
+            return
+
+        if message_type == Protocol.ERROR:
+            self.errors += 1
+            self.end(session)
+            return
+
+        if message_type != Protocol.STATE:
+            return
+
+        # Time the action
+        latency = time.time() - session.sent
+        self.action_times.append(latency)
+        if session.turn_time is not None:
+            session.turn_time += latency
+
+        (game_number, state, player, roll, turns, players,
+         choices) = Protocol.unpack_state(payload)
+
+        # A turn is over when the dice can be rolled again
+        if (state in (Engine.ROLL, Engine.OVER)) and \
+           (session.turn_time is not None):
+            self.turn_times.append(session.turn_time)
+            session.turn_time = None
+
+        # Pick the next action at random
+        if state == Engine.ROLL:
+            session.turn_time = 0.0
+            self.send_later(session, Protocol.ROLL,
+                            Protocol.GAME.pack(game_number))
+
+        elif state == Engine.MOVE:
+            (row, col) = self.rng.choice(choices)
+            self.send_later(session, Protocol.MOVE,
+                            Protocol.GAME_LOCATION.pack(game_number, row,
+                                                        col))
+
+        elif state == Engine.CATEGORY:
+            category = self.rng.randrange(len(Engine.CATEGORIES))
+            self.send_later(session, Protocol.CATEGORY,
+                            Protocol.GAME_BYTE.pack(game_number, category))
+
+        elif state == Engine.ANSWER:
+            answer = self.rng.randrange(session.answers)
+            self.send_later(session, Protocol.ANSWER,
+                            Protocol.GAME_BYTE.pack(game_number, answer))
+
+        else:
+            self.games += 1
+            self.end(session)
+
+    def end(self, session):
+        """
+        Method Name:
+        end
+
+        Description:
+        Replace a game that is over with a new one
+
+        Inputs:
+        session - LoadSession object
+
+        Outputs:
+        None
+        """
+
+        session.connection.sessions.pop(session.number, None)
+        self.start(session)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def start_server(question_file="questions.csv"):
+    """
+    Function Name:
+    start_server
+
+    Description:
+    Start a game server in another process on a free port of this
+    computer
+
+    Inputs:
+    question_file - question file (CSV, question pack or question
+                    database)
+
+    Outputs:
+    (multiprocessing.Process, (host, port))
+    """
+
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=Server.serve,
+                                      args=(("127.0.0.1", 0), question_file,
+                                            ready))
+    process.daemon = True
+    process.start()
+
+    return (process, ("127.0.0.1", ready.get(timeout=60)))
+
+
+def get_percentile(values, percent):
+    """
+    Function Name:
+    get_percentile
+
+    Description:
+    Get a percentile of some values
+
+    Inputs:
+    values - list of values
+    percent - percentile (0 to 100)
+
+    Outputs:
+    The value, or 0.0 if there are no values
+    """
+
+    if len(values) == 0:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100.0), len(values) - 1)]
+
+
+def run_load(address, sessions, connections=10, seconds=10.0, think=0.5,
+             players=4, seed=None):
+    """
+    Function Name:
+    run_load
+
+    Description:
+    Play games on a server for a while and measure it
+
+    Inputs:
+    address - (host, port) of the server
+    sessions - number of games to keep going
+    connections - number of connections the games share
+    seconds - how long to play
+    think - average time in seconds players wait before an action
+    players - number of players in a game
+    seed - optional random seed
+
+    Outputs:
+    Dictionary of the results
+    """
+
+    # The server reports how much CPU time it used
+    client = Client.Client(address)
+    (games, start_cpu, start_time, start_actions) = client.get_stats()
+
+    generator = LoadGenerator(address, sessions, connections, think, players,
+                              random.Random(seed))
+    generator.run(seconds)
+
+    (games, end_cpu, end_time, end_actions) = client.get_stats()
+    client.close()
+
+    # Share of a core the server used
+    usage = (end_cpu - start_cpu) / max(end_time - start_time, 1e-9)
+
+    return {
+        "sessions": sessions,
+        "games finished": generator.games,
+        "errors": generator.errors,
+        "actions per second": (end_actions - start_actions) /
+                              (end_time - start_time),
+        "turns": len(generator.turn_times),
+        "server cpu": usage,
+        "sessions per core": sessions / max(usage, 1e-9),
+        "action p50": get_percentile(generator.action_times, 50),
+        "action p99": get_percentile(generator.action_times, 99),
+        "turn p50": get_percentile(generator.turn_times, 50),
+        "turn p99": get_percentile(generator.turn_times, 99)
+    }
+
+
+def print_results(results):
+    """
+    Function Name:
+    print_results
+
+    Description:
+    Print the results of run_load
+
+    Inputs:
+    results - dictionary of the results
+
+    Outputs:
+    None
+    """
+
+    print "%d sessions: %d turns, %d games finished, %d errors" % \
+        (results["sessions"], results["turns"], results["games finished"],
+         results["errors"])
+    print "  server: %.0f actions/s using %.0f%% of a core, %.0f sessions " \
+          "per core" % (results["actions per second"],
+                        results["server cpu"] * 100,
+                        results["sessions per core"])
+    print "  action latency: p50 %.2fms  p99 %.2fms" % \
+        (results["action p50"] * 1000, results["action p99"] * 1000)
+    print "  turn latency:   p50 %.2fms  p99 %.2fms" % \
+        (results["turn p50"] * 1000, results["turn p99"] * 1000)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Play lots of games on a "
+                                                 "Trivial Pursuit game server")
+    parser.add_argument("--server", default=None,
+                        help="server address HOST:PORT (default: start one "
+                             "on this computer)")
+    parser.add_argument("--questions", default="questions.csv",
+                        help="question file for the server started "
+                             "(default %(default)s)")
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="games to keep going (default %(default)s)")
+    parser.add_argument("--connections", type=int, default=10,
+                        help="connections the games share "
+                             "(default %(default)s)")
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="how long to play (default %(default)s)")
+    parser.add_argument("--think", type=float, default=0.5,
+                        help="average seconds a player waits before an "
+                             "action (default %(default)s)")
+    parser.add_argument("--players", type=int, default=4,
+                        help="players in a game (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed")
+    args = parser.parse_args()
+
+    # Start a server unless we were given one
+    process = None
+    if args.server is None:
+        (process, address) = start_server(args.questions)
+    else:
+        address = Client.parse_address(args.server, Server.PORT)
+
+    try:
+        print_results(run_load(address, args.sessions, args.connections,
+                               args.seconds, args.think, args.players,
+                               args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
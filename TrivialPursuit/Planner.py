@@ -0,0 +1,627 @@
+"""
+Module:
+Planner.py
+
+Author:
+Mark Nauman
+
+Description:
+Computer players that move by a solved plan instead of a search.  For
+every board space, wedge mask and dice roll the plan has the tile that
+gives the fewest turns to win on average, for given chances of
+answering each category.  The plan is solved once by value iteration
+over the board spaces, saved to a plan file and memory mapped, so every
+move after that is one lookup.
+
+A turn lasts until the player answers a question wrong (or has nowhere
+to move): a correct answer or a roll again tile keeps the turn, so only
+passing the turn on costs one.  Each dice roll also costs ROLL_COST, so
+of two moves with the same expected turns the one that wins in fewer
+dice rolls is taken, and a player who never misses still heads for the
+win.  The plan only looks at the player's own game, the other players
+do not get in the way.  On the hub the player picks their best
+category, unless they can win, in which case the other players pick the
+player's worst category (as in Simulator).
+
+The plans are kept in a directory of the user's own (DIRECTORY).  A
+plan file is only used if it was solved for the same board and answer
+chances, otherwise it is solved again.
+
+Solve a plan with "python Planner.py --help" for the options.
+
+Plan layout (little endian):
+    Header  magic "TPPL", version (H), rows (H), columns (H), dice
+            sides (H), categories (H), layout checksum (I), then the
+            chance of answering each category (d)
+    Values  expected turns passed on before winning (d, plus ROLL_COST
+            a dice roll) for every space and wedge mask, space by space
+            (NaN for illegal spaces)
+    Moves   space to move to (H, row * columns + column) for every space,
+            wedge mask and roll, space by space, then mask by mask
+            (NO_MOVE if there is nowhere to move)
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import argparse
+import array
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import zlib
+import Engine
+import Simulator
+
+################################################################################
+# Variables
+################################################################################
+
+# File extension used for plans
+EXTENSION = ".plan"
+
+# Plan format identification
+MAGIC = "TPPL"
+VERSION = 2
+
+# Binary layouts
+HEADER = struct.Struct("<4sHHHHHI")
+PROBABILITY = struct.Struct("<d")
+VALUE = struct.Struct("<d")
+MOVE = struct.Struct("<H")
+
+# Move entry for a roll with nowhere to move
+NO_MOVE = 0xFFFF
+
+# Number of wedge masks
+MASKS = 1 << len(Engine.CATEGORIES)
+
+# Stop solving when no expected value changes by more than this
+TOLERANCE = 1e-9
+
+# Cost of a dice roll, in turns
+ROLL_COST = 1e-4
+
+# Where the plans are kept unless told otherwise
+DIRECTORY = os.path.join(os.environ.get("XDG_CACHE_HOME") or
+                         os.path.join(os.path.expanduser("~"), ".cache"),
+                         "TrivialPursuit")
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Plan:
+    """
+    Class Name:
+    Plan
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a memory mapped plan file
+    """
+
+    def __init__(self, file_name):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Map the plan into memory and read the header
+
+        Inputs:
+        file_name - plan file
+
+        Outputs:
+        None
+        """
+
+        # Map the file
+        self.file = open(file_name, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Check the header
+        (magic, version, self.rows, self.cols, self.sides, categories,
+         self.checksum) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a plan" % file_name)
+        if version != VERSION:
+            raise ValueError("%s is plan version %d, expected %d" %
+                             (file_name, version, VERSION))
+        if categories != len(Engine.CATEGORIES):
+            raise ValueError("%s has %d categories, expected %d" %
+                             (file_name, categories, len(Engine.CATEGORIES)))
+
+        # Read the answer chances and find the tables
+        self.probabilities = {}
+        position = HEADER.size
+        for category in Engine.CATEGORIES:
+            self.probabilities[category] = \
+                PROBABILITY.unpack_from(self.data, position)[0]
+            position += PROBABILITY.size
+        self.values = position
+        self.moves = self.values + self.rows * self.cols * MASKS * VALUE.size
+
+        if len(self.data) != (self.moves + self.rows * self.cols * MASKS *
+                              self.sides * MOVE.size):
+            raise ValueError("%s is the wrong size" % file_name)
+
+    def get_move(self, (row, col), wedges, roll):
+        """
+        Method Name:
+        get_move
+
+        Description:
+        Look up the tile to move to
+
+        Inputs:
+        (row, col) - location of the player
+        wedges - wedge bitmask of the player
+        roll - dice roll value
+
+        Outputs:
+        (row, col) location to move to, or None if there is nowhere to go
+        """
+
+        space = row * self.cols + col
+        index = (space * MASKS + wedges) * self.sides + roll - 1
+        move = MOVE.unpack_from(self.data, self.moves + index * MOVE.size)[0]
+        if move == NO_MOVE:
+            return None
+
+        return divmod(move, self.cols)
+
+    def get_expected(self, (row, col), wedges):
+        """
+        Method Name:
+        get_expected
+
+        Description:
+        Look up the expected number of turns to win, counting the turn
+        being played
+
+        Inputs:
+        (row, col) - location of the player about to roll
+        wedges - wedge bitmask of the player
+
+        Outputs:
+        Expected turns (with ROLL_COST a dice roll)
+        """
+
+        index = (row * self.cols + col) * MASKS + wedges
+        return 1.0 + VALUE.unpack_from(self.data, self.values +
+                                       index * VALUE.size)[0]
+
+    def is_solved_for(self, board, probabilities):
+        """
+        Method Name:
+        is_solved_for
+
+        Description:
+        Check the plan was solved for a board and answer chances
+
+        Inputs:
+        board - Engine.Board object
+        probabilities - dictionary of {category: chance of answering}
+
+        Outputs:
+        True if the plan fits them
+        """
+
+        return ((self.checksum == board.get_checksum()) and
+                (self.rows == len(board.layout)) and
+                (self.cols == len(board.layout[0])) and
+                (self.sides == Engine.Dice.sides) and
+                (self.probabilities == probabilities))
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Unmap and close the plan
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.data.close()
+        self.file.close()
+
+
+class Planner:
+    """
+    Class Name:
+    Planner
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the computer players that move by a plan.  Has
+    the methods of ComputerPlayer.ComputerPlayer, so it can play for the
+    computer players of a GameBoard.
+    """
+
+    def __init__(self, board, num_players, model=None, directory=DIRECTORY,
+                 rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Load the plans of the players, solving the ones that have not
+        been solved before
+
+        Inputs:
+        board - Engine.Board object of the game
+        num_players - number of players
+        model - optional answer model (see Simulator, every question is a
+                coin flip if not given)
+        directory - directory the plans are kept in
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        if model is None:
+            model = Simulator.CategoryModel({}, 0.5)
+        self.model = model
+
+        # Players with the same chances share a plan {player number: Plan}
+        self.plans = {}
+        loaded = {}
+        for number in range(num_players):
+            player = Engine.Player(number + 1, board.get_hub())
+            probabilities = dict([(category,
+                                   model.get_probability(player, category))
+                                  for category in Engine.CATEGORIES])
+            key = tuple(sorted(probabilities.items()))
+            if key not in loaded:
+                loaded[key] = Plan(get_plan(board, probabilities, directory))
+                if not loaded[key].is_solved_for(board, probabilities):
+                    raise ValueError("Plan was solved for another board or "
+                                     "other answer chances")
+            self.plans[number] = loaded[key]
+
+    def choose_move(self, state):
+        """
+        Method Name:
+        choose_move
+
+        Description:
+        Look up the tile to move to
+
+        Inputs:
+        state - GameState.GameState object of a game waiting for a move
+
+        Outputs:
+        (row, col) location to move to
+        """
+
+        if state.get_state() != Engine.MOVE:
+            raise ValueError("Game is in state %s, not %s" %
+                             (state.get_state(), Engine.MOVE))
+
+        player = state.get_player()
+        return self.plans[player].get_move(state.get_location(player),
+                                           state.get_wedges(player),
+                                           state.get_roll())
+
+    def choose_category(self, game):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category on the hub
+
+        Inputs:
+        game - Engine.Game object waiting for a category
+
+        Outputs:
+        Question category
+        """
+
+        return Simulator.choose_category(game, self.model)
+
+    def answer(self, game):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Answer the question being asked by the answer model
+
+        Inputs:
+        game - Engine.Game object waiting for an answer
+
+        Outputs:
+        True if the question was answered correctly
+        """
+
+        probability = self.model.get_probability(game.get_player(),
+                                                 game.get_category())
+        return self.rng.random() < probability
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Close the plans
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        for plan in set(self.plans.values()):
+            plan.close()
+        self.plans = {}
+
+################################################################################
+# Functions
+################################################################################
+
+
+def solve(board, probabilities):
+    """
+    Function Name:
+    solve
+
+    Description:
+    Solve the plan for a board.  The wedges are only ever added, so the
+    masks are solved from all wedges down to none, each by value
+    iteration over the spaces until it settles.
+
+    Inputs:
+    board - Engine.Board object
+    probabilities - dictionary of {category: chance of answering}
+
+    Outputs:
+    (array of the expected turns, array of the moves) in plan order
+    """
+
+    for category in Engine.CATEGORIES:
+        if not 0.0 < probabilities[category] <= 1.0:
+            raise ValueError("Can not win with a %s chance of %r" %
+                             (category, probabilities[category]))
+
+    rows = len(board.layout)
+    cols = len(board.layout[0])
+    sides = Engine.Dice.sides
+    spaces = [(row, col) for row in range(rows) for col in range(cols)
+              if board.layout[row][col] is not None]
+    full = MASKS - 1
+
+    # The player picks their best category on the hub, and the other
+    # players pick the worst one when the player can win
+    best = max([probabilities[category] for category in Engine.CATEGORIES])
+    worst = min([probabilities[category] for category in Engine.CATEGORIES])
+
+    # Where each space can move with each roll, as space numbers
+    reachable = {}
+    for (row, col) in spaces:
+        reachable[(row, col)] = [
+            [row2 * cols + col2
+             for (row2, col2) in board.get_reachable((row, col), roll)]
+            for roll in range(1, sides + 1)]
+
+    # The values are the turns passed to the other players before the
+    # player wins (plus ROLL_COST a dice roll), so the turn being played
+    # is added when they are looked up
+    values = array.array("d", [float("nan")] * (rows * cols * MASKS))
+    moves = array.array("H", [NO_MOVE] * (rows * cols * MASKS * sides))
+    for wedges in range(full, -1, -1):
+
+        # Start every space at zero and improve them all until they settle
+        value = dict([(row * cols + col, 0.0) for (row, col) in spaces])
+        while True:
+
+            # Expected turns after landing on each space.  A correct
+            # answer or a roll again tile keeps the turn, a wrong answer
+            # passes it on.
+            landed = {}
+            for (row, col) in spaces:
+                space = row * cols + col
+                tile_type = board.get_type((row, col))
+                if tile_type == "Roll Again":
+                    landed[space] = value[space]
+                elif (tile_type == "Hub") and (wedges == full):
+                    landed[space] = (1.0 - worst) * (1.0 + value[space])
+                elif tile_type == "Hub":
+                    landed[space] = value[space] + 1.0 - best
+                elif board.get_headquarter((row, col)) and \
+                        not wedges & (1 << Engine.CATEGORIES.index(tile_type)):
+                    bit = 1 << Engine.CATEGORIES.index(tile_type)
+                    chance = probabilities[tile_type]
+                    landed[space] = (
+                        chance * values[space * MASKS + (wedges | bit)] +
+                        (1.0 - chance) * (1.0 + value[space]))
+                else:
+                    landed[space] = (value[space] + 1.0 -
+                                     probabilities[tile_type])
+
+            # Take the best move for every roll.  A roll with nowhere to
+            # move passes the turn.
+            change = 0.0
+            for (row, col) in spaces:
+                space = row * cols + col
+                total = 0.0
+                for choices in reachable[(row, col)]:
+                    if len(choices) == 0:
+                        total += 1.0 + value[space]
+                    else:
+                        total += min([landed[choice] for choice in choices])
+                new_value = ROLL_COST + total / sides
+                change = max(change, abs(new_value - value[space]))
+                value[space] = new_value
+
+            if change < TOLERANCE:
+                break
+
+        # Save the values and the moves they lead to
+        for (row, col) in spaces:
+            space = row * cols + col
+            values[space * MASKS + wedges] = value[space]
+            for roll in range(sides):
+                choices = reachable[(row, col)][roll]
+                if len(choices) > 0:
+                    moves[(space * MASKS + wedges) * sides + roll] = \
+                        min(choices, key=lambda choice: landed[choice])
+
+    return (values, moves)
+
+
+def write_plan(file_name, board, probabilities, values, moves):
+    """
+    Function Name:
+    write_plan
+
+    Description:
+    Write a solved plan.  The plan is written to a temporary file next to
+    the plan file and renamed over it, so a plan that is being read is
+    never half written.
+
+    Inputs:
+    file_name - plan file to write
+    board - Engine.Board object the plan was solved for
+    probabilities - dictionary of {category: chance of answering}
+    values - array of the expected turns (see solve)
+    moves - array of the moves (see solve)
+
+    Outputs:
+    None
+    """
+
+    (handle, temporary) = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_name)))
+    output = os.fdopen(handle, "wb")
+    try:
+        output.write(HEADER.pack(MAGIC, VERSION, len(board.layout),
+                                 len(board.layout[0]), Engine.Dice.sides,
+                                 len(Engine.CATEGORIES),
+                                 board.get_checksum()))
+        for category in Engine.CATEGORIES:
+            output.write(PROBABILITY.pack(probabilities[category]))
+        for table in (values, moves):
+            if sys.byteorder != "little":
+                table = array.array(table.typecode, table)
+                table.byteswap()
+            table.tofile(output)
+        output.close()
+        os.chmod(temporary, 0644)
+        os.rename(temporary, file_name)
+    except:
+        output.close()
+        os.remove(temporary)
+        raise
+
+
+def get_plan(board, probabilities, directory=DIRECTORY):
+    """
+    Function Name:
+    get_plan
+
+    Description:
+    Find the plan file for a board and answer chances, solving and
+    writing it if it has not been solved before.  A file of the same
+    name solved for something else (or not a plan) is solved again.
+
+    Inputs:
+    board - Engine.Board object
+    probabilities - dictionary of {category: chance of answering}
+    directory - directory the plans are kept in (made, for the user
+                only, if it is not there)
+
+    Outputs:
+    Plan file name
+    """
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0700)
+
+    key = repr((board.layout, sorted(probabilities.items()),
+                Engine.Dice.sides, VERSION))
+    file_name = os.path.join(directory, "plan-%08x%s" %
+                             (zlib.crc32(key) & 0xFFFFFFFF, EXTENSION))
+
+    if os.path.exists(file_name):
+        try:
+            plan = Plan(file_name)
+        except (ValueError, struct.error, EnvironmentError):
+            plan = None
+        if plan is not None:
+            solved = plan.is_solved_for(board, probabilities)
+            plan.close()
+            if solved:
+                return file_name
+
+    (values, moves) = solve(board, probabilities)
+    write_plan(file_name, board, probabilities, values, moves)
+
+    return file_name
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Solve the plan of the "
+                                                 "fastest moves")
+    parser.add_argument("file_name", help="plan file to write")
+    parser.add_argument("--size", type=int, default=None,
+                        help="plan a generated size x size board")
+    parser.add_argument("--probability", type=float, default=0.5,
+                        help="chance of answering a question correctly")
+    parser.add_argument("--category", action="append", default=[],
+                        metavar="CATEGORY=PROBABILITY",
+                        help="chance of answering a category correctly")
+    args = parser.parse_args()
+
+    # Setup the board
+    if args.size is None:
+        board = Engine.Board()
+    else:
+        board = Engine.Board(Engine.generate_layout(args.size))
+
+    # Setup the answer chances
+    probabilities = dict([(category, args.probability)
+                          for category in Engine.CATEGORIES])
+    for option in args.category:
+        (category, probability) = option.split("=")
+        probabilities[category] = float(probability)
+
+    start = time.time()
+    (values, moves) = solve(board, probabilities)
+    write_plan(args.file_name, board, probabilities, values, moves)
+    plan = Plan(args.file_name)
+    print "Solved %s in %.2fs, %.1f turns to win from the hub" % \
+        (args.file_name, time.time() - start,
+         plan.get_expected(board.get_hub(), 0))
+    plan.close()
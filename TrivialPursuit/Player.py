@@ -6,8 +6,14 @@ Author:
 Mark Nauman
 
 Description:
-Contains the class for each player.  Keeps track of what questions
-have been answered.  Also is responsible for drawing the game piece.
+Contains the class for each player.  Is responsible for drawing the game
+piece.  Keeping track of what questions have been answered is done by
+Engine.Player.
+
+A piece only looks different when it gets a wedge, so each player keeps
+the picture of its piece (its sprite) until then.  There are only 16
+wedge combinations for each of the 4 pieces, so every sprite for a tile
+size can also be drawn up front into one atlas surface.
 
 Improvements/Todo:
 None at this time
@@ -18,28 +24,31 @@ None at this time
 ################################################################################
 
 import pygame
-import pymsgbox
+import Assets
+import Engine
+import Timings
 
 ################################################################################
 # Variables
 ################################################################################
 
-# None
+# Atlases already drawn {(piece size, players): surface}
+atlases = {}
 
 ################################################################################
 # Classes
 ################################################################################
 
-class Player:
+class Player(Engine.Player):
     """
     Class Name:
     Player
 
     Base Class:
-    None
+    Engine.Player
 
     Description:
-    Define the base class for the player
+    Define the class for the player game piece graphics
     """
 
     # Define the wedges [(color tuple), [quadrant]].  This could
@@ -52,7 +61,10 @@ class Player:
         "Holidays": [(0, 255, 0), [1, 1]]     # Green
     }
 
-    def __init__(self, player_number, location):
+    # Pre-built sprites {(player number, wedges, length): surface}
+    atlas = {}
+
+    def __init__(self, player_number, location, name=None):
         """
         Method Name:
         __init__
@@ -64,106 +76,21 @@ class Player:
         Inputs:
         player_number - player number
         location - location tuple (row, col) of the player on the board
+        name - optional player name (defaults to the player number)
 
         Outputs:
         None
         """
 
-        # Store the player number
-        self.player_number = player_number
-
-        # Initialize the questions the player has answered
-        self.answered = {
-            "People": False,
-            "Events": False,
-            "Places": False,
-            "Holidays": False
-        }
-
-        # Store the player location
-        self.location = location
-
-        # Get the player name to make things a bit more personal
-        self.name = pymsgbox.prompt("Enter Player Name?", "Player Name?",
-                                    "Player #%d" % player_number)
-
-        # Error check if they hit cancel
-        if self.name is None:
-            self.name = "Player #%d" % player_number
-
-    def draw(self, screen, pos, size):
-        """
-        Method Name:
-        draw
-
-        Description:
-        Draw the game piece on the screen
-
-        Inputs:
-        screen - screen to draw the game piece on
-        pos - position of the current tile
-        size - size of the current tile
-
-        Outputs:
-        None
-        """
-
-        # Strip the tuples
-        (width, height) = size
-        (x_start, y_start) = pos
+        # The game board asks for the name once the board is on the
+        # screen.  Until then the name defaults to the player number.
+        Engine.Player.__init__(self, player_number, location, name)
 
-        # Calculate the game piece size assuming four players and
-        # all players are occupying the same tile and 3 pixels pad on
-        # each side (<pad><piece><pad><piece><pad>)
-        length = (min(width, height) - (3*3)) / 2
-
-        # Calculate the x coordinate
-        pad = (width - length - length) / 3
-        if (self.player_number == 1) or (self.player_number == 3):
-            x = x_start + pad
-        else:
-            x = x_start + pad + length + pad
-
-        # Calculate the y coordinate
-        pad = (height - length - length) / 3
-        if (self.player_number == 1) or (self.player_number == 2):
-            y = y_start + pad
-        else:
-            y = y_start + pad + length + pad
-
-        # Create the player piece surface as a black rectangle
-        surface = pygame.Surface((length, length))
-        surface.fill((0, 0, 0))
-
-        # Create the player piece wedges
-        for category in self.answered.keys():
-
-            # If the player has answered this question
-            if self.answered[category] is True:
-
-                # Get the color and quadrant
-                wedge_color = self.colors[category][0]
-                wedge_quadrant = self.colors[category][1]
-
-                # Calculate the wedge size assuming with 2 pixels pad on
-                # each side (<pad><wedge><pad><wedge><pad>)
-                wedge_pad = 2
-                wedge_size = (length - 3 * wedge_pad) / 2
-
-                # Calculate the wedge position based on the quadrant
-                wedge_x = wedge_pad + ((wedge_size + wedge_pad) * wedge_quadrant[0])
-                wedge_y = wedge_pad + ((wedge_size + wedge_pad) * wedge_quadrant[1])
-
-                # Draw the wedge
-                pygame.draw.rect(surface, wedge_color,
-                                 (wedge_x, wedge_y, wedge_size, wedge_size))
-
-        font = pygame.font.SysFont('Arial', length-10, True, False)
-        text = font.render("%d" % self.player_number, True, (150, 150, 150))
-        x_text = (length - text.get_width()) / 2
-        y_text = (length - text.get_height()) / 2
-        surface.blit(text, (x_text, y_text))
-        screen.blit(surface, (x, y))
+        # The sprite is drawn the first time it is needed.  The piece is
+        # dirty when it has moved or changed since it was last drawn.
+        self.sprite = None
+        self.drawn_location = None
+        self.dirty = True
 
     def add_wedge(self, category):
         """
@@ -180,31 +107,32 @@ class Player:
         None
         """
 
-        self.answered[category] = True
+        Engine.Player.add_wedge(self, category)
 
-    def can_win(self):
+        # The piece looks different now
+        self.sprite = None
+        self.dirty = True
+
+    def set_wedges(self, wedges):
         """
         Method Name:
-        can_win
+        set_wedges
 
         Description:
-        Determine if the player can win (i.e., has all scoring wedges)
+        Set the scoring wedges from a bitmask
 
         Inputs:
-        category - question category to add the wedge
+        wedges - wedge bitmask (bit N for Engine.CATEGORIES[N])
 
         Outputs:
         None
         """
 
-        # Determine if the user has answered all of the questions
-        can_win = True
-        for category in self.answered.keys():
-            if self.answered[category] is False:
-                can_win = False
+        Engine.Player.set_wedges(self, wedges)
 
-        # Return the status
-        return can_win
+        # The piece looks different now
+        self.sprite = None
+        self.dirty = True
 
     def set_location(self, location):
         """
@@ -221,47 +149,194 @@ class Player:
         None
         """
 
-        self.location = location
+        Engine.Player.set_location(self, location)
+        self.dirty = True
 
-    def get_location(self):
+    def get_sprite(self, length):
         """
         Method Name:
-        get_location
+        get_sprite
 
         Description:
-        Get the player location
+        Get the picture of the game piece, drawing it if necessary
 
         Inputs:
-        None
+        length - width and height of the piece in pixels
 
         Outputs:
-        self.location
+        Surface with the game piece
         """
 
-        return self.location
+        if (self.sprite is None) or (self.sprite.get_width() != length):
 
-    def get_name(self):
+            # Use the atlas if it has this piece
+            key = (self.player_number, self.get_wedges(), length)
+            self.sprite = self.atlas.get(key)
+            if self.sprite is None:
+                self.sprite = render_piece(self.player_number,
+                                           self.get_wedges(), length)
+
+        return self.sprite
+
+    @Timings.timed("Player.draw")
+    def draw(self, screen, pos, size):
         """
         Method Name:
-        get_name
+        draw
 
         Description:
-        Get the player name
+        Draw the game piece on the screen
 
         Inputs:
-        None
+        screen - screen to draw the game piece on
+        pos - position of the current tile
+        size - size of the current tile
 
         Outputs:
-        self.name
+        None
         """
 
-        return self.name
+        # Strip the tuples
+        (width, height) = size
+        (x_start, y_start) = pos
+
+        # Calculate the game piece size
+        length = get_length(size)
+
+        # Calculate the x coordinate
+        pad = (width - length - length) / 3
+        if (self.player_number == 1) or (self.player_number == 3):
+            x = x_start + pad
+        else:
+            x = x_start + pad + length + pad
+
+        # Calculate the y coordinate
+        pad = (height - length - length) / 3
+        if (self.player_number == 1) or (self.player_number == 2):
+            y = y_start + pad
+        else:
+            y = y_start + pad + length + pad
+
+        # Draw the game piece
+        screen.blit(self.get_sprite(length), (x, y))
+        self.drawn_location = self.location
+        self.dirty = False
 
 ################################################################################
 # Functions
 ################################################################################
 
-# No functions.  Everything is in classes above.
+
+def get_length(size):
+    """
+    Function Name:
+    get_length
+
+    Description:
+    Calculate the game piece size for a tile
+
+    Inputs:
+    size - size of the tile
+
+    Outputs:
+    Width and height of the piece in pixels
+    """
+
+    # Assume four players are all occupying the same tile and 3 pixels pad
+    # on each side (<pad><piece><pad><piece><pad>)
+    (width, height) = size
+    return (min(width, height) - (3*3)) / 2
+
+
+def render_piece(player_number, wedges, length):
+    """
+    Function Name:
+    render_piece
+
+    Description:
+    Draw a game piece
+
+    Inputs:
+    player_number - player number
+    wedges - wedge bitmask (see Engine.Player.get_wedges)
+    length - width and height of the piece in pixels
+
+    Outputs:
+    Surface with the game piece
+    """
+
+    # Create the player piece surface as a black rectangle
+    surface = pygame.Surface((length, length))
+    surface.fill((0, 0, 0))
+
+    # Create the player piece wedges
+    for (number, category) in enumerate(Engine.CATEGORIES):
+
+        # If the player has answered this question
+        if wedges & (1 << number):
+
+            # Get the color and quadrant
+            wedge_color = Player.colors[category][0]
+            wedge_quadrant = Player.colors[category][1]
+
+            # Calculate the wedge size assuming with 2 pixels pad on
+            # each side (<pad><wedge><pad><wedge><pad>)
+            wedge_pad = 2
+            wedge_size = (length - 3 * wedge_pad) / 2
+
+            # Calculate the wedge position based on the quadrant
+            wedge_x = wedge_pad + ((wedge_size + wedge_pad) * wedge_quadrant[0])
+            wedge_y = wedge_pad + ((wedge_size + wedge_pad) * wedge_quadrant[1])
+
+            # Draw the wedge
+            pygame.draw.rect(surface, wedge_color,
+                             (wedge_x, wedge_y, wedge_size, wedge_size))
+
+    # Add the player number (font, size, bold, italic)
+    font = ("Arial", length - 10, True, False)
+    text = Assets.render_text("%d" % player_number, (150, 150, 150), font)
+    x_text = (length - text.get_width()) / 2
+    y_text = (length - text.get_height()) / 2
+    surface.blit(text, (x_text, y_text))
+
+    return surface
+
+
+def build_atlas(length, players=4):
+    """
+    Function Name:
+    build_atlas
+
+    Description:
+    Draw every game piece for a piece size into one surface and add them
+    to the atlas.  Each row is a player and each column a wedge bitmask.
+    Games with the same piece size share the atlas, so it is only drawn
+    once.
+
+    Inputs:
+    length - width and height of the pieces in pixels
+    players - number of player pieces
+
+    Outputs:
+    Atlas surface
+    """
+
+    atlas = atlases.get((length, players))
+    if atlas is not None:
+        return atlas
+
+    combinations = 1 << len(Engine.CATEGORIES)
+    atlas = pygame.Surface((length * combinations, length * players))
+
+    for player_number in range(1, players + 1):
+        for wedges in range(combinations):
+            position = (wedges * length, (player_number - 1) * length)
+            atlas.blit(render_piece(player_number, wedges, length), position)
+            Player.atlas[(player_number, wedges, length)] = \
+                atlas.subsurface(pygame.Rect(position, (length, length)))
+    atlases[(length, players)] = atlas
+
+    return atlas
 
 ################################################################################
 # Main
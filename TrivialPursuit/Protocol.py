@@ -0,0 +1,361 @@
+"""
+Module:
+Protocol.py
+
+Author:
+Mark Nauman
+
+Description:
+The messages passed between the game server and its clients.  Every
+message is a frame of a 2 byte length, a 1 byte message type and the
+payload, all in network byte order.  The length counts the type and the
+payload.  Text is UTF-8 with a 2 byte length in front of it.
+
+The client creates or joins a game, then sends the players' actions for
+it.  After every action the server pushes the game state to each
+connection watching the game (the questions and answer results go just
+before the state).
+
+Messages from the client (game number first, except NEW_GAME and STATS):
+    NEW_GAME  number of players
+    JOIN      (watch a game)
+    ROLL      (the server rolls the dice)
+    MOVE      row, column
+    CATEGORY  category number (in Engine.CATEGORIES)
+    ANSWER    answer number
+    STATS     (server statistics)
+
+Messages from the server:
+    STATE     state number (in STATES), active player, dice roll, turns,
+              (row, column, wedges) for each player, (row, column) of
+              each choice
+    QUESTION  category number, question text, answer text
+    RESULT    1 if answered correctly, number of the correct answer
+    ERROR     error text
+    STATS     games, CPU seconds, seconds running, actions
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import struct
+import Engine
+
+################################################################################
+# Variables
+################################################################################
+
+# Message types from the client
+NEW_GAME = 1
+JOIN = 2
+ROLL = 3
+MOVE = 4
+CATEGORY = 5
+ANSWER = 6
+STATS = 7
+
+# Message types from the server
+STATE = 16
+QUESTION = 17
+RESULT = 18
+ERROR = 19
+STATS_REPLY = 20
+
+# Turn states in the order they are numbered
+STATES = [Engine.ROLL, Engine.MOVE, Engine.CATEGORY, Engine.ANSWER,
+          Engine.OVER]
+
+# Frame header (length, message type)
+HEADER = struct.Struct(">HB")
+
+# Largest payload a frame can hold
+MAX_PAYLOAD = 65535 - 1
+
+# Payload layouts
+GAME = struct.Struct(">I")
+GAME_BYTE = struct.Struct(">IB")
+GAME_LOCATION = struct.Struct(">IBB")
+STATE_HEADER = struct.Struct(">IBBBIB")
+PLAYER = struct.Struct(">BBB")
+LOCATION = struct.Struct(">BB")
+COUNT = struct.Struct(">B")
+RESULT_PAYLOAD = struct.Struct(">IBB")
+STATS_PAYLOAD = struct.Struct(">IddI")
+TEXT_LENGTH = struct.Struct(">H")
+
+################################################################################
+# Classes
+################################################################################
+
+# No classes.  Everything is in functions below.
+
+################################################################################
+# Functions
+################################################################################
+
+
+def encode(message_type, payload=""):
+    """
+    Function Name:
+    encode
+
+    Description:
+    Put a message in a frame
+
+    Inputs:
+    message_type - message type
+    payload - message payload
+
+    Outputs:
+    Frame bytes
+    """
+
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError("Payload of %d bytes is too long" % len(payload))
+
+    return HEADER.pack(len(payload) + 1, message_type) + payload
+
+
+def split_frames(data):
+    """
+    Function Name:
+    split_frames
+
+    Description:
+    Split the messages out of the bytes received so far
+
+    Inputs:
+    data - bytes received
+
+    Outputs:
+    (list of (message type, payload), bytes left over for the next frame)
+    """
+
+    messages = []
+    offset = 0
+    while len(data) - offset >= HEADER.size:
+        (length, message_type) = HEADER.unpack_from(data, offset)
+        if length == 0:
+            raise ValueError("Frame has no message type")
+        end = offset + 2 + length
+        if end > len(data):
+            break
+        messages.append((message_type, data[offset + HEADER.size:end]))
+        offset = end
+
+    return (messages, data[offset:])
+
+
+def pack_text(text):
+    """
+    Function Name:
+    pack_text
+
+    Description:
+    Pack text with its length
+
+    Inputs:
+    text - text (UTF-8 bytes)
+
+    Outputs:
+    Bytes
+    """
+
+    return TEXT_LENGTH.pack(len(text)) + text
+
+
+def unpack_text(payload, offset):
+    """
+    Function Name:
+    unpack_text
+
+    Description:
+    Unpack text packed by pack_text
+
+    Inputs:
+    payload - message payload
+    offset - where the text starts
+
+    Outputs:
+    (text, offset after the text)
+    """
+
+    (length,) = TEXT_LENGTH.unpack_from(payload, offset)
+    offset += TEXT_LENGTH.size
+    if offset + length > len(payload):
+        raise ValueError("Text runs past the end of the message")
+
+    return (payload[offset:offset + length], offset + length)
+
+
+def pack_state(game_number, game):
+    """
+    Function Name:
+    pack_state
+
+    Description:
+    Pack the state of a game
+
+    Inputs:
+    game_number - game number
+    game - Engine.Game object
+
+    Outputs:
+    STATE payload
+    """
+
+    parts = [STATE_HEADER.pack(game_number, STATES.index(game.get_state()),
+                               game.player, game.dice.get_roll(),
+                               game.turns, len(game.players))]
+    for player in game.players:
+        (row, col) = player.get_location()
+        parts.append(PLAYER.pack(row, col, player.get_wedges()))
+
+    choices = game.get_choices()
+    parts.append(COUNT.pack(len(choices)))
+    for (row, col) in choices:
+        parts.append(LOCATION.pack(row, col))
+
+    return "".join(parts)
+
+
+def unpack_state(payload):
+    """
+    Function Name:
+    unpack_state
+
+    Description:
+    Unpack the state of a game
+
+    Inputs:
+    payload - STATE payload
+
+    Outputs:
+    (game number, turn state, active player, dice roll, turns,
+     [((row, col), wedges), ...], ((row, col), ...))
+    """
+
+    (game_number, state, player, roll, turns,
+     count) = STATE_HEADER.unpack_from(payload)
+    offset = STATE_HEADER.size
+
+    players = []
+    for number in range(count):
+        (row, col, wedges) = PLAYER.unpack_from(payload, offset)
+        players.append(((row, col), wedges))
+        offset += PLAYER.size
+
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    choices = []
+    for number in range(count):
+        choices.append(LOCATION.unpack_from(payload, offset))
+        offset += LOCATION.size
+
+    return (game_number, STATES[state], player, roll, turns, players,
+            tuple(choices))
+
+
+def pack_question(game_number, category, question, answers):
+    """
+    Function Name:
+    pack_question
+
+    Description:
+    Pack a question (without telling which answer is correct)
+
+    Inputs:
+    game_number - game number
+    category - question category
+    question - question text
+    answers - list of answer text
+
+    Outputs:
+    QUESTION payload
+    """
+
+    parts = [GAME_BYTE.pack(game_number, Engine.CATEGORIES.index(category)),
+             pack_text(question), COUNT.pack(len(answers))]
+    for answer in answers:
+        parts.append(pack_text(answer))
+
+    return "".join(parts)
+
+
+def unpack_question(payload):
+    """
+    Function Name:
+    unpack_question
+
+    Description:
+    Unpack a question
+
+    Inputs:
+    payload - QUESTION payload
+
+    Outputs:
+    (game number, question category, question text, list of answer text)
+    """
+
+    (game_number, category) = GAME_BYTE.unpack_from(payload)
+    (question, offset) = unpack_text(payload, GAME_BYTE.size)
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+
+    answers = []
+    for number in range(count):
+        (answer, offset) = unpack_text(payload, offset)
+        answers.append(answer)
+
+    return (game_number, Engine.CATEGORIES[category], question, answers)
+
+
+def pack_error(game_number, text):
+    """
+    Function Name:
+    pack_error
+
+    Description:
+    Pack an error
+
+    Inputs:
+    game_number - game number (0 if not about a game)
+    text - error text
+
+    Outputs:
+    ERROR payload
+    """
+
+    return GAME.pack(game_number) + pack_text(text[:MAX_PAYLOAD - 16])
+
+
+def unpack_error(payload):
+    """
+    Function Name:
+    unpack_error
+
+    Description:
+    Unpack an error
+
+    Inputs:
+    payload - ERROR payload
+
+    Outputs:
+    (game number, error text)
+    """
+
+    (game_number,) = GAME.unpack_from(payload)
+    (text, offset) = unpack_text(payload, GAME.size)
+
+    return (game_number, text)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
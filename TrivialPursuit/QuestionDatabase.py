@@ -0,0 +1,397 @@
+"""
+Module:
+QuestionDatabase.py
+
+Author:
+Mark Nauman
+
+Description:
+Keeps the questions in a SQLite database.  The next card for a category
+is found with an indexed query, so the deck does not have to fit in
+memory, and every draw is a transaction on the database file, so any
+number of game processes can deal from the same deck without handing out
+the same card twice in a pass.
+
+Import a question CSV file with
+"python QuestionDatabase.py questions.csv questions.db".  The CSV file may
+have a seventh "Difficulty" column (a whole number, 0 if left out).
+
+Each card records the pass through the deck it was last asked in and a
+random shuffle key.  The next card is the one asked the longest ago,
+shuffle key breaking the tie.  Drawing a card moves it to the next pass
+with a new shuffle key, so each pass deals the cards in a new order.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import os
+import random
+import sqlite3
+import sys
+import QuestionPack
+
+################################################################################
+# Variables
+################################################################################
+
+# File extensions used for question databases
+EXTENSIONS = [".db", ".sqlite"]
+
+# Number of questions inserted per transaction by an import
+BATCH_SIZE = 10000
+
+# Shuffle keys are random numbers this many bits long
+SHUFFLE_BITS = 62
+
+# Database layout.  The indexes cover the next card queries with and
+# without a difficulty.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    difficulty INTEGER NOT NULL DEFAULT 0,
+    question TEXT NOT NULL,
+    correct TEXT NOT NULL,
+    incorrect_1 TEXT NOT NULL,
+    incorrect_2 TEXT NOT NULL,
+    incorrect_3 TEXT NOT NULL,
+    last_asked INTEGER NOT NULL DEFAULT 0,
+    shuffle INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_next
+    ON questions (category, last_asked, shuffle);
+CREATE INDEX IF NOT EXISTS questions_difficulty
+    ON questions (category, difficulty, last_asked, shuffle);
+"""
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Database:
+    """
+    Class Name:
+    Database
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a question database.  Has the categories of the
+    {category: [question, ...]} dictionary Engine.Deck reads from a CSV
+    file, but deals the cards itself.
+    """
+
+    def __init__(self, file_name, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Open the database, creating the tables if they are not there yet
+
+        Inputs:
+        file_name - question database file
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        # Use the global generator unless we were given one
+        if rng is None:
+            rng = random
+        self.rng = rng
+
+        # Transactions are started by hand so a draw can hold the write
+        # lock from reading the card to moving it to the next pass.  Other
+        # processes wait for the lock instead of failing.
+        self.connection = sqlite3.connect(file_name, timeout=60,
+                                          isolation_level=None)
+        self.connection.text_factory = str
+
+        # Readers do not block the writer (or each other) with a write
+        # ahead log
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def keys(self):
+        """
+        Method Name:
+        keys
+
+        Description:
+        Get the question categories
+
+        Inputs:
+        None
+
+        Outputs:
+        List of categories
+        """
+
+        cursor = self.connection.execute(
+            "SELECT DISTINCT category FROM questions")
+        return [row[0] for row in cursor]
+
+    def __contains__(self, category):
+        """
+        Method Name:
+        __contains__
+
+        Description:
+        Check if the database has a question category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        True if the database has the category
+        """
+
+        cursor = self.connection.execute(
+            "SELECT 1 FROM questions WHERE category = ? LIMIT 1",
+            (category,))
+        return cursor.fetchone() is not None
+
+    def get_count(self, category):
+        """
+        Method Name:
+        get_count
+
+        Description:
+        Get the number of questions in a category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        Number of questions
+        """
+
+        cursor = self.connection.execute(
+            "SELECT COUNT(*) FROM questions WHERE category = ?", (category,))
+        return cursor.fetchone()[0]
+
+    def get_difficulties(self, category):
+        """
+        Method Name:
+        get_difficulties
+
+        Description:
+        Count the questions of each difficulty in a category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        Dictionary of {difficulty: number of questions}
+        """
+
+        cursor = self.connection.execute(
+            "SELECT difficulty, COUNT(*) FROM questions WHERE category = ? "
+            "GROUP BY difficulty", (category,))
+        return dict(cursor.fetchall())
+
+    def draw(self, category, difficulty=None):
+        """
+        Method Name:
+        draw
+
+        Description:
+        Draw the next card for a category and move it to the next pass
+        through the deck
+
+        Inputs:
+        category - question category
+        difficulty - optional difficulty the card has to have
+
+        Outputs:
+        [question, [[correct, True], [incorrect, False], ...]]
+        """
+
+        # Find the card asked the longest ago
+        query = ("SELECT id, last_asked, question, correct, incorrect_1, "
+                 "incorrect_2, incorrect_3 FROM questions WHERE category = ?")
+        parameters = [category]
+        if difficulty is not None:
+            query += " AND difficulty = ?"
+            parameters.append(difficulty)
+        query += " ORDER BY last_asked, shuffle LIMIT 1"
+
+        # Hold the write lock until the card is moved so no other process
+        # can draw it as well
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute(query, parameters).fetchone()
+            if row is None:
+                raise KeyError(category)
+
+            self.connection.execute(
+                "UPDATE questions SET last_asked = ?, shuffle = ? "
+                "WHERE id = ?",
+                (row[1] + 1, self.rng.getrandbits(SHUFFLE_BITS), row[0]))
+            self.connection.execute("COMMIT")
+        except:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        # The first answer is the correct one
+        answers = [[row[3], True]]
+        for incorrect in row[4:]:
+            answers.append([incorrect, False])
+
+        return [row[2], answers]
+
+    def import_rows(self, rows, batch_size=BATCH_SIZE):
+        """
+        Method Name:
+        import_rows
+
+        Description:
+        Add questions to the database.  The questions are inserted a batch
+        at a time, one transaction per batch.
+
+        Inputs:
+        rows - rows of [category, question, correct, incorrect_1,
+               incorrect_2, incorrect_3] with an optional difficulty
+        batch_size - number of questions per transaction
+
+        Outputs:
+        Number of questions added
+        """
+
+        count = 0
+        batch = []
+        for row in rows:
+
+            # Store the text as UTF-8 and add the difficulty and shuffle key
+            record = [text.decode("utf-8") for text in row[:6]]
+            if len(row) > 6:
+                record.append(int(row[6]))
+            else:
+                record.append(0)
+            record.append(self.rng.getrandbits(SHUFFLE_BITS))
+            batch.append(record)
+
+            if len(batch) >= batch_size:
+                self.insert(batch)
+                count += len(batch)
+                batch = []
+
+        if len(batch) > 0:
+            self.insert(batch)
+            count += len(batch)
+
+        return count
+
+    def insert(self, batch):
+        """
+        Method Name:
+        insert
+
+        Description:
+        Insert a batch of questions in one transaction
+
+        Inputs:
+        batch - records of [category, question, correct, incorrect_1,
+                incorrect_2, incorrect_3, difficulty, shuffle]
+
+        Outputs:
+        None
+        """
+
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT INTO questions (category, question, correct, "
+                "incorrect_1, incorrect_2, incorrect_3, difficulty, shuffle) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            self.connection.execute("COMMIT")
+        except:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Close the database
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.connection.close()
+
+################################################################################
+# Functions
+################################################################################
+
+
+def import_questions(csv_file_name, database_file_name,
+                     batch_size=BATCH_SIZE):
+    """
+    Function Name:
+    import_questions
+
+    Description:
+    Import a question CSV file into a question database.  The rows are
+    streamed, so only one batch is held in memory.
+
+    Inputs:
+    csv_file_name - question file (CSV) with a header row
+    database_file_name - question database file (created if necessary)
+    batch_size - number of questions per transaction
+
+    Outputs:
+    Number of questions imported
+    """
+
+    database = Database(database_file_name)
+    try:
+        return database.import_rows(QuestionPack.read_rows(csv_file_name),
+                                    batch_size)
+    finally:
+        database.close()
+
+
+def is_database(file_name):
+    """
+    Function Name:
+    is_database
+
+    Description:
+    Check if a question file is a question database (by its extension)
+
+    Inputs:
+    file_name - question file
+
+    Outputs:
+    True if the file is a question database
+    """
+
+    return os.path.splitext(file_name)[1] in EXTENSIONS
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    if len(sys.argv) != 3:
+        print "Usage: python QuestionDatabase.py <questions.csv> <questions.db>"
+        sys.exit(1)
+
+    count = import_questions(sys.argv[1], sys.argv[2])
+    print "Imported %d questions into %s" % (count, sys.argv[2])
@@ -0,0 +1,478 @@
+"""
+Module:
+QuestionPack.py
+
+Author:
+Mark Nauman
+
+Description:
+Reads question files.  Streams and checks the rows of question CSV
+files, compiles a question CSV file into a binary question pack and loads
+the pack by memory mapping it.  A question is only read from the pack when
+it is drawn, so loading a pack takes the same time and memory no matter
+how many questions it has.
+
+Compile a pack with "python QuestionPack.py questions.csv questions.pack".
+
+Pack layout (little endian):
+    Header     magic "TPQP", version (H), categories (H), heap offset (I)
+    Directory  for each category: name offset (I), name length (I),
+               question count (I), table offset (I)
+    Tables     for each category: question count + 1 heap offsets (I).
+               Question N is the heap bytes from offset N to offset N+1.
+               Then the difficulty (i) of each question (0 for questions
+               without one).
+    Heap       UTF-8 text.  Category names, then one record per question
+               with the question, correct answer and incorrect answers
+               separated by NUL characters.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import array
+import csv
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+################################################################################
+# Variables
+################################################################################
+
+# File extension used for question packs
+EXTENSION = ".pack"
+
+# Pack format identification
+MAGIC = "TPQP"
+VERSION = 2
+
+# Binary layouts
+HEADER = struct.Struct("<4sHHI")
+ENTRY = struct.Struct("<IIII")
+OFFSET = struct.Struct("<I")
+DIFFICULTY = struct.Struct("<i")
+
+# Separator between the text fields of a question record
+SEPARATOR = "\0"
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Pack:
+    """
+    Class Name:
+    Pack
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a memory mapped question pack.  Behaves like the
+    {category: [question, ...]} dictionary Engine.Deck reads from a CSV
+    file, except the questions are read from the pack as they are used.
+    """
+
+    def __init__(self, file_name):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Map the pack into memory and read the category directory
+
+        Inputs:
+        file_name - question pack file
+
+        Outputs:
+        None
+        """
+
+        # Map the file
+        self.file = open(file_name, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Check the header
+        (magic, version, categories, heap) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a question pack" % file_name)
+        if version != VERSION:
+            raise ValueError("%s is question pack version %d, expected %d" %
+                             (file_name, version, VERSION))
+
+        # Read the category directory
+        self.categories = {}
+        position = HEADER.size
+        for index in range(categories):
+            (name_offset, name_length, count, table) = \
+                ENTRY.unpack_from(self.data, position)
+            name = self.data[heap + name_offset:
+                             heap + name_offset + name_length]
+            self.categories[name] = Category(self.data, heap, table, count)
+            position += ENTRY.size
+
+    def keys(self):
+        """
+        Method Name:
+        keys
+
+        Description:
+        Get the question categories
+
+        Inputs:
+        None
+
+        Outputs:
+        List of categories
+        """
+
+        return self.categories.keys()
+
+    def __contains__(self, category):
+        """
+        Method Name:
+        __contains__
+
+        Description:
+        Check if the pack has a question category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        True if the pack has the category
+        """
+
+        return category in self.categories
+
+    def __getitem__(self, category):
+        """
+        Method Name:
+        __getitem__
+
+        Description:
+        Get the questions for a category
+
+        Inputs:
+        category - question category
+
+        Outputs:
+        Category object
+        """
+
+        return self.categories[category]
+
+    def close(self):
+        """
+        Method Name:
+        close
+
+        Description:
+        Unmap and close the pack
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.data.close()
+        self.file.close()
+
+
+class Category:
+    """
+    Class Name:
+    Category
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the questions of one category in a pack.  Behaves
+    like a read only list of [question, [[answer, correct], ...]] entries.
+    """
+
+    def __init__(self, data, heap, table, count):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the location of the category in the pack
+
+        Inputs:
+        data - memory mapped pack
+        heap - offset of the string heap
+        table - offset of the category offset table (the difficulties
+                follow it)
+        count - number of questions
+
+        Outputs:
+        None
+        """
+
+        self.data = data
+        self.heap = heap
+        self.table = table
+        self.count = count
+        self.difficulties = table + (count + 1) * OFFSET.size
+
+    def __len__(self):
+        """
+        Method Name:
+        __len__
+
+        Description:
+        Get the number of questions
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of questions
+        """
+
+        return self.count
+
+    def get_difficulty(self, index):
+        """
+        Method Name:
+        get_difficulty
+
+        Description:
+        Get the difficulty of a question
+
+        Inputs:
+        index - question number
+
+        Outputs:
+        Difficulty of the question
+        """
+
+        if (index < 0) or (index >= self.count):
+            raise IndexError("question %d out of range" % index)
+
+        (difficulty,) = DIFFICULTY.unpack_from(
+            self.data, self.difficulties + index * DIFFICULTY.size)
+
+        return difficulty
+
+    def __getitem__(self, index):
+        """
+        Method Name:
+        __getitem__
+
+        Description:
+        Read a question from the pack
+
+        Inputs:
+        index - question number
+
+        Outputs:
+        [question, [[correct, True], [incorrect, False], ...]]
+        """
+
+        if (index < 0) or (index >= self.count):
+            raise IndexError("question %d out of range" % index)
+
+        # Find the question record in the heap
+        position = self.table + index * OFFSET.size
+        (start,) = OFFSET.unpack_from(self.data, position)
+        (end,) = OFFSET.unpack_from(self.data, position + OFFSET.size)
+        fields = self.data[self.heap + start:self.heap + end].split(SEPARATOR)
+
+        # The first answer is the correct one
+        answers = [[fields[1], True]]
+        for incorrect in fields[2:]:
+            answers.append([incorrect, False])
+
+        return [fields[0], answers]
+
+################################################################################
+# Functions
+################################################################################
+
+
+def compile_pack(csv_file_name, pack_file_name):
+    """
+    Function Name:
+    compile_pack
+
+    Description:
+    Compile a question CSV file into a question pack.  The questions are
+    streamed into a temporary heap file so only the offsets are kept in
+    memory.
+
+    Inputs:
+    csv_file_name - question file (CSV) with a header row
+    pack_file_name - question pack file to write
+
+    Outputs:
+    Number of questions compiled
+    """
+
+    heap = tempfile.TemporaryFile()
+    heap_size = 0
+    names = {}
+    offsets = {}
+    difficulties = {}
+    order = []
+
+    # Stream the questions into the heap
+    for row in read_rows(csv_file_name):
+
+        # Check the text is something we can store
+        for text in row:
+            if SEPARATOR in text:
+                raise ValueError("%s: NUL character in %r" %
+                                 (csv_file_name, text))
+
+        # Add this category, if necessary
+        category = row[0]
+        if category not in offsets:
+            order.append(category)
+            names[category] = heap_size
+            heap.write(category)
+            heap_size += len(category)
+            offsets[category] = array.array("I", [heap_size])
+            difficulties[category] = array.array("i")
+
+        # Add this question
+        record = SEPARATOR.join(row[1:6])
+        heap.write(record)
+        heap_size += len(record)
+        offsets[category].append(heap_size)
+        if len(row) > 6:
+            difficulties[category].append(int(row[6]))
+        else:
+            difficulties[category].append(0)
+
+    # Figure out where everything goes
+    position = HEADER.size + ENTRY.size * len(order)
+    tables = {}
+    for category in order:
+        tables[category] = position
+        position += OFFSET.size * len(offsets[category])
+        position += DIFFICULTY.size * len(difficulties[category])
+
+    # Write the pack
+    output = open(pack_file_name, "wb")
+    output.write(HEADER.pack(MAGIC, VERSION, len(order), position))
+    for category in order:
+        output.write(ENTRY.pack(names[category], len(category),
+                                len(offsets[category]) - 1, tables[category]))
+    for category in order:
+        for table in (offsets[category], difficulties[category]):
+            if sys.byteorder != "little":
+                table.byteswap()
+            table.tofile(output)
+    heap.seek(0)
+    shutil.copyfileobj(heap, output)
+    output.close()
+    heap.close()
+
+    return sum([len(offsets[category]) - 1 for category in order])
+
+
+def read_rows(file_name, categories=None):
+    """
+    Function Name:
+    read_rows
+
+    Description:
+    Stream the questions from a CSV file one row at a time.  Each row is
+    checked before it is handed out: it must have six columns, none of
+    them empty, all valid UTF-8.  A seventh difficulty column (a whole
+    number) is allowed and handed out with the row.  Rows of categories
+    we were not asked for are skipped without being checked.
+
+    Inputs:
+    file_name - question file (CSV) with a header row
+    categories - optional list of the only categories to hand out
+
+    Outputs:
+    Generator of [category, question, correct, incorrect_1, incorrect_2,
+    incorrect_3] rows, plus the difficulty if the file has one
+    """
+
+    input_file = open(file_name, "rb")
+    try:
+        input_questions = csv.reader(input_file)
+
+        # Skip the header row
+        for row in input_questions:
+            break
+
+        for row in input_questions:
+
+            # Skip blank lines and the categories we were not asked for
+            if len(row) == 0:
+                continue
+            if (categories is not None) and (row[0] not in categories):
+                continue
+
+            if len(row) not in (6, 7):
+                raise ValueError("%s line %d: expected 6 columns, found %d" %
+                                 (file_name, input_questions.line_num,
+                                  len(row)))
+
+            # Check the whole row at once.  The newlines keep a broken
+            # character at the end of one column from being completed by
+            # the next column.
+            if min([len(text.strip()) for text in row]) == 0:
+                raise ValueError("%s line %d: empty column" %
+                                 (file_name, input_questions.line_num))
+            try:
+                "\n".join(row).decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError("%s line %d: text is not UTF-8" %
+                                 (file_name, input_questions.line_num))
+
+            if (len(row) == 7) and not row[6].strip().lstrip("-").isdigit():
+                raise ValueError("%s line %d: difficulty is not a number" %
+                                 (file_name, input_questions.line_num))
+
+            yield row
+    finally:
+        input_file.close()
+
+
+def is_pack(file_name):
+    """
+    Function Name:
+    is_pack
+
+    Description:
+    Check if a question file is a question pack (by its extension)
+
+    Inputs:
+    file_name - question file
+
+    Outputs:
+    True if the file is a question pack
+    """
+
+    return os.path.splitext(file_name)[1] == EXTENSION
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    if len(sys.argv) != 3:
+        print "Usage: python QuestionPack.py <questions.csv> <questions.pack>"
+        sys.exit(1)
+
+    count = compile_pack(sys.argv[1], sys.argv[2])
+    print "Compiled %d questions into %s" % (count, sys.argv[2])
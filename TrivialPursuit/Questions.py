@@ -6,7 +6,9 @@ Author:
 Mark Nauman
 
 Description:
-This contains the classes for the question cards
+This contains the classes for the question cards.  Reading and dealing
+the cards is done by Engine.Deck, this asks the questions in the game
+window.
 
 Improvements/Todo:
 None at this time
@@ -16,9 +18,8 @@ None at this time
 # Dependencies
 ################################################################################
 
-import csv
-import pymsgbox
-import random
+import Engine
+import Timings
 
 ################################################################################
 # Variables
@@ -31,19 +32,19 @@ import random
 ################################################################################
 
 
-class Questions:
+class Questions(Engine.Deck):
     """
     Class Name:
     Questions
 
     Base Class:
-    None
+    Engine.Deck
 
     Description:
     Define the base class for the question card
     """
 
-    def __init__(self):
+    def __init__(self, file_name="questions.csv", rng=None):
         """
         Method Name:
         __init__
@@ -52,106 +53,107 @@ class Questions:
         Initialize the class objects
 
         Inputs:
-        None
+        file_name - question file (CSV, question pack or question database)
+        rng - optional random number generator (random.Random)
 
         Outputs:
         None
         """
 
-        # Probably need to read/initialize the questions here
-        self.questions = {}
-        input_questions = csv.reader(open("questions.csv", "rb"))
-
-        # Loop through all of the questions
-        first = True
-        for (category, question, correct, incorrect_1,
-             incorrect_2, incorrect_3) in input_questions:
-
-            # This is not the header row
-            if first is False:
-
-                # Add this category, if necessary
-                if category not in self.questions:
-                    self.questions[category] = []
-
-                # Add this question
-                self.questions[category].append([question,
-                                                 [[correct, True],
-                                                  [incorrect_1, False],
-                                                  [incorrect_2, False],
-                                                  [incorrect_3, False]]])
+        # Read the questions and shuffle the deck
+        Engine.Deck.__init__(self, file_name, rng)
 
-            # Mark the header row processed
-            else:
-                first = False
-
-        # Shuffle the deck
-        self.location = {}
-        for category in self.questions.keys():
-            self.location[category] = 0
-            random.shuffle(self.questions[category])
-
-    def ask(self, question_type):
+    @Timings.timed("Questions.ask")
+    def ask(self, question_type, dialogs, callback, log=None):
         """
         Method Name:
-        initialize
+        ask
 
         Description:
-        Ask a question based on the input type
+        Ask a question based on the input type.  Does not wait for the
+        answer, the callback is called once the player has answered and
+        been told if they were right.
 
         Inputs:
         question_type - question type
+        dialogs - dialogs to ask the question in (Dialogs.Dialogs)
+        callback - function to call with True/False based on if the
+                   question is answered correctly
+        log - optional GameLog.Writer to write the card drawn and the
+              answer picked to
 
         Outputs:
-        True/False based on if the question is answered correctly
+        None
         """
 
         # Get the next question
-        index = self.location[question_type]
-        self.location[question_type] += 1
-        if self.location[question_type] >= len(self.questions[question_type]):
-            self.location[question_type] = 0
+        (question_text, answers, correct) = self.draw(question_type)
+        if log is not None:
+            log.question(question_type, question_text, answers, correct)
 
-        # Shuffle the answers
-        random.shuffle(self.questions[question_type][index][1])
+        # The answer is checked here
+        def check(number):
+            if log is not None:
+                log.pick(number)
+            return (number == correct, correct)
 
-        # Generate the question text
-        question = "%s\n\n" % (self.questions[question_type][index][0])
+        ask_question(dialogs, question_type, question_text, answers, check,
+                     callback)
 
-        # Generate the answer text
-        number = 1
-        correct = 1
-        for answer in self.questions[question_type][index][1]:
+################################################################################
+# Functions
+################################################################################
 
-            # Add this answer option
-            question += "(%d) %s\n" % (number, answer[0])
 
-            # If this is the correct answer, store
-            if answer[1]:
-                correct = number
+def ask_question(dialogs, question_type, question_text, answers, check,
+                 callback):
+    """
+    Function Name:
+    ask_question
+
+    Description:
+    Ask a question in a dialog, then tell the player if they were right
+
+    Inputs:
+    dialogs - dialogs to ask the question in (Dialogs.Dialogs)
+    question_type - question type
+    question_text - question text
+    answers - list of answer text
+    check - function taking the number of the answer picked (from 0) and
+            returning (True if it is correct, number of the correct answer)
+    callback - function to call with True/False based on if the
+               question is answered correctly
+
+    Outputs:
+    None
+    """
+
+    # Generate the question text
+    question = "%s\n\n" % question_text
 
-            # Move next answer option
-            number += 1
+    # Generate the answer text
+    for number in range(len(answers)):
+        question += "(%d) %s\n" % (number + 1, answers[number])
 
-        # Ask the question
-        answer = pymsgbox.confirm(question, question_type,
-                                  ["1", "2", "3", "4"])
+    # Tell the player how they did once they answer
+    def answered(answer):
+
+        (is_correct, correct) = check(int(answer) - 1)
 
         # If answered correctly, assert true
-        if int(answer) == correct:
-            pymsgbox.alert("Correct", "Congratulations")
-            return True
+        if is_correct:
+            dialogs.alert("Correct", "Congratulations",
+                          lambda button: callback(True))
 
         # If answered incorrectly, assert false
         else:
-            correct_text = self.questions[question_type][index][1][correct-1][0]
-            pymsgbox.alert("Incorrect: %s" % correct_text, "Sorry")
-            return False
-
-################################################################################
-# Functions
-################################################################################
+            dialogs.alert("Incorrect: %s" % answers[correct], "Sorry",
+                          lambda button: callback(False))
 
+    # Ask the question
+    dialogs.confirm(question.rstrip("\n"), question_type,
+                    [str(number + 1) for number in range(len(answers))],
+                    answered)
 
 ################################################################################
 # Main
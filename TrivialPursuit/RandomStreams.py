@@ -0,0 +1,180 @@
+"""
+Module:
+RandomStreams.py
+
+Author:
+Mark Nauman
+
+Description:
+The random numbers of a game.  A game has one seed, and each part of the
+game that needs random numbers (the dice, the question deck, the
+starting player, the computer players) gets a generator of its own made
+from the seed and the name of the part.  A part drawing more or fewer
+numbers does not change the numbers the other parts draw, so a game
+played again with the same seed and the same choices deals the same
+dice and questions.
+
+The seeds of other games (e.g., the games of a Sessions container or the
+batches of a simulation on a pool of processes) are split from a seed
+the same way, so they never share a generator and do not depend on the
+order they are made in.  The seeds are made by hashing the parent seed
+with the name of the part, so they are spread over all of the Mersenne
+Twister seeds.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import hashlib
+import random
+
+################################################################################
+# Variables
+################################################################################
+
+# Names of the generators of a game
+DICE = "dice"
+DECK = "deck"
+GAME = "game"
+COMPUTER = "computer"
+ANSWER = "answer"
+
+# Bits in a new seed
+SEED_BITS = 64
+
+################################################################################
+# Classes
+################################################################################
+
+
+class RandomStreams:
+    """
+    Class Name:
+    RandomStreams
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the random number generators made from a seed
+    """
+
+    def __init__(self, seed=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the class objects
+
+        Inputs:
+        seed - optional seed (a non-negative integer).  A new seed is
+               picked if not given.
+
+        Outputs:
+        None
+        """
+
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(SEED_BITS)
+        if seed < 0:
+            raise ValueError("Seed %d is negative" % seed)
+        self.seed = seed
+
+        # Generators made so far {name: random.Random}
+        self.streams = {}
+
+    def get_seed(self):
+        """
+        Method Name:
+        get_seed
+
+        Description:
+        Get the seed, to make the same generators again
+
+        Inputs:
+        None
+
+        Outputs:
+        Seed
+        """
+
+        return self.seed
+
+    def get(self, name):
+        """
+        Method Name:
+        get
+
+        Description:
+        Get the generator of a part of the game.  Asking for the same name
+        again gets the same generator.
+
+        Inputs:
+        name - generator name (e.g., DICE)
+
+        Outputs:
+        random.Random object
+        """
+
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = random.Random(derive(self.seed, "stream", name))
+            self.streams[name] = stream
+
+        return stream
+
+    def split(self, key):
+        """
+        Method Name:
+        split
+
+        Description:
+        Get the generators of another game (or worker).  Each key gets
+        different generators, which are also different from the ones of
+        get.
+
+        Inputs:
+        key - name or number of the game
+
+        Outputs:
+        RandomStreams object
+        """
+
+        return RandomStreams(derive(self.seed, "split", key))
+
+################################################################################
+# Functions
+################################################################################
+
+
+def derive(seed, kind, key):
+    """
+    Function Name:
+    derive
+
+    Description:
+    Make a seed from a parent seed
+
+    Inputs:
+    seed - parent seed
+    kind - "stream" or "split"
+    key - name or number of the part
+
+    Outputs:
+    Seed (256 bits)
+    """
+
+    digest = hashlib.sha256("%x/%s/%s" % (seed, kind, key)).hexdigest()
+    return int(digest, 16)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
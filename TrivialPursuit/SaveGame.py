@@ -0,0 +1,620 @@
+"""
+Module:
+SaveGame.py
+
+Author:
+Mark Nauman
+
+Description:
+Saves a game to a file and loads it back, so closing the window does not
+lose the game.  The save holds the packed game state, the number of dice
+rolls, the player names, where every question category is in its
+shuffle and the state of the random number generators, so the loaded
+game deals the same dice rolls and questions the saved game would have.
+
+The save is split into sections.  Saving again only appends the sections
+that changed since the last save, followed by a commit record, so saving
+after every turn writes a couple of hundred bytes instead of the five
+thousand or so of a whole save.  Loading reads the sections up
+to the last commit, the last copy of each section winning; a save cut
+short is loaded as of the save before it.  Once the file is mostly old
+copies it is written again with only the latest ones.
+
+Save layout (little endian):
+    Header    magic "TPSV", version (H), board layout checksum (I)
+    Records   section type (B), section number (B), payload length (I),
+              payload
+
+Sections:
+    GAME      dice rolls so far (I), packed state (GameState.to_bytes)
+    NAMES     UTF-8 player names separated by NUL characters
+    CURSOR    (number is the category number in Engine.CATEGORIES) cards
+              (I), location (I), cards held back (I), recent cards (I),
+              the recent cards (I each), moved cards (I), then the moved
+              cards as (location (I), card (I))
+    WORDS     (number is the generator, DICE or DECK) the 624 Mersenne
+              Twister words (I each)
+    POSITION  (number is the generator) word index (I), 1 if there is a
+              Gaussian value waiting (B), the Gaussian value (d)
+    COMMIT    the end of a save, no payload
+
+The twister words only change every 624 numbers drawn, so the position
+of a generator is kept apart from its words.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import array
+import os
+import struct
+import sys
+import tempfile
+import Engine
+import GameState
+import QuestionDatabase
+
+################################################################################
+# Variables
+################################################################################
+
+# File extension used for saved games
+EXTENSION = ".save"
+
+# Save format identification
+MAGIC = "TPSV"
+VERSION = 1
+
+# Section types
+GAME = 1
+NAMES = 2
+CURSOR = 3
+WORDS = 4
+POSITION = 5
+COMMIT = 6
+
+# Generator numbers of the WORDS and POSITION sections
+DICE = 0
+DECK = 1
+
+# Binary layouts
+HEADER = struct.Struct("<4sHI")
+RECORD = struct.Struct("<BBI")
+TURNS = struct.Struct("<I")
+CURSOR_HEADER = struct.Struct("<IIII")
+COUNT = struct.Struct("<I")
+SWAP = struct.Struct("<II")
+RANDOM_POSITION = struct.Struct("<IBd")
+
+# Separator between the player names
+SEPARATOR = "\0"
+
+# Number of Mersenne Twister words (random.getstate() has one more item,
+# the word index)
+TWISTER_WORDS = 624
+
+# The file is written again once it is this many times the size of the
+# latest sections
+COMPACT_RATIO = 4
+
+################################################################################
+# Classes
+################################################################################
+
+
+class SaveFile:
+    """
+    Class Name:
+    SaveFile
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a saved game.  Remembers the sections in the file
+    so saving again only writes the ones that changed.
+    """
+
+    def __init__(self, file_name):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Read the saved game, if there is one
+
+        Inputs:
+        file_name - save file name
+
+        Outputs:
+        None
+        """
+
+        self.file_name = file_name
+
+        # The latest sections {(section type, number): payload} and the
+        # size of the file
+        self.sections = {}
+        self.size = 0
+        self.checksum = None
+        if os.path.exists(file_name):
+            (self.checksum, self.sections, self.size) = read_save(file_name)
+
+    def is_empty(self):
+        """
+        Method Name:
+        is_empty
+
+        Description:
+        Determine if nothing has been saved yet
+
+        Inputs:
+        None
+
+        Outputs:
+        True if there is no saved game
+        """
+
+        return len(self.sections) == 0
+
+    def get_num_players(self):
+        """
+        Method Name:
+        get_num_players
+
+        Description:
+        Get the number of players in the saved game
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of players
+        """
+
+        return decode_game(self.sections[(GAME, 0)])[1].get_num_players()
+
+    def get_names(self):
+        """
+        Method Name:
+        get_names
+
+        Description:
+        Get the player names in the saved game
+
+        Inputs:
+        None
+
+        Outputs:
+        List of player names
+        """
+
+        return self.sections[(NAMES, 0)].split(SEPARATOR)
+
+    def save(self, game_board):
+        """
+        Method Name:
+        save
+
+        Description:
+        Save a game.  Only the sections that changed since the last save
+        are written, unless the file is due to be written again.
+
+        Inputs:
+        game_board - GameBoard object
+
+        Outputs:
+        Number of bytes written
+        """
+
+        sections = get_sections(game_board)
+        checksum = game_board.game.board.get_checksum()
+
+        # Write all of it to a new file (appending can not take a section
+        # away)
+        live = sum(RECORD.size + len(payload)
+                   for payload in sections.itervalues())
+        if ((self.size == 0) or (checksum != self.checksum) or
+                (self.size > COMPACT_RATIO * live) or
+                (len(set(self.sections) - set(sections)) > 0)):
+            self.size = write_save(self.file_name, checksum, sections)
+            self.checksum = checksum
+            self.sections = sections
+            return self.size
+
+        # Append the changes
+        changed = [(key, payload) for (key, payload) in sections.iteritems()
+                   if self.sections.get(key) != payload]
+        data = "".join(RECORD.pack(section_type, number, len(payload)) +
+                       payload
+                       for ((section_type, number), payload) in changed)
+        data += RECORD.pack(COMMIT, 0, 0)
+        with open(self.file_name, "r+b") as output:
+            output.seek(self.size)
+            output.write(data)
+            output.truncate()
+
+        self.size += len(data)
+        self.sections = sections
+        return len(data)
+
+    def restore(self, game_board):
+        """
+        Method Name:
+        restore
+
+        Description:
+        Put a game back the way it was saved
+
+        Inputs:
+        game_board - GameBoard object with the number of players of the
+                     saved game, played on the board it was saved on
+
+        Outputs:
+        None
+        """
+
+        if self.is_empty():
+            raise ValueError("%s has no saved game" % self.file_name)
+        if self.checksum != game_board.game.board.get_checksum():
+            raise ValueError("%s was saved on another board" %
+                             self.file_name)
+
+        (turns, state) = decode_game(self.sections[(GAME, 0)])
+        if state.get_num_players() != len(game_board.players):
+            raise ValueError("%s has %d players, the game has %d" %
+                             (self.file_name, state.get_num_players(),
+                              len(game_board.players)))
+
+        for (player, name) in zip(game_board.players, self.get_names()):
+            player.set_name(name)
+
+        # Deal the questions from where they were.  The cards of a
+        # question database are dealt by the database.
+        deck = game_board.questions
+        if not isinstance(deck.questions, QuestionDatabase.Database):
+            deck.cursors = {}
+            for (number, category) in enumerate(Engine.CATEGORIES):
+                payload = self.sections.get((CURSOR, number))
+                if payload is not None:
+                    deck.cursors[category] = decode_cursor(
+                        payload, len(deck.questions[category]), deck.rng)
+
+        # Roll the dice and shuffle the way they would have
+        for (number, rng) in ((DICE, game_board.dice.rng), (DECK, deck.rng)):
+            rng.setstate(decode_random(self.sections[(WORDS, number)],
+                                       self.sections[(POSITION, number)]))
+
+        # Put the pieces and the turn back (this shows the dialog or the
+        # tiles the turn is waiting for)
+        game_board.game.turns = turns
+        game_board.set_state(state)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_sections(game_board):
+    """
+    Function Name:
+    get_sections
+
+    Description:
+    Get the sections of a save
+
+    Inputs:
+    game_board - GameBoard object
+
+    Outputs:
+    Dictionary of {(section type, number): payload}
+    """
+
+    game = game_board.game
+    sections = {}
+    sections[(GAME, 0)] = (TURNS.pack(game.turns) +
+                           GameState.pack_state(game).to_bytes())
+
+    names = []
+    for player in game_board.players:
+        name = player.get_name()
+        if isinstance(name, unicode):
+            name = name.encode("utf-8")
+        names.append(name)
+    sections[(NAMES, 0)] = SEPARATOR.join(names)
+
+    # Cards dealt by weight are not saved, they are dealt from scratch
+    deck = game_board.questions
+    for (number, category) in enumerate(Engine.CATEGORIES):
+        cursor = deck.cursors.get(category)
+        if isinstance(cursor, Engine.Cursor):
+            sections[(CURSOR, number)] = encode_cursor(cursor)
+
+    for (number, rng) in ((DICE, game_board.dice.rng), (DECK, deck.rng)):
+        (words, position) = encode_random(rng.getstate())
+        sections[(WORDS, number)] = words
+        sections[(POSITION, number)] = position
+
+    return sections
+
+
+def encode_cursor(cursor):
+    """
+    Function Name:
+    encode_cursor
+
+    Description:
+    Pack where a category is in its shuffle
+
+    Inputs:
+    cursor - Engine.Cursor object
+
+    Outputs:
+    Payload bytes
+    """
+
+    data = [CURSOR_HEADER.pack(cursor.count, cursor.location, cursor.held,
+                               len(cursor.recent)),
+            array_bytes(array.array("I", cursor.recent)),
+            COUNT.pack(len(cursor.swaps))]
+    for location in sorted(cursor.swaps):
+        data.append(SWAP.pack(location, cursor.swaps[location]))
+
+    return "".join(data)
+
+
+def decode_cursor(payload, count, rng):
+    """
+    Function Name:
+    decode_cursor
+
+    Description:
+    Make a cursor at the point of the shuffle it was packed at
+
+    Inputs:
+    payload - payload bytes
+    count - number of cards in the category
+    rng - random number generator of the deck
+
+    Outputs:
+    Engine.Cursor object
+    """
+
+    (cards, location, held, recent) = CURSOR_HEADER.unpack_from(payload, 0)
+    if cards != count:
+        raise ValueError("Saved with %d cards in a category, found %d" %
+                         (cards, count))
+
+    cursor = Engine.Cursor(count, rng)
+    cursor.location = location
+    cursor.held = held
+
+    offset = CURSOR_HEADER.size
+    cursor.recent.extend(bytes_array("I", payload[offset:
+                                                  offset + recent * 4]))
+    offset += recent * 4
+
+    (swaps,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    for number in range(swaps):
+        (location, card) = SWAP.unpack_from(payload, offset)
+        cursor.swaps[location] = card
+        offset += SWAP.size
+
+    return cursor
+
+
+def encode_random(state):
+    """
+    Function Name:
+    encode_random
+
+    Description:
+    Pack the state of a random number generator
+
+    Inputs:
+    state - random.getstate() value
+
+    Outputs:
+    (words payload bytes, position payload bytes)
+    """
+
+    (version, internal, gauss) = state
+    words = array_bytes(array.array("I", internal[:TWISTER_WORDS]))
+    position = RANDOM_POSITION.pack(internal[TWISTER_WORDS],
+                                    gauss is not None, gauss or 0.0)
+    return (words, position)
+
+
+def decode_random(words, position):
+    """
+    Function Name:
+    decode_random
+
+    Description:
+    Unpack the state of a random number generator
+
+    Inputs:
+    words - words payload bytes
+    position - position payload bytes
+
+    Outputs:
+    random.setstate() value
+    """
+
+    (index, has_gauss, gauss) = RANDOM_POSITION.unpack(position)
+    internal = tuple(long(word) for word in bytes_array("I", words))
+    if len(internal) != TWISTER_WORDS:
+        raise ValueError("Random state has %d words" % len(internal))
+    if not has_gauss:
+        gauss = None
+
+    return (3, internal + (long(index),), gauss)
+
+
+def decode_game(payload):
+    """
+    Function Name:
+    decode_game
+
+    Description:
+    Unpack the game section
+
+    Inputs:
+    payload - payload bytes
+
+    Outputs:
+    (dice rolls so far, GameState.GameState object)
+    """
+
+    return (TURNS.unpack_from(payload, 0)[0],
+            GameState.from_bytes(payload[TURNS.size:]))
+
+
+def array_bytes(values):
+    """
+    Function Name:
+    array_bytes
+
+    Description:
+    Get the little endian bytes of an array of 4 byte numbers
+
+    Inputs:
+    values - array.array("I") object
+
+    Outputs:
+    Bytes
+    """
+
+    if values.itemsize != 4:
+        raise ValueError("Array items are %d bytes" % values.itemsize)
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    return values.tostring()
+
+
+def bytes_array(typecode, data):
+    """
+    Function Name:
+    bytes_array
+
+    Description:
+    Get the array of 4 byte numbers in little endian bytes
+
+    Inputs:
+    typecode - array type code
+    data - bytes
+
+    Outputs:
+    array.array object
+    """
+
+    values = array.array(typecode)
+    values.fromstring(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    return values
+
+
+def read_save(file_name):
+    """
+    Function Name:
+    read_save
+
+    Description:
+    Read the sections of a save up to its last commit
+
+    Inputs:
+    file_name - save file name
+
+    Outputs:
+    (board layout checksum, {(section type, number): payload}, bytes up
+    to the last commit)
+    """
+
+    with open(file_name, "rb") as save_file:
+        data = save_file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError("%s is not a saved game" % file_name)
+    (magic, version, checksum) = HEADER.unpack_from(data, 0)
+    if (magic != MAGIC) or (version != VERSION):
+        raise ValueError("%s is not a version %d saved game" %
+                         (file_name, VERSION))
+
+    # The sections only count once their save is committed
+    sections = {}
+    pending = {}
+    committed = HEADER.size
+    offset = HEADER.size
+    while len(data) - offset >= RECORD.size:
+        (section_type, number, length) = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if len(data) - offset < length:
+            break
+        if section_type == COMMIT:
+            sections.update(pending)
+            pending = {}
+            committed = offset
+        else:
+            pending[(section_type, number)] = data[offset:offset + length]
+        offset += length
+
+    if (len(sections) > 0) and ((GAME, 0) not in sections):
+        raise ValueError("%s has no game state" % file_name)
+
+    return (checksum, sections, committed)
+
+
+def write_save(file_name, checksum, sections):
+    """
+    Function Name:
+    write_save
+
+    Description:
+    Write a whole save.  The save is written to a temporary file next to
+    the save file and renamed over it, so the old save is kept if the
+    game stops half way through.
+
+    Inputs:
+    file_name - save file name
+    checksum - board layout checksum
+    sections - dictionary of {(section type, number): payload}
+
+    Outputs:
+    Number of bytes written
+    """
+
+    data = [HEADER.pack(MAGIC, VERSION, checksum)]
+    for ((section_type, number), payload) in sorted(sections.items()):
+        data.append(RECORD.pack(section_type, number, len(payload)) + payload)
+    data.append(RECORD.pack(COMMIT, 0, 0))
+    data = "".join(data)
+
+    (handle, temporary) = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_name)))
+    output = os.fdopen(handle, "wb")
+    try:
+        output.write(data)
+        output.close()
+        os.chmod(temporary, 0644)
+        os.rename(temporary, file_name)
+    except:
+        output.close()
+        os.remove(temporary)
+        raise
+
+    return len(data)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
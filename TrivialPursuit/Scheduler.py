@@ -0,0 +1,310 @@
+"""
+Module:
+Scheduler.py
+
+Author:
+Mark Nauman
+
+Description:
+Event driven scheduler for the main loop.  Instead of waking up at a
+fixed frame rate to poll for events, the main loop sleeps in
+pygame.event.wait until something happens.  Timed work (e.g., the frames
+of an animation) is registered with call_later or call_every and the
+wait only times out when the next piece of timed work is due, so an idle
+game does not use any CPU.
+
+SDL before 2.0.22 "waits" for events by checking for them every
+millisecond, which uses more CPU than the old 10 frames a second loop.
+With those versions the scheduler sleeps for short slices and checks for
+events in between instead.  The slices start short, so the game answers
+quickly after something happens, and get longer while nothing does, so
+an idle game wakes up no more often than the old loop did.
+
+The timers use pygame.time.get_ticks, so pygame.init has to be called
+first.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import heapq
+import pygame
+
+################################################################################
+# Variables
+################################################################################
+
+# First SDL version that really sleeps in pygame.event.wait
+BLOCKING_SDL = (2, 0, 22)
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Scheduler:
+    """
+    Class Name:
+    Scheduler
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for waiting on events and timers
+    """
+
+    # How often to check for events (ms) when SDL cannot sleep until one
+    # arrives.  The time between checks doubles while no events arrive, up
+    # to idle_poll_interval.
+    poll_interval = 50
+    idle_poll_interval = 200
+
+    def __init__(self, blocking=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Start with no timers
+
+        Inputs:
+        blocking - True to wait in pygame.event.wait, False to sleep and
+                   check for events in between (see poll), None to
+                   pick by the SDL version
+
+        Outputs:
+        None
+        """
+
+        if blocking is None:
+            blocking = pygame.get_sdl_version() >= BLOCKING_SDL
+        self.blocking = blocking
+
+        # Timers waiting to run [(due time in ms, number, callback,
+        # interval)].  The number keeps timers due at the same time in the
+        # order they were added.
+        self.timers = []
+        self.count = 0
+        self.cancelled = set()
+
+    def call_later(self, delay, callback):
+        """
+        Method Name:
+        call_later
+
+        Description:
+        Run a function once after a delay
+
+        Inputs:
+        delay - delay in milliseconds
+        callback - function to call with no arguments
+
+        Outputs:
+        Timer number (to cancel it)
+        """
+
+        return self.add_timer(delay, callback, None)
+
+    def call_every(self, interval, callback):
+        """
+        Method Name:
+        call_every
+
+        Description:
+        Run a function repeatedly (e.g., each frame of an animation) until
+        it returns False or the timer is cancelled
+
+        Inputs:
+        interval - time between calls in milliseconds
+        callback - function to call with no arguments
+
+        Outputs:
+        Timer number (to cancel it)
+        """
+
+        return self.add_timer(interval, callback, interval)
+
+    def add_timer(self, delay, callback, interval):
+        """
+        Method Name:
+        add_timer
+
+        Description:
+        Add a timer
+
+        Inputs:
+        delay - time until the first call in milliseconds
+        callback - function to call with no arguments
+        interval - time between calls in milliseconds, None to call once
+
+        Outputs:
+        Timer number
+        """
+
+        self.count += 1
+        heapq.heappush(self.timers, (pygame.time.get_ticks() + delay,
+                                     self.count, callback, interval))
+        return self.count
+
+    def cancel(self, number):
+        """
+        Method Name:
+        cancel
+
+        Description:
+        Stop a timer from running again
+
+        Inputs:
+        number - timer number
+
+        Outputs:
+        None
+        """
+
+        self.cancelled.add(number)
+
+    def get_timeout(self):
+        """
+        Method Name:
+        get_timeout
+
+        Description:
+        Get how long to wait for an event before a timer is due
+
+        Inputs:
+        None
+
+        Outputs:
+        Milliseconds to wait, or None to wait until an event arrives
+        """
+
+        # Drop the cancelled timers so they do not wake us up
+        while (len(self.timers) > 0) and (self.timers[0][1] in self.cancelled):
+            self.cancelled.discard(heapq.heappop(self.timers)[1])
+
+        if len(self.timers) == 0:
+            return None
+
+        return max(self.timers[0][0] - pygame.time.get_ticks(), 0)
+
+    def wait(self):
+        """
+        Method Name:
+        wait
+
+        Description:
+        Sleep until there is an event or a timer is due, then run the
+        timers that are due
+
+        Inputs:
+        None
+
+        Outputs:
+        List of the events that arrived
+        """
+
+        # Sleep until something happens.  A timeout of 0 would wait
+        # forever, so a timer that is already due only polls.
+        timeout = self.get_timeout()
+        if not self.blocking:
+            events = self.poll(timeout)
+        elif timeout is None:
+            events = [pygame.event.wait()]
+        elif timeout > 0:
+            events = [pygame.event.wait(timeout)]
+        else:
+            events = []
+
+        # Pick up anything else that arrived while we were asleep
+        events = [event for event in events if event.type != pygame.NOEVENT]
+        events.extend(pygame.event.get())
+
+        self.run_timers()
+
+        return events
+
+    def poll(self, timeout):
+        """
+        Method Name:
+        poll
+
+        Description:
+        Sleep in slices until there is an event or the timeout is up.  The
+        slices get longer while nothing happens.
+
+        Inputs:
+        timeout - milliseconds to wait, or None to wait for an event
+
+        Outputs:
+        List of the events that arrived
+        """
+
+        end = None
+        if timeout is not None:
+            end = pygame.time.get_ticks() + timeout
+
+        interval = self.poll_interval
+        events = pygame.event.get()
+        while len(events) == 0:
+
+            # Sleep until the next check or the timeout, if that is sooner
+            delay = interval
+            if end is not None:
+                delay = min(delay, end - pygame.time.get_ticks())
+                if delay <= 0:
+                    break
+
+            pygame.time.wait(delay)
+            events = pygame.event.get()
+            interval = min(interval * 2, self.idle_poll_interval)
+
+        return events
+
+    def run_timers(self):
+        """
+        Method Name:
+        run_timers
+
+        Description:
+        Run the timers that are due
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        now = pygame.time.get_ticks()
+        while (len(self.timers) > 0) and (self.timers[0][0] <= now):
+
+            (due, number, callback, interval) = heapq.heappop(self.timers)
+            if number in self.cancelled:
+                self.cancelled.discard(number)
+                continue
+
+            # Repeating timers keep going until they return False.  They
+            # are scheduled from when they were due so they do not drift,
+            # but never for a time that has already gone by.
+            result = callback()
+            if (interval is not None) and (result is not False):
+                due = max(due + interval, now + 1)
+                heapq.heappush(self.timers, (due, number, callback, interval))
+
+################################################################################
+# Functions
+################################################################################
+
+# No functions.  Everything is in classes above.
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
@@ -0,0 +1,796 @@
+"""
+Module:
+Server.py
+
+Author:
+Mark Nauman
+
+Description:
+Game server that hosts many games in one process.  The game rules are
+Engine.Game, the same ones GameBoard plays by, and the questions are
+dealt from one Engine.Deck shared by every game.  The clients send the
+players' actions and the server pushes the game state back using the
+messages in Protocol.
+
+Python 2 has no asyncio, so the server runs on the asyncore event loop
+instead.  It is one thread that waits on all of the sockets at once
+(with poll, so there can be more than 1024 of them) and handles each
+message as it arrives, so a game only costs memory while it waits for
+its players.
+
+Start it with "python Server.py [questions file] [--host HOST]
+[--port PORT]".
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import argparse
+import asyncore
+import resource
+import socket
+import struct
+import time
+import Engine
+import Protocol
+
+################################################################################
+# Variables
+################################################################################
+
+# Where the server listens by default
+HOST = "127.0.0.1"
+PORT = 7777
+
+# Most players a game can have
+MAX_PLAYERS = 6
+
+# Bytes read from a socket at a time
+READ_SIZE = 65536
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Session:
+    """
+    Class Name:
+    Session
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for a game hosted by the server
+    """
+
+    def __init__(self, number, board, num_players, rng=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Set up the players on the hub and pick the starting player
+
+        Inputs:
+        number - game number
+        board - Engine.Board object (shared by the games)
+        num_players - number of players
+        rng - optional random number generator (random.Random)
+
+        Outputs:
+        None
+        """
+
+        self.number = number
+        players = [Engine.Player(player + 1, board.get_hub())
+                   for player in range(num_players)]
+        self.game = Engine.Game(board, players, rng=rng)
+
+        # The connections watching the game, the question being asked
+        # (QUESTION payload) and the number of its correct answer
+        self.watchers = set()
+        self.question = None
+        self.correct = None
+
+
+class Server(asyncore.dispatcher):
+    """
+    Class Name:
+    Server
+
+    Base Class:
+    asyncore.dispatcher
+
+    Description:
+    Define the class for the game server.  Accepts the connections and
+    plays the actions they send on the games.
+    """
+
+    def __init__(self, address=(HOST, PORT), question_file="questions.csv",
+                 rng=None, socket_map=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Open the questions and start listening for connections
+
+        Inputs:
+        address - (host, port) to listen on.  Port 0 picks a free port.
+        question_file - question file (CSV, question pack or question
+                        database)
+        rng - optional random number generator (random.Random)
+        socket_map - optional asyncore socket map
+
+        Outputs:
+        None
+        """
+
+        asyncore.dispatcher.__init__(self, map=socket_map)
+        self.socket_map = socket_map
+        self.rng = rng
+
+        # Listen for connections
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind(address)
+        self.listen(socket.SOMAXCONN)
+
+        # Every game uses the same board (the games only read it) and
+        # deals from the same deck
+        self.board = Engine.Board()
+        self.deck = Engine.Deck(question_file, rng)
+        self.deck.warm()
+
+        # Games being played {game number: Session}
+        self.sessions = {}
+        self.count = 0
+
+        # Statistics
+        self.actions = 0
+        self.start_time = time.time()
+        self.start_cpu = get_cpu_time()
+
+        # What to do with each message type
+        self.handlers = {
+            Protocol.NEW_GAME: self.new_game,
+            Protocol.JOIN: self.join,
+            Protocol.ROLL: self.roll,
+            Protocol.MOVE: self.move,
+            Protocol.CATEGORY: self.choose_category,
+            Protocol.ANSWER: self.answer,
+            Protocol.STATS: self.send_stats
+        }
+
+    def get_port(self):
+        """
+        Method Name:
+        get_port
+
+        Description:
+        Get the port the server is listening on
+
+        Inputs:
+        None
+
+        Outputs:
+        Port number
+        """
+
+        return self.socket.getsockname()[1]
+
+    def handle_accept(self):
+        """
+        Method Name:
+        handle_accept
+
+        Description:
+        Accept a connection
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        pair = self.accept()
+        if pair is not None:
+            Connection(pair[0], self, self.socket_map)
+
+    def handle_message(self, connection, message_type, payload):
+        """
+        Method Name:
+        handle_message
+
+        Description:
+        Play a message from a connection.  Messages that break the rules
+        are answered with an error.
+
+        Inputs:
+        connection - Connection object the message came from
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        handler = self.handlers.get(message_type)
+        try:
+            if handler is None:
+                raise ValueError("Unknown message type %d" % message_type)
+            handler(connection, payload)
+            self.actions += 1
+
+        except (ValueError, KeyError, IndexError, struct.error), error:
+            game_number = 0
+            if len(payload) >= Protocol.GAME.size:
+                (game_number,) = Protocol.GAME.unpack_from(payload)
+            connection.send_message(Protocol.ERROR,
+                                    Protocol.pack_error(game_number,
+                                                        str(error)))
+
+    def get_session(self, payload):
+        """
+        Method Name:
+        get_session
+
+        Description:
+        Find the game a message is for
+
+        Inputs:
+        payload - message payload starting with the game number
+
+        Outputs:
+        Session object
+        """
+
+        (game_number,) = Protocol.GAME.unpack_from(payload)
+        session = self.sessions.get(game_number)
+        if session is None:
+            raise ValueError("No game %d" % game_number)
+
+        return session
+
+    def new_game(self, connection, payload):
+        """
+        Method Name:
+        new_game
+
+        Description:
+        Start a game and watch it from the connection that asked for it
+
+        Inputs:
+        connection - Connection object
+        payload - NEW_GAME payload
+
+        Outputs:
+        None
+        """
+
+        (num_players,) = Protocol.COUNT.unpack(payload)
+        if (num_players < 1) or (num_players > MAX_PLAYERS):
+            raise ValueError("A game has 1 to %d players" % MAX_PLAYERS)
+
+        self.count += 1
+        session = Session(self.count, self.board, num_players, self.rng)
+        self.sessions[session.number] = session
+        self.watch(connection, session)
+
+        connection.send_message(Protocol.STATE,
+                                Protocol.pack_state(session.number,
+                                                    session.game))
+
+    def join(self, connection, payload):
+        """
+        Method Name:
+        join
+
+        Description:
+        Watch a game from another connection (e.g., another player's
+        computer)
+
+        Inputs:
+        connection - Connection object
+        payload - JOIN payload
+
+        Outputs:
+        None
+        """
+
+        session = self.get_session(payload)
+        self.watch(connection, session)
+
+        if session.question is not None:
+            connection.send_message(Protocol.QUESTION, session.question)
+        connection.send_message(Protocol.STATE,
+                                Protocol.pack_state(session.number,
+                                                    session.game))
+
+    def roll(self, connection, payload):
+        """
+        Method Name:
+        roll
+
+        Description:
+        Roll the dice for the active player
+
+        Inputs:
+        connection - Connection object
+        payload - ROLL payload
+
+        Outputs:
+        None
+        """
+
+        session = self.get_session(payload)
+        session.game.roll()
+        self.push_state(session)
+
+    def move(self, connection, payload):
+        """
+        Method Name:
+        move
+
+        Description:
+        Move the active player and ask the question for the tile
+
+        Inputs:
+        connection - Connection object
+        payload - MOVE payload
+
+        Outputs:
+        None
+        """
+
+        session = self.get_session(payload)
+        (game_number, row, col) = Protocol.GAME_LOCATION.unpack(payload)
+        session.game.move((row, col))
+        self.ask(session)
+        self.push_state(session)
+
+    def choose_category(self, connection, payload):
+        """
+        Method Name:
+        choose_category
+
+        Description:
+        Pick the question category on the hub and ask the question
+
+        Inputs:
+        connection - Connection object
+        payload - CATEGORY payload
+
+        Outputs:
+        None
+        """
+
+        session = self.get_session(payload)
+        (game_number, category) = Protocol.GAME_BYTE.unpack(payload)
+        session.game.choose_category(Engine.CATEGORIES[category])
+        self.ask(session)
+        self.push_state(session)
+
+    def answer(self, connection, payload):
+        """
+        Method Name:
+        answer
+
+        Description:
+        Answer the question being asked
+
+        Inputs:
+        connection - Connection object
+        payload - ANSWER payload
+
+        Outputs:
+        None
+        """
+
+        session = self.get_session(payload)
+        (game_number, answer) = Protocol.GAME_BYTE.unpack(payload)
+        correct = session.correct
+        session.game.answer(answer == correct)
+        session.question = None
+        session.correct = None
+
+        self.push(session, Protocol.RESULT,
+                  Protocol.RESULT_PAYLOAD.pack(session.number,
+                                               answer == correct, correct))
+        self.push_state(session)
+
+        # Nothing more can happen in a game somebody won
+        if session.game.get_winner() is not None:
+            self.end(session)
+
+    def ask(self, session):
+        """
+        Method Name:
+        ask
+
+        Description:
+        Draw the question a game is waiting for and send it to the
+        watchers
+
+        Inputs:
+        session - Session object
+
+        Outputs:
+        None
+        """
+
+        if session.game.get_state() != Engine.ANSWER:
+            return
+
+        category = session.game.get_category()
+        (question, answers, correct) = self.deck.draw(category)
+        session.question = Protocol.pack_question(session.number, category,
+                                                  question, answers)
+        session.correct = correct
+        self.push(session, Protocol.QUESTION, session.question)
+
+    def send_stats(self, connection, payload):
+        """
+        Method Name:
+        send_stats
+
+        Description:
+        Send the server statistics
+
+        Inputs:
+        connection - Connection object
+        payload - STATS payload (empty)
+
+        Outputs:
+        None
+        """
+
+        connection.send_message(
+            Protocol.STATS_REPLY,
+            Protocol.STATS_PAYLOAD.pack(len(self.sessions),
+                                        get_cpu_time() - self.start_cpu,
+                                        time.time() - self.start_time,
+                                        self.actions))
+
+    def push_state(self, session):
+        """
+        Method Name:
+        push_state
+
+        Description:
+        Send the state of a game to its watchers
+
+        Inputs:
+        session - Session object
+
+        Outputs:
+        None
+        """
+
+        self.push(session, Protocol.STATE,
+                  Protocol.pack_state(session.number, session.game))
+
+    def push(self, session, message_type, payload):
+        """
+        Method Name:
+        push
+
+        Description:
+        Send a message to the watchers of a game
+
+        Inputs:
+        session - Session object
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        # Only frame the message once
+        frame = Protocol.encode(message_type, payload)
+        for connection in session.watchers:
+            connection.send_frame(frame)
+
+    def watch(self, connection, session):
+        """
+        Method Name:
+        watch
+
+        Description:
+        Send the messages of a game to a connection
+
+        Inputs:
+        connection - Connection object
+        session - Session object
+
+        Outputs:
+        None
+        """
+
+        session.watchers.add(connection)
+        connection.games.add(session.number)
+
+    def end(self, session):
+        """
+        Method Name:
+        end
+
+        Description:
+        Forget a game
+
+        Inputs:
+        session - Session object
+
+        Outputs:
+        None
+        """
+
+        for connection in session.watchers:
+            connection.games.discard(session.number)
+        session.watchers.clear()
+        self.sessions.pop(session.number, None)
+
+    def remove_connection(self, connection):
+        """
+        Method Name:
+        remove_connection
+
+        Description:
+        Stop sending messages to a closed connection.  Games nobody is
+        watching any more are forgotten.
+
+        Inputs:
+        connection - Connection object
+
+        Outputs:
+        None
+        """
+
+        for game_number in connection.games:
+            session = self.sessions.get(game_number)
+            if session is not None:
+                session.watchers.discard(connection)
+                if len(session.watchers) == 0:
+                    del self.sessions[game_number]
+        connection.games.clear()
+
+
+class Connection(asyncore.dispatcher):
+    """
+    Class Name:
+    Connection
+
+    Base Class:
+    asyncore.dispatcher
+
+    Description:
+    Define the class for a client connected to the server
+    """
+
+    def __init__(self, sock, server, socket_map=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Start reading messages from a client
+
+        Inputs:
+        sock - connected socket
+        server - Server object
+        socket_map - optional asyncore socket map
+
+        Outputs:
+        None
+        """
+
+        asyncore.dispatcher.__init__(self, sock, map=socket_map)
+        self.server = server
+
+        # The actions and states are small, so send them right away
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Bytes received that are not a whole message yet, frames waiting
+        # to be sent and the numbers of the games being watched
+        self.incoming = ""
+        self.outgoing = []
+        self.games = set()
+
+    def handle_read(self):
+        """
+        Method Name:
+        handle_read
+
+        Description:
+        Read from the client and play the messages received
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        data = self.recv(READ_SIZE)
+        if not data:
+            return
+
+        try:
+            (messages, self.incoming) = Protocol.split_frames(self.incoming +
+                                                              data)
+        except ValueError:
+            self.handle_close()
+            return
+
+        for (message_type, payload) in messages:
+            self.server.handle_message(self, message_type, payload)
+
+    def writable(self):
+        """
+        Method Name:
+        writable
+
+        Description:
+        Check if there is anything to send
+
+        Inputs:
+        None
+
+        Outputs:
+        True if there are frames waiting to be sent
+        """
+
+        return len(self.outgoing) > 0
+
+    def handle_write(self):
+        """
+        Method Name:
+        handle_write
+
+        Description:
+        Send as much as the socket will take.  The frames waiting are
+        sent together.
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        data = "".join(self.outgoing)
+        sent = self.send(data)
+        if sent < len(data):
+            self.outgoing = [data[sent:]]
+        else:
+            self.outgoing = []
+
+    def handle_close(self):
+        """
+        Method Name:
+        handle_close
+
+        Description:
+        Close the connection and stop watching its games
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.server.remove_connection(self)
+        self.close()
+
+    def send_message(self, message_type, payload=""):
+        """
+        Method Name:
+        send_message
+
+        Description:
+        Send a message to the client
+
+        Inputs:
+        message_type - message type
+        payload - message payload
+
+        Outputs:
+        None
+        """
+
+        self.send_frame(Protocol.encode(message_type, payload))
+
+    def send_frame(self, frame):
+        """
+        Method Name:
+        send_frame
+
+        Description:
+        Send a framed message to the client
+
+        Inputs:
+        frame - frame bytes
+
+        Outputs:
+        None
+        """
+
+        self.outgoing.append(frame)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_cpu_time():
+    """
+    Function Name:
+    get_cpu_time
+
+    Description:
+    Get the CPU time used by this process
+
+    Inputs:
+    None
+
+    Outputs:
+    User and system CPU seconds
+    """
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def serve(address=(HOST, PORT), question_file="questions.csv", ready=None):
+    """
+    Function Name:
+    serve
+
+    Description:
+    Run a game server until the process is stopped
+
+    Inputs:
+    address - (host, port) to listen on.  Port 0 picks a free port.
+    question_file - question file (CSV, question pack or question
+                    database)
+    ready - optional multiprocessing queue to put the port on once the
+            server is listening
+
+    Outputs:
+    None
+    """
+
+    socket_map = {}
+    server = Server(address, question_file, socket_map=socket_map)
+    if ready is not None:
+        ready.put(server.get_port())
+
+    asyncore.loop(timeout=1.0, use_poll=True, map=socket_map)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Trivial Pursuit game "
+                                                 "server")
+    parser.add_argument("questions", nargs="?", default="questions.csv",
+                        help="question file (CSV, question pack or question "
+                             "database)")
+    parser.add_argument("--host", default=HOST,
+                        help="address to listen on (default %(default)s)")
+    parser.add_argument("--port", type=int, default=PORT,
+                        help="port to listen on (default %(default)s)")
+    args = parser.parse_args()
+
+    print "Serving games on %s:%d" % (args.host, args.port)
+    serve((args.host, args.port), args.questions)
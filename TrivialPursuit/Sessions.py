@@ -0,0 +1,238 @@
+"""
+Module:
+Sessions.py
+
+Author:
+Mark Nauman
+
+Description:
+Container for running many games in one process.  Each game is a
+GameBoard drawing on a surface of its own, with its own tiles, players,
+dice and dialogs, so the games do not change each other.  The questions
+are read once and shared, but every game deals them in its own shuffle.
+Every game gets a seed of its own split from the seed of the container,
+so the games played with the same seed and clicks are the same.
+
+The games are played by handing clicks (and key presses) to them by game
+number, e.g., from one window showing a game at a time or from a program
+playing lots of games.  The display has to be set up before the first
+game is created, because the tile images are converted to its format.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import pygame
+import GameBoard
+import Questions
+import RandomStreams
+
+################################################################################
+# Variables
+################################################################################
+
+# None
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Sessions:
+    """
+    Class Name:
+    Sessions
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the games running in this process
+    """
+
+    def __init__(self, screen_size=(630, 630), question_file="questions.csv",
+                 seed=None):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Open the questions.  There are no games yet.
+
+        Inputs:
+        screen_size - size tuple (width, height) of the game screens
+        question_file - question file (CSV, question pack or question
+                        database)
+        seed - optional random seed the seeds of the games are split
+               from (a new one is picked if not given)
+
+        Outputs:
+        None
+        """
+
+        self.screen_size = screen_size
+        self.streams = RandomStreams.RandomStreams(seed)
+        self.questions = Questions.Questions(
+            question_file, self.streams.get(RandomStreams.DECK))
+
+        # Games being played {game number: GameBoard}
+        self.games = {}
+        self.count = 0
+
+    def create(self, num_players, names=None):
+        """
+        Method Name:
+        create
+
+        Description:
+        Start a game on a screen of its own
+
+        Inputs:
+        num_players - number of players
+        names - optional list of the player names (asked for in the game's
+                dialogs if not given)
+
+        Outputs:
+        Game number
+        """
+
+        self.count += 1
+        screen = pygame.Surface(self.screen_size)
+        seed = self.streams.split(self.count).get_seed()
+        self.games[self.count] = GameBoard.GameBoard(screen, num_players,
+                                                     names=names,
+                                                     questions=self.questions,
+                                                     seed=seed)
+        return self.count
+
+    def get(self, number):
+        """
+        Method Name:
+        get
+
+        Description:
+        Get a game
+
+        Inputs:
+        number - game number
+
+        Outputs:
+        GameBoard object
+        """
+
+        return self.games[number]
+
+    def handle_event(self, number, event):
+        """
+        Method Name:
+        handle_event
+
+        Description:
+        Give a game an event the way the main loop does.  A left click
+        that no dialog used is played on the board.
+
+        Inputs:
+        number - game number
+        event - pygame event (MOUSEBUTTONDOWN events need a pos)
+
+        Outputs:
+        Name of the game winner
+        """
+
+        game_board = self.games[number]
+        clicked = False
+        if not game_board.handle_event(event):
+            clicked = ((event.type == pygame.MOUSEBUTTONDOWN) and
+                       (event.button == 1))
+
+        if clicked:
+            return game_board.execute(True, event.pos)
+
+        return game_board.execute(False)
+
+    def click(self, number, pos):
+        """
+        Method Name:
+        click
+
+        Description:
+        Click a game with the left mouse button
+
+        Inputs:
+        number - game number
+        pos - clicked coordinate tuple (x, y) on the game screen
+
+        Outputs:
+        Name of the game winner
+        """
+
+        event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)
+        return self.handle_event(number, event)
+
+    def remove(self, number):
+        """
+        Method Name:
+        remove
+
+        Description:
+        Forget a game
+
+        Inputs:
+        number - game number
+
+        Outputs:
+        None
+        """
+
+        del self.games[number]
+
+    def keys(self):
+        """
+        Method Name:
+        keys
+
+        Description:
+        Get the numbers of the games being played
+
+        Inputs:
+        None
+
+        Outputs:
+        List of game numbers
+        """
+
+        return self.games.keys()
+
+    def __len__(self):
+        """
+        Method Name:
+        __len__
+
+        Description:
+        Get the number of games being played
+
+        Inputs:
+        None
+
+        Outputs:
+        Number of games
+        """
+
+        return len(self.games)
+
+################################################################################
+# Functions
+################################################################################
+
+# No functions.  Everything is in classes above.
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
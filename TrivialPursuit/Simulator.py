@@ -0,0 +1,622 @@
+"""
+Module:
+Simulator.py
+
+Author:
+Mark Nauman
+
+Description:
+Plays lots of complete games with the headless engine to tune board
+layouts and question difficulty.  How likely a player is to answer a
+question is decided by an answer model.  The games are split into
+batches which are played on a pool of processes.  Every batch has its
+own seed, and every game of a batch has its own generators split from
+it (see RandomStreams), so the results only depend on the seed, not on
+the number of processes.
+
+Run "python Simulator.py --help" for the options.  The --vectorized
+option plays all of the games at once with NumPy (see VectorSimulator).
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import argparse
+import multiprocessing
+import time
+import Engine
+import RandomStreams
+
+################################################################################
+# Variables
+################################################################################
+
+# Give up on a game after this many dice rolls
+MAX_TURNS = 10000
+
+# Number of games played by each batch
+BATCH_SIZE = 250
+
+################################################################################
+# Classes
+################################################################################
+
+
+class ConstantModel:
+    """
+    Class Name:
+    ConstantModel
+
+    Base Class:
+    None
+
+    Description:
+    Answer model where every question has the same chance of being
+    answered correctly
+    """
+
+    def __init__(self, probability):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the answer probability
+
+        Inputs:
+        probability - chance of answering correctly (0.0 to 1.0)
+
+        Outputs:
+        None
+        """
+
+        self.probability = probability
+
+    def get_probability(self, player, category):
+        """
+        Method Name:
+        get_probability
+
+        Description:
+        Get the chance of a player answering a question correctly
+
+        Inputs:
+        player - Engine.Player object
+        category - question category
+
+        Outputs:
+        Chance of answering correctly (0.0 to 1.0)
+        """
+
+        return self.probability
+
+
+class CategoryModel:
+    """
+    Class Name:
+    CategoryModel
+
+    Base Class:
+    None
+
+    Description:
+    Answer model where each question category has its own chance of
+    being answered correctly (i.e., its own difficulty)
+    """
+
+    def __init__(self, probabilities, default=0.5):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the answer probabilities
+
+        Inputs:
+        probabilities - dictionary of {category: chance of answering}
+        default - chance for categories not in the dictionary
+
+        Outputs:
+        None
+        """
+
+        self.probabilities = dict(probabilities)
+        self.default = default
+
+    def get_probability(self, player, category):
+        """
+        Method Name:
+        get_probability
+
+        Description:
+        Get the chance of a player answering a question correctly
+
+        Inputs:
+        player - Engine.Player object
+        category - question category
+
+        Outputs:
+        Chance of answering correctly (0.0 to 1.0)
+        """
+
+        return self.probabilities.get(category, self.default)
+
+
+class PlayerModel:
+    """
+    Class Name:
+    PlayerModel
+
+    Base Class:
+    None
+
+    Description:
+    Answer model where each player has their own answer model (e.g.,
+    a strong player against weak players)
+    """
+
+    def __init__(self, models):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the answer models
+
+        Inputs:
+        models - list of answer models, one per player number
+
+        Outputs:
+        None
+        """
+
+        self.models = list(models)
+
+    def get_probability(self, player, category):
+        """
+        Method Name:
+        get_probability
+
+        Description:
+        Get the chance of a player answering a question correctly
+
+        Inputs:
+        player - Engine.Player object
+        category - question category
+
+        Outputs:
+        Chance of answering correctly (0.0 to 1.0)
+        """
+
+        model = self.models[(player.player_number - 1) % len(self.models)]
+        return model.get_probability(player, category)
+
+
+class Results:
+    """
+    Class Name:
+    Results
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the statistics collected from the games
+    """
+
+    def __init__(self, num_players):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Initialize the statistics
+
+        Inputs:
+        num_players - number of players in each game
+
+        Outputs:
+        None
+        """
+
+        # Number of games played and games nobody won
+        self.games = 0
+        self.unfinished = 0
+
+        # Histogram of {dice rolls: games} for the games with a winner
+        self.turns = {}
+
+        # Number of wins for each player seat
+        self.wins = [0] * num_players
+
+        # Number of times a piece landed on each tile {(row, col): count}
+        self.landings = {}
+
+    def add_game(self, winner, turns, landings):
+        """
+        Method Name:
+        add_game
+
+        Description:
+        Add the statistics for one game
+
+        Inputs:
+        winner - index of the winning player or None
+        turns - number of dice rolls in the game
+        landings - list of (row, col) tiles landed on
+
+        Outputs:
+        None
+        """
+
+        self.games += 1
+
+        if winner is None:
+            self.unfinished += 1
+        else:
+            self.wins[winner] += 1
+            self.turns[turns] = self.turns.get(turns, 0) + 1
+
+        for location in landings:
+            self.landings[location] = self.landings.get(location, 0) + 1
+
+    def merge(self, other):
+        """
+        Method Name:
+        merge
+
+        Description:
+        Add the statistics from another Results object
+
+        Inputs:
+        other - Results object
+
+        Outputs:
+        None
+        """
+
+        self.games += other.games
+        self.unfinished += other.unfinished
+
+        for (turns, count) in other.turns.items():
+            self.turns[turns] = self.turns.get(turns, 0) + count
+
+        for index in range(len(self.wins)):
+            self.wins[index] += other.wins[index]
+
+        for (location, count) in other.landings.items():
+            self.landings[location] = self.landings.get(location, 0) + count
+
+    def get_percentile(self, percent):
+        """
+        Method Name:
+        get_percentile
+
+        Description:
+        Get a percentile of the number of dice rolls needed to win
+
+        Inputs:
+        percent - percentile (0 to 100)
+
+        Outputs:
+        Number of dice rolls (0 if nobody won a game)
+        """
+
+        total = sum(self.turns.values())
+        needed = total * percent / 100.0
+
+        count = 0
+        for turns in sorted(self.turns.keys()):
+            count += self.turns[turns]
+            if count >= needed:
+                return turns
+
+        return 0
+
+    def report(self, layout, elapsed):
+        """
+        Method Name:
+        report
+
+        Description:
+        Print the statistics
+
+        Inputs:
+        layout - board spaces the games were played on
+        elapsed - time taken to play the games in seconds
+
+        Outputs:
+        None
+        """
+
+        print "Games:        %d (%d unfinished)" % (self.games, self.unfinished)
+        print "Time:         %.2fs" % elapsed
+        print "Games/sec:    %.1f" % (self.games / max(elapsed, 1e-9))
+
+        # Dice rolls needed to win
+        finished = sum(self.turns.values())
+        if finished > 0:
+            mean = sum([turns * count for (turns, count)
+                        in self.turns.items()]) / float(finished)
+            print "Turns to win: mean %.1f, min %d, max %d" % \
+                (mean, min(self.turns.keys()), max(self.turns.keys()))
+            print "              " + ", ".join(
+                ["p%d %d" % (percent, self.get_percentile(percent))
+                 for percent in (10, 25, 50, 75, 90, 99)])
+
+        # Wins for each seat
+        print "Wins:         " + ", ".join(
+            ["Player #%d %.1f%%" % (index + 1,
+                                    100.0 * wins / max(self.games, 1))
+             for (index, wins) in enumerate(self.wins)])
+
+        # Landing frequencies laid out like the board
+        total = sum(self.landings.values())
+        print "Landings (% of all moves):"
+        for row in range(len(layout)):
+            line = ""
+            for col in range(len(layout[row])):
+                if layout[row][col] is None:
+                    line += "      "
+                else:
+                    count = self.landings.get((row, col), 0)
+                    line += "%6.2f" % (100.0 * count / max(total, 1))
+            print line
+
+################################################################################
+# Functions
+################################################################################
+
+
+def choose_move(game, model, rng):
+    """
+    Function Name:
+    choose_move
+
+    Description:
+    Pick the tile to move to.  Head for the hub when the player can win,
+    otherwise head for a headquarter the player still needs, otherwise
+    pick one of the tiles at random.
+
+    Inputs:
+    game - Engine.Game object waiting for a move
+    model - answer model
+    rng - random number generator
+
+    Outputs:
+    (row, col) of the selected tile
+    """
+
+    player = game.get_player()
+    choices = game.get_choices()
+
+    for location in choices:
+        tile_type = game.board.get_type(location)
+
+        # Go for the win
+        if (tile_type == "Hub") and player.can_win():
+            return location
+
+        # Go for a missing wedge
+        if (game.board.get_headquarter(location) and
+                player.answered[tile_type] is False):
+            return location
+
+    return rng.choice(choices)
+
+
+def choose_category(game, model):
+    """
+    Function Name:
+    choose_category
+
+    Description:
+    Pick the question category on the hub.  The player picks their best
+    category, unless they can win, in which case the other players pick
+    the player's worst category.
+
+    Inputs:
+    game - Engine.Game object waiting for a category
+    model - answer model
+
+    Outputs:
+    Question category
+    """
+
+    player = game.get_player()
+    ranked = sorted(Engine.CATEGORIES,
+                    key=lambda category: model.get_probability(player,
+                                                               category))
+
+    if player.can_win():
+        return ranked[0]
+    return ranked[-1]
+
+
+def play_game(board, num_players, model, streams, max_turns=MAX_TURNS):
+    """
+    Function Name:
+    play_game
+
+    Description:
+    Play one complete game
+
+    Inputs:
+    board - Engine.Board object
+    num_players - number of players
+    model - answer model
+    streams - RandomStreams object of the game (the dice, the game and
+              the answers each draw from their own generator)
+    max_turns - give up after this many dice rolls
+
+    Outputs:
+    (index of the winning player or None, dice rolls, tiles landed on)
+    """
+
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(num_players)]
+    rng = streams.get(RandomStreams.GAME)
+    answers = streams.get(RandomStreams.ANSWER)
+    game = Engine.Game(board, players,
+                       Engine.Dice(streams.get(RandomStreams.DICE)), rng)
+
+    # Play the game in one go, keeping the tiles landed on
+    landings = []
+
+    def move(game):
+        location = choose_move(game, model, rng)
+        landings.append(location)
+        return location
+
+    def answer(game):
+        probability = model.get_probability(game.get_player(),
+                                            game.get_category())
+        return answers.random() < probability
+
+    game.play(move, lambda game: choose_category(game, model), answer,
+              max_turns)
+
+    # Nobody won in time
+    if game.get_winner() is None:
+        return (None, game.turns, landings)
+
+    return (game.player, game.turns, landings)
+
+
+def play_batch((layout, num_players, model, seed, games)):
+    """
+    Function Name:
+    play_batch
+
+    Description:
+    Play a batch of games.  This is what runs on the worker processes.
+    Each game gets its own generators split from the batch seed.
+
+    Inputs:
+    layout - board spaces
+    num_players - number of players
+    model - answer model
+    seed - random seed for this batch
+    games - number of games to play
+
+    Outputs:
+    Results object
+    """
+
+    streams = RandomStreams.RandomStreams(seed)
+    board = Engine.Board(layout)
+
+    results = Results(num_players)
+    for game_number in range(games):
+        results.add_game(*play_game(board, num_players, model,
+                                    streams.split(game_number)))
+
+    return results
+
+
+def simulate(layout, num_players, model, games, seed, processes=None):
+    """
+    Function Name:
+    simulate
+
+    Description:
+    Play the games on a pool of processes and combine the results.  The
+    batches and their seeds only depend on the seed and the number of
+    games so the results are the same for any number of processes.
+
+    Inputs:
+    layout - board spaces
+    num_players - number of players
+    model - answer model
+    games - number of games to play
+    seed - random seed
+    processes - number of processes (None for one per CPU, 1 for none)
+
+    Outputs:
+    Results object
+    """
+
+    # Split the games into batches, each with its own seed split from the
+    # seed, so no two batches draw from the same generator
+    streams = RandomStreams.RandomStreams(seed)
+    batches = []
+    for start in range(0, games, BATCH_SIZE):
+        batches.append((layout, num_players, model,
+                        streams.split(start / BATCH_SIZE).get_seed(),
+                        min(BATCH_SIZE, games - start)))
+
+    # Play the batches
+    if processes == 1:
+        batch_results = map(play_batch, batches)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            batch_results = pool.map(play_batch, batches)
+        finally:
+            pool.close()
+            pool.join()
+
+    # Combine the results in batch order
+    results = Results(num_players)
+    for batch in batch_results:
+        results.merge(batch)
+
+    return results
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Simulate Trivial Pursuit "
+                                                 "games")
+    parser.add_argument("--games", type=int, default=10000,
+                        help="number of games to play")
+    parser.add_argument("--players", type=int, default=4,
+                        help="number of players in each game")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of processes (default one per CPU)")
+    parser.add_argument("--size", type=int, default=None,
+                        help="play on a generated size x size board")
+    parser.add_argument("--probability", type=float, default=0.5,
+                        help="chance of answering a question correctly")
+    parser.add_argument("--category", action="append", default=[],
+                        metavar="CATEGORY=PROBABILITY",
+                        help="chance of answering a category correctly")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="play the games in lockstep with NumPy")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    # Setup the board
+    if args.size is None:
+        layout = Engine.LAYOUT
+    else:
+        layout = Engine.generate_layout(args.size)
+
+    # Setup the answer model
+    probabilities = {}
+    for option in args.category:
+        (category, probability) = option.split("=")
+        probabilities[category] = float(probability)
+    model = CategoryModel(probabilities, args.probability)
+
+    # Play the games
+    start = time.time()
+    if args.vectorized:
+
+        # Only need NumPy when asked for
+        import VectorSimulator
+        results = VectorSimulator.simulate(layout, args.players, model,
+                                           args.games, args.seed)
+    else:
+        results = simulate(layout, args.players, model, args.games, args.seed,
+                           args.processes)
+    results.report(layout, time.time() - start)
@@ -17,6 +17,8 @@ None at this time
 ################################################################################
 
 import pygame
+import Assets
+import Timings
 
 ################################################################################
 # Variables
@@ -47,9 +49,10 @@ class Tile:
     # Set the tile type
     tile_type = "N/A"
 
-    # Set the tile image
+    # Set the tile image and how faded it is when the tile is not active
     image_file = ""
     image = None
+    inactive_alpha = 50
 
     def __init__(self, headquarter=False):
         """
@@ -73,9 +76,12 @@ class Tile:
         self.active = False
         self.headquarter = headquarter
 
-        # Initialize the graphics
+        # Initialize the graphics.  The tile is dirty when it has changed
+        # since it was last drawn.
         self.surface = None
+        self.inactive_image = None
         self.rect = None
+        self.dirty = True
 
     def initialize(self, size, position):
         """
@@ -97,10 +103,14 @@ class Tile:
         self.size = size
         self.position = position
 
-        # Create the image
-        self.image = pygame.image.load(self.image_file).convert()
-        self.image = pygame.transform.scale(self.image, self.size)
+        # Get the images (shared with the other tiles of this type)
+        self.image = Assets.get_image(self.image_file, self.size)
+        self.inactive_image = Assets.get_image(self.image_file, self.size,
+                                               self.inactive_alpha)
+        self.rect = pygame.Rect(self.position, self.size)
+        self.dirty = True
 
+    @Timings.timed("Tile.draw")
     def draw(self, screen):
         """
         Method Name:
@@ -113,19 +123,24 @@ class Tile:
         screen - screen to draw the tile on
 
         Outputs:
-        None
+        Rectangle of the screen that was drawn
         """
 
-        # If the tile is not active, grey out the image
+        # If the tile is not active, use the greyed out image
         if self.active is False:
-            self.image.set_alpha(50)
+            image = self.inactive_image
 
-        # If the tile is active, set the image to the normal
+        # If the tile is active, use the normal image
         else:
-            self.image.set_alpha(255)
+            image = self.image
+
+        # Draw the image to the screen.  The greyed out image is blended
+        # with the background, so clear it first.
+        screen.fill((0, 0, 0), self.rect)
+        self.rect = screen.blit(image, self.position)
+        self.dirty = False
 
-        # Draw the image to the screen
-        self.rect = screen.blit(self.image, self.position)
+        return self.rect
 
     def clicked(self, pos):
         """
@@ -216,6 +231,23 @@ class Tile:
 
         return self.headquarter
 
+    def get_space(self):
+        """
+        Method Name:
+        get_space
+
+        Description:
+        Return the Engine board space for this tile
+
+        Inputs:
+        None
+
+        Outputs:
+        (self.tile_type, self.headquarter)
+        """
+
+        return (self.tile_type, self.headquarter)
+
     def activate(self):
         """
         Method Name:
@@ -231,7 +263,9 @@ class Tile:
         None
         """
 
-        self.active = True
+        if self.active is False:
+            self.active = True
+            self.dirty = True
 
     def deactivate(self):
         """
@@ -248,7 +282,9 @@ class Tile:
         None
         """
 
-        self.active = False
+        if self.active is True:
+            self.active = False
+            self.dirty = True
 
 
 class People(Tile):
@@ -387,6 +423,113 @@ class Hub(Tile):
 # Functions
 ################################################################################
 
+def create_tile(space):
+    """
+    Function Name:
+    create_tile
+
+    Description:
+    Create the tile object for an Engine board space
+
+    Inputs:
+    space - (tile type, headquarter) or None for an illegal space
+
+    Outputs:
+    Tile object or None
+    """
+
+    # Illegal spaces do not have a tile
+    if space is None:
+        return None
+
+    # Find the class for the tile type
+    (tile_type, headquarter) = space
+    for tile_class in [People, Events, Places, Holidays, RollAgain, Hub]:
+        if tile_class.tile_type == tile_type:
+            return tile_class(headquarter)
+
+    raise ValueError("Unknown tile type %s" % tile_type)
+
+
+def create_board(layout):
+    """
+    Function Name:
+    create_board
+
+    Description:
+    Create the tile objects for an Engine board layout
+
+    Inputs:
+    layout - board spaces [[Top Row], ..., [Last Row]]
+
+    Outputs:
+    Game board tiles [[Top Row], ..., [Last Row]]
+    """
+
+    return [[create_tile(space) for space in row] for row in layout]
+
+
+def find_tile(board, tile_size, pos):
+    """
+    Function Name:
+    find_tile
+
+    Description:
+    Find the board location under a screen position.  The tiles are laid
+    out in a regular grid from the top left corner of the screen, so the
+    location is worked out from the position instead of checking every
+    tile.
+
+    Inputs:
+    board - game board tiles [[Top Row], ..., [Last Row]]
+    tile_size - tile size tuple (width, height) in pixels
+    pos - screen coordinate tuple (x, y) in pixels
+
+    Outputs:
+    Board location tuple (row, col), or None if there is no tile there
+    """
+
+    (x, y) = pos
+    (tile_width, tile_height) = tile_size
+    if (x < 0) or (y < 0):
+        return None
+
+    row = y / tile_height
+    col = x / tile_width
+    if (row >= len(board)) or (col >= len(board[row])):
+        return None
+    if board[row][col] is None:
+        return None
+
+    return (row, col)
+
+
+def get_layout(board):
+    """
+    Function Name:
+    get_layout
+
+    Description:
+    Get the Engine board layout for the tile objects
+
+    Inputs:
+    board - game board tiles [[Top Row], ..., [Last Row]]
+
+    Outputs:
+    Board spaces [[Top Row], ..., [Last Row]]
+    """
+
+    layout = []
+    for row in board:
+        layout.append([])
+        for tile in row:
+            if tile is None:
+                layout[-1].append(None)
+            else:
+                layout[-1].append(tile.get_space())
+
+    return layout
+
 
 ################################################################################
 # Main
@@ -0,0 +1,397 @@
+"""
+Module:
+Timings.py
+
+Author:
+Mark Nauman
+
+Description:
+Latency histograms of the main loop and the calls that draw the board
+and ask the questions, to find the frames that stutter without an
+outside profiler.  Timing is turned on with environment variables:
+
+    TP_TIMINGS=timings.json   time the calls and write the histograms to
+                              the file as JSON when the game exits
+    TP_TIMINGS_OVERLAY=1      time the calls and show the slowest ones
+                              over the game board while it is played
+
+When neither is set, timed() hands back the function it was given, so
+the calls cost nothing extra.  Each call adds one to a bucket of a
+histogram: bucket N counts the calls that took less than 2**N
+microseconds (and at least half that).  The percentiles are read off the
+buckets, so they are rounded up to a power of two.  The overlay is
+drawn every frame and the tiles under it are drawn again with it, so
+the overlay adds to the Tile.draw counts.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import atexit
+import functools
+import json
+import os
+import time
+import Assets
+
+################################################################################
+# Variables
+################################################################################
+
+# Where to write the histograms and if the overlay is shown
+FILE_NAME = os.environ.get("TP_TIMINGS") or None
+OVERLAY = bool(os.environ.get("TP_TIMINGS_OVERLAY"))
+
+# Timing is on if anything wants the histograms
+ENABLED = (FILE_NAME is not None) or OVERLAY
+
+# Number of buckets in a histogram.  The last bucket counts everything
+# from 2**(BUCKETS-2) microseconds (about 18 minutes) up.
+BUCKETS = 32
+
+# Percentiles reported
+PERCENTILES = (50, 90, 99)
+
+# Overlay font (face, size, bold, italic), colors and the most lines shown
+OVERLAY_FONT = ("Courier New", 12, True, False)
+OVERLAY_COLOR = (255, 255, 0)
+OVERLAY_BACKGROUND = (0, 0, 0)
+OVERLAY_LINES = 8
+
+# Histograms by name {name: Histogram}
+histograms = {}
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Histogram:
+    """
+    Class Name:
+    Histogram
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the latencies of one call, counted in power of
+    two buckets
+    """
+
+    def __init__(self):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Start with no calls
+
+        Inputs:
+        None
+
+        Outputs:
+        None
+        """
+
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, seconds):
+        """
+        Method Name:
+        add
+
+        Description:
+        Count a call
+
+        Inputs:
+        seconds - time the call took
+
+        Outputs:
+        None
+        """
+
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[min(bucket, BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.longest:
+            self.longest = seconds
+
+    def get_percentile(self, percentile):
+        """
+        Method Name:
+        get_percentile
+
+        Description:
+        Get the time a percentage of the calls took less than
+
+        Inputs:
+        percentile - percentage of the calls (0 to 100)
+
+        Outputs:
+        Seconds (the top of the bucket the percentile falls in, but no
+        more than the longest call)
+        """
+
+        wanted = self.count * percentile / 100.0
+        seen = 0
+        for (bucket, count) in enumerate(self.buckets):
+            seen += count
+            if (count > 0) and (seen >= wanted):
+                return min((1 << bucket) * 1e-6, self.longest)
+
+        return self.longest
+
+    def to_dict(self):
+        """
+        Method Name:
+        to_dict
+
+        Description:
+        Get the histogram as a dictionary (e.g., to write as JSON)
+
+        Inputs:
+        None
+
+        Outputs:
+        Dictionary of the count, the total, mean, longest and percentile
+        times in milliseconds, and the buckets as a list of [less than
+        this many microseconds, count], leaving out the empty buckets
+        """
+
+        result = {"count": self.count,
+                  "total_ms": self.total * 1e3,
+                  "mean_ms": self.total * 1e3 / max(self.count, 1),
+                  "max_ms": self.longest * 1e3,
+                  "buckets": [[1 << bucket, count]
+                              for (bucket, count) in enumerate(self.buckets)
+                              if count > 0]}
+        for percentile in PERCENTILES:
+            result["p%d_ms" % percentile] = \
+                self.get_percentile(percentile) * 1e3
+
+        return result
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_histogram(name):
+    """
+    Function Name:
+    get_histogram
+
+    Description:
+    Get the histogram of a name, starting it if there is none yet
+
+    Inputs:
+    name - name of the call (e.g., "GameBoard.draw")
+
+    Outputs:
+    Histogram object
+    """
+
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = Histogram()
+        histograms[name] = histogram
+
+    return histogram
+
+
+def record(name, seconds):
+    """
+    Function Name:
+    record
+
+    Description:
+    Count a call in the histogram of its name
+
+    Inputs:
+    name - name of the call
+    seconds - time the call took
+
+    Outputs:
+    None
+    """
+
+    get_histogram(name).add(seconds)
+
+
+def wrap(name, function):
+    """
+    Function Name:
+    wrap
+
+    Description:
+    Time every call of a function
+
+    Inputs:
+    name - name of the histogram
+    function - function to time
+
+    Outputs:
+    Function doing the same as the function, timing it
+    """
+
+    histogram = get_histogram(name)
+
+    @functools.wraps(function)
+    def timed_function(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.add(time.time() - start)
+
+    return timed_function
+
+
+def timed(name):
+    """
+    Function Name:
+    timed
+
+    Description:
+    Decorator timing a function (or method) if timing is on
+
+    Inputs:
+    name - name of the histogram
+
+    Outputs:
+    Decorator
+    """
+
+    def decorate(function):
+        if not ENABLED:
+            return function
+        return wrap(name, function)
+
+    return decorate
+
+
+def get_histograms():
+    """
+    Function Name:
+    get_histograms
+
+    Description:
+    Get the histograms of the calls made so far
+
+    Inputs:
+    None
+
+    Outputs:
+    Dictionary of {name: dictionary from Histogram.to_dict}
+    """
+
+    return dict((name, histogram.to_dict())
+                for (name, histogram) in histograms.iteritems()
+                if histogram.count > 0)
+
+
+def reset():
+    """
+    Function Name:
+    reset
+
+    Description:
+    Forget the calls counted so far
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    for histogram in histograms.itervalues():
+        histogram.__init__()
+
+
+def dump(file_name=None):
+    """
+    Function Name:
+    dump
+
+    Description:
+    Write the histograms to a JSON file
+
+    Inputs:
+    file_name - optional file name (defaults to TP_TIMINGS)
+
+    Outputs:
+    None
+    """
+
+    if file_name is None:
+        file_name = FILE_NAME
+
+    with open(file_name, "w") as output:
+        json.dump(get_histograms(), output, indent=2, sort_keys=True)
+        output.write("\n")
+
+
+def draw_overlay(screen, pos=(0, 0)):
+    """
+    Function Name:
+    draw_overlay
+
+    Description:
+    Draw the calls that take the longest (by their 99th percentile) as
+    text over the screen.  The text changes every frame, so it is not
+    kept in the Assets text cache.
+
+    Inputs:
+    screen - screen to draw on
+    pos - coordinate tuple (x, y) of the top left of the text
+
+    Outputs:
+    Rectangle of the screen that was drawn, or None if nothing was
+    """
+
+    ranked = sorted(((histogram.get_percentile(99), name, histogram)
+                     for (name, histogram) in histograms.iteritems()
+                     if histogram.count > 0), reverse=True)
+    if len(ranked) == 0:
+        return None
+
+    font = Assets.get_font(OVERLAY_FONT)
+    lines = ["%-22s %6s %7s %7s" % ("", "calls", "p99 ms", "max ms")]
+    for (slowest, name, histogram) in ranked[:OVERLAY_LINES]:
+        lines.append("%-22s %6d %7.2f %7.2f" %
+                     (name[:22], histogram.count, slowest * 1e3,
+                      histogram.longest * 1e3))
+
+    (x, y) = pos
+    rect = None
+    for line in lines:
+        text = font.render(line, True, OVERLAY_COLOR, OVERLAY_BACKGROUND)
+        drawn = screen.blit(text, (x, y))
+        y += text.get_height()
+        if rect is None:
+            rect = drawn
+        else:
+            rect = rect.union(drawn)
+
+    return rect
+
+# Write the histograms when the game exits
+if FILE_NAME is not None:
+    atexit.register(dump)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
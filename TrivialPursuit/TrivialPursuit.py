@@ -6,7 +6,17 @@ Author:
 Mark Nauman
 
 Description:
-This is the main program for Team #1's Trivial Pursuit game
+This is the main program for Team #1's Trivial Pursuit game.  The
+question file (CSV, question pack or question database) can be given on
+the command line.  To play a game hosted by a game server instead, run
+"python TrivialPursuit.py --server HOST:PORT".  "--computers N" has the
+computer play for the last N players, "--planner" has them move by a
+solved plan (see Planner) instead of searching.  "--log FILE" writes
+the events of the game to a log (see GameLog) and "--save FILE" saves
+the game after every turn, carrying on from the saved game if there is
+one (see SaveGame).  "--seed N" plays the game with a random seed, so
+the same choices play the same game again.  Set TP_TIMINGS or
+TP_TIMINGS_OVERLAY to time the main loop and the drawing (see Timings).
 
 Improvements/Todo:
 None at this time
@@ -16,16 +26,25 @@ None at this time
 # Dependencies
 ################################################################################
 
+import sys
+import time
 import pygame
-import pymsgbox
 import WelcomeScreen
 import GameBoard
+import Scheduler
+import Client
+import Planner
+import SaveGame
+import Server
+import Timings
 
 ################################################################################
 # Variables
 ################################################################################
 
-# None
+# Milliseconds between the steps of a computer player's turn, so the other
+# players can follow what it does
+COMPUTER_DELAY = 500
 
 ################################################################################
 # Classes
@@ -46,30 +65,101 @@ if __name__ == "__main__":
     # Set the window title
     pygame.display.set_caption("Team #1 - Trivial Pursuit")
 
-    # Enable the clock, we will use this later to limit the frame rate
-    clock = pygame.time.Clock()
+    # Wait for events instead of polling at a fixed frame rate, so the
+    # game does not use the CPU while nobody is playing
+    scheduler = Scheduler.Scheduler()
+
+    # Nothing is done when the mouse moves, so do not wake up for it
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+    # Use the question file, the game server, the number of computer
+    # players, the game log, the save file and the random seed from the
+    # command line, if there are any
+    question_file = "questions.csv"
+    server = None
+    computers = 0
+    computer = None
+    log = None
+    save = None
+    seed = None
+    args = sys.argv[1:]
+    while len(args) > 0:
+        if (len(args) > 1) and (args[0] == "--server"):
+            server = Client.parse_address(args[1], Server.PORT)
+            args = args[2:]
+        elif (len(args) > 1) and (args[0] == "--computers"):
+            computers = int(args[1])
+            args = args[2:]
+        elif args[0] == "--planner":
+            computer = Planner.Planner
+            args = args[1:]
+        elif (len(args) > 1) and (args[0] == "--log"):
+            log = args[1]
+            args = args[2:]
+        elif (len(args) > 1) and (args[0] == "--save"):
+            save = args[1]
+            args = args[2:]
+        elif (len(args) > 1) and (args[0] == "--seed"):
+            seed = int(args[1])
+            args = args[2:]
+        else:
+            question_file = args[0]
+            args = args[1:]
 
     # Initialize the various variables
     state = 1
     welcome_screen = WelcomeScreen.WelcomeScreen(screen)
     game_board = None
+    computer_due = 0
+    overlay_rect = None
+
+    # Carry on with a saved game instead of asking for the players
+    save_file = None
+    if save is not None:
+        save_file = SaveGame.SaveFile(save)
+    if (save_file is not None) and not save_file.is_empty():
+        num_players = save_file.get_num_players()
+        game_board = GameBoard.GameBoard(
+            screen, num_players, question_file,
+            names=save_file.get_names(),
+            computers=range(max(num_players - computers, 0), num_players),
+            computer=computer, log=log, save=save,
+            seed=seed)
+        state = 2
 
     # Main display loop
     done = False
     while done is False:
 
-        # Process any events that have occurred
+        # Sleep until something happens, then process the events
         mouse_click = False
-        for event in pygame.event.get():
+        exposed = False
+        events = scheduler.wait()
+        frame_start = time.time()
+        for event in events:
 
             # If the user wants to quit, let them quit
             if event.type == pygame.QUIT:
                 done = True
 
+            # If the window was uncovered, show all of it again
+            if event.type == pygame.VIDEOEXPOSE:
+                exposed = True
+
+            # Dialogs over the game board get the clicks and key presses
+            # first
+            if (state >= 2) and game_board.handle_event(event):
+                continue
+
             # If the left mouse is pressed
             if (event.type == pygame.MOUSEBUTTONDOWN) and (event.button == 1):
                 mouse_click = True
 
+        # Draw the board under the timing overlay again
+        if overlay_rect is not None:
+            game_board.invalidate(overlay_rect)
+            overlay_rect = None
+
         # If the state is 1 (welcome screen)
         if state == 1:
 
@@ -78,7 +168,12 @@ if __name__ == "__main__":
 
                 # Initialize and move to the game board
                 num_players = welcome_screen.get_num_players()
-                game_board = GameBoard.GameBoard(screen, num_players)
+                game_board = GameBoard.GameBoard(
+                    screen, num_players, question_file, server=server,
+                    computers=range(max(num_players - computers, 0),
+                                    num_players),
+                    computer=computer, log=log, save=save,
+                    seed=seed)
                 state += 1
 
         # If the state is 2 (playing game)
@@ -89,14 +184,47 @@ if __name__ == "__main__":
 
                 text = "Congratulations %s!\n" % winner
                 text += "You are the Winner!"
-                pymsgbox.alert(text, "Congratulations")
-                done = True
+                game_board.dialogs.alert(text, "Congratulations")
+                game_board.draw()
+                state += 1
 
-        # Copy the window buffer to the main display
-        pygame.display.flip()
+            # Wake up for the next step of a computer player's turn
+            elif (game_board.is_computer_turn() and
+                  (pygame.time.get_ticks() >= computer_due)):
+                computer_due = pygame.time.get_ticks() + COMPUTER_DELAY
+                scheduler.call_later(COMPUTER_DELAY, game_board.play_computer)
 
-        # Limit the frame rate so we do not kill the user's CPU
-        clock.tick(10)
+        # If the state is 3 (game over), quit once the winner is told
+        else:
+
+            game_board.draw()
+            if not game_board.dialogs.is_open():
+                done = True
+
+        # Copy the parts of the window buffer that changed to the main
+        # display
+        if state == 1:
+            rects = welcome_screen.get_dirty_rects()
+        else:
+            rects = game_board.get_dirty_rects()
+
+            # Show the slowest calls over the board
+            if Timings.OVERLAY:
+                overlay_rect = Timings.draw_overlay(screen)
+                if overlay_rect is not None:
+                    rects.append(overlay_rect)
+        if exposed:
+            pygame.display.flip()
+        elif len(rects) > 0:
+            pygame.display.update(rects)
+
+        # Time how long the dialog a click opened took to show up
+        if state >= 2:
+            game_board.dialogs.shown()
+
+        # Time the work done for the frame (not the wait for events)
+        if Timings.ENABLED:
+            Timings.record("main loop", time.time() - frame_start)
 
     # When the above function exits, we are okay to quit
     pygame.quit()
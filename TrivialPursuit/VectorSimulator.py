@@ -0,0 +1,361 @@
+"""
+Module:
+VectorSimulator.py
+
+Author:
+Mark Nauman
+
+Description:
+Vectorized version of the Simulator.  Instead of playing one game at a
+time, all of the games are held in NumPy arrays (piece positions, wedge
+bitmasks and the active player) and every game takes its turn at the
+same time.  Moves are looked up in a precomputed transition table built
+from the Engine reachability table.
+
+The games follow the same rules and the same move and category choices
+as Simulator.play_game, but use the NumPy random number generator so
+the individual games are not the same as the Simulator's.
+
+Run "python Simulator.py --vectorized ..." to use it.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import numpy
+import Engine
+import Simulator
+
+################################################################################
+# Variables
+################################################################################
+
+# Tile type codes (question categories are 0 to 3 in Engine.CATEGORIES order)
+ROLL_AGAIN = len(Engine.CATEGORIES)
+HUB = ROLL_AGAIN + 1
+
+# Wedge bitmask of a player holding every wedge
+ALL_WEDGES = (1 << len(Engine.CATEGORIES)) - 1
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Tables:
+    """
+    Class Name:
+    Tables
+
+    Base Class:
+    None
+
+    Description:
+    Define the class for the board lookup tables.  The legal spaces are
+    numbered 0 to N-1 and all of the tables are indexed by that number.
+    """
+
+    def __init__(self, layout):
+        """
+        Method Name:
+        __init__
+
+        Description:
+        Build the lookup tables for a board layout
+
+        Inputs:
+        layout - board spaces [[Top Row], ..., [Last Row]]
+
+        Outputs:
+        None
+        """
+
+        board = Engine.Board(layout)
+
+        # Number the legal spaces
+        self.locations = []
+        for row in range(len(layout)):
+            for col in range(len(layout[row])):
+                if layout[row][col] is not None:
+                    self.locations.append((row, col))
+        index = dict([(location, number) for (number, location)
+                      in enumerate(self.locations)])
+        self.hub = index[board.get_hub()]
+
+        # Tile type code and headquarter wedge bit for each space
+        count = len(self.locations)
+        self.tile_type = numpy.zeros(count, numpy.int8)
+        self.wedge = numpy.zeros(count, numpy.uint8)
+        for (number, location) in enumerate(self.locations):
+            tile_type = board.get_type(location)
+            if tile_type == "Roll Again":
+                self.tile_type[number] = ROLL_AGAIN
+            elif tile_type == "Hub":
+                self.tile_type[number] = HUB
+            else:
+                category = Engine.CATEGORIES.index(tile_type)
+                self.tile_type[number] = category
+                if board.get_headquarter(location):
+                    self.wedge[number] = 1 << category
+
+        # The state of a piece is its space and the wedges it holds packed
+        # into one number (space * 16 + wedge bitmask) so the tables below
+        # can be read with a single index
+        wedge_masks = ALL_WEDGES + 1
+        self.states = count * wedge_masks
+
+        # Transition table [state, roll - 1, choice] of the state a piece
+        # arrives in (before answering the question) plus the number of
+        # choices [state, roll - 1].  The choices are the same as
+        # Simulator.choose_move: head for the hub when the player can win,
+        # otherwise for a headquarter the player still needs, otherwise pick
+        # at random.  When there is a tile to head for it is the only choice.
+        # When there is nowhere to go the only "choice" is to stay put.
+        sides = Engine.Dice.sides
+        width = max([len(choices) for choices in board.reachable.values()])
+        self.width = max(width, 1)
+        self.moves = numpy.zeros((self.states, sides, self.width), numpy.intp)
+        self.counts = numpy.zeros((self.states, sides), numpy.intp)
+
+        for (number, location) in enumerate(self.locations):
+            for roll in range(1, sides + 1):
+                choices = [index[choice] for choice in
+                           board.get_reachable(location, roll)]
+
+                for held in range(wedge_masks):
+                    state = number * wedge_masks + held
+
+                    # Look for a tile to head for
+                    wanted = choices
+                    for destination in choices:
+                        if (((self.tile_type[destination] == HUB) and
+                                (held == ALL_WEDGES)) or
+                                (self.wedge[destination] & ~held)):
+                            wanted = [destination]
+                            break
+
+                    arrive = [destination * wedge_masks + held
+                              for destination in wanted]
+                    self.counts[state, roll - 1] = len(arrive)
+                    self.moves[state, roll - 1, :] = state
+                    self.moves[state, roll - 1, :len(arrive)] = arrive
+
+        # Some boards have spaces a piece can get stuck on
+        self.stuck = bool((self.counts == 0).any())
+
+        # State after answering correctly (adds the headquarter wedge) and
+        # if answering correctly wins the game, for each arrival state
+        self.correct = numpy.zeros(self.states, numpy.intp)
+        self.wins = numpy.zeros(self.states, bool)
+        for number in range(count):
+            for held in range(wedge_masks):
+                state = number * wedge_masks + held
+                self.correct[state] = state | self.wedge[number]
+                self.wins[state] = ((self.tile_type[number] == HUB) and
+                                    (held == ALL_WEDGES))
+
+    def get_chances(self, probabilities):
+        """
+        Method Name:
+        get_chances
+
+        Description:
+        Build the table of the chance of keeping the turn after arriving in
+        a state [player, state].  On the hub the player picks their best
+        category (last one on ties) unless they can win, in which case the
+        other players pick the player's worst category (first one on ties).
+        Same as Simulator.choose_category.
+
+        Inputs:
+        probabilities - answer probabilities [player, category]
+
+        Outputs:
+        NumPy array of chances
+        """
+
+        num_players = len(probabilities)
+        categories = len(Engine.CATEGORIES)
+        wedge_masks = ALL_WEDGES + 1
+        best = categories - 1 - numpy.argmax(probabilities[:, ::-1], axis=1)
+        worst = numpy.argmin(probabilities, axis=1)
+
+        chances = numpy.zeros((num_players, self.states))
+        for player in range(num_players):
+            for number in range(len(self.locations)):
+                tile_type = self.tile_type[number]
+                start = number * wedge_masks
+                end = start + wedge_masks
+
+                # Roll again tiles always keep the turn
+                if tile_type == ROLL_AGAIN:
+                    chances[player, start:end] = 1.0
+
+                elif tile_type == HUB:
+                    chances[player, start:end] = \
+                        probabilities[player, best[player]]
+                    chances[player, end - 1] = \
+                        probabilities[player, worst[player]]
+
+                else:
+                    chances[player, start:end] = \
+                        probabilities[player, tile_type]
+
+        return chances
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_probabilities(model, num_players):
+    """
+    Function Name:
+    get_probabilities
+
+    Description:
+    Build the table of answer probabilities [player, category] from an
+    answer model
+
+    Inputs:
+    model - answer model
+    num_players - number of players
+
+    Outputs:
+    NumPy array of probabilities
+    """
+
+    table = numpy.zeros((num_players, len(Engine.CATEGORIES)))
+    for number in range(num_players):
+        player = Engine.Player(number + 1, None)
+        for (category, name) in enumerate(Engine.CATEGORIES):
+            table[number, category] = model.get_probability(player, name)
+
+    return table
+
+
+def simulate(layout, num_players, model, games, seed,
+             max_turns=Simulator.MAX_TURNS):
+    """
+    Function Name:
+    simulate
+
+    Description:
+    Play all of the games in lockstep.  Every pass of the loop is one
+    dice roll, move and answer for every game that is not over yet.
+
+    Inputs:
+    layout - board spaces
+    num_players - number of players
+    model - answer model
+    games - number of games to play
+    seed - random seed
+    max_turns - give up after this many dice rolls
+
+    Outputs:
+    Simulator.Results object
+    """
+
+    tables = Tables(layout)
+    rng = numpy.random.RandomState(seed)
+
+    # Flatten the tables so they can be read with a single index
+    sides = Engine.Dice.sides
+    wedge_masks = ALL_WEDGES + 1
+    width = tables.width
+    moves = tables.moves.ravel()
+    counts = tables.counts.ravel()
+    chances = tables.get_chances(get_probabilities(model, num_players)).ravel()
+    correct_state = tables.correct
+    wins_state = tables.wins
+    next_player = numpy.arange(1, num_players + 1) % num_players
+
+    # Game state for the games still being played.  Everybody starts on
+    # the hub with no wedges.  The piece states are flat
+    # [game * num_players + player].
+    states = numpy.zeros(games * num_players, numpy.intp)
+    states += tables.hub * wedge_masks
+    player = rng.randint(0, num_players, games).astype(numpy.intp)
+    rows = numpy.arange(games, dtype=numpy.intp) * num_players
+
+    # Statistics
+    results = Simulator.Results(num_players)
+    results.games = games
+    wins = numpy.zeros(num_players, numpy.int64)
+    landings = numpy.zeros(tables.states, numpy.int64)
+
+    turn = 0
+    while (len(player) > 0) and (turn < max_turns):
+
+        turn += 1
+        count = len(player)
+        flat = rows[:count] + player
+        state = states[flat]
+
+        # One random number per game is split up for the dice roll, the
+        # random move and the answer.  Whatever is left over after taking
+        # the integer part is still a uniform random number.
+        random = rng.random_sample(count)
+
+        # Roll the dice
+        random *= sides
+        roll = random.astype(numpy.intp)
+        random -= roll
+        state_roll = state * sides + roll
+
+        # Pick a move
+        num_choices = counts[state_roll]
+        random *= num_choices
+        pick = random.astype(numpy.intp)
+        random -= pick
+        arrive = moves[state_roll * width + pick]
+
+        # Answer the question
+        correct = random < chances[player * tables.states + arrive]
+
+        # Nothing happens to pieces that could not move
+        if tables.stuck:
+            moved = num_choices > 0
+            correct &= moved
+            landings += numpy.bincount(arrive[moved], minlength=tables.states)
+        else:
+            landings += numpy.bincount(arrive, minlength=tables.states)
+
+        # Add the headquarter wedges
+        states[flat] = numpy.where(correct, correct_state[arrive], arrive)
+
+        # Check for winners and move to the next player after a wrong answer
+        won = correct & wins_state[arrive]
+        following = numpy.where(correct, player, next_player[player])
+
+        # Record and drop the finished games
+        if won.any():
+            winners = player[won]
+            wins += numpy.bincount(winners, minlength=num_players)
+            results.turns[turn] = len(winners)
+
+            keep = ~won
+            following = following[keep]
+            states = states.reshape(count, num_players)[keep].ravel()
+
+        player = following
+
+    # Collect the statistics
+    results.unfinished = len(player)
+    results.wins = [int(number) for number in wins]
+    landings = landings.reshape(-1, wedge_masks).sum(axis=1)
+    for (number, location) in enumerate(tables.locations):
+        if landings[number] > 0:
+            results.landings[location] = int(landings[number])
+
+    return results
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+
+    print "This Python module cannot be executed standalone!"
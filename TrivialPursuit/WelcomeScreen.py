@@ -17,6 +17,7 @@ None at this time
 ################################################################################
 
 import pygame
+import Assets
 
 
 ################################################################################
@@ -74,7 +75,7 @@ class WelcomeScreen:
         self.num_players = 0
 
         # Set the font we will use for printing text (font, size, bold, italic)
-        font = pygame.font.SysFont('Arial', 80, False, False)
+        font = ("Arial", 80, False, False)
 
         # Get the screen size
         (width, height) = self.screen.get_size()
@@ -91,7 +92,7 @@ class WelcomeScreen:
         for line in self.title:
 
             # Generate the text to display on the screen
-            text = font.render(line, True, self.title_color)
+            text = Assets.render_text(line, self.title_color, font)
 
             # Figure out the x coordinate
             x = (width - text.get_width()) / 2
@@ -108,7 +109,8 @@ class WelcomeScreen:
         y = (height / 2) + y_offset
 
         # Generate the text to ask for the number of players
-        text = font.render("How Many Players?", True, self.players_color)
+        text = Assets.render_text("How Many Players?", self.players_color,
+                                  font)
 
         # Figure out the x coordinate
         x = (width - text.get_width()) / 2
@@ -128,7 +130,8 @@ class WelcomeScreen:
         for index in range(len(self.players)):
 
             # Generate the text to display on the screen
-            text = font.render("%d" % (index+2), True, self.players_color)
+            text = Assets.render_text("%d" % (index+2), self.players_color,
+                                      font)
 
             # Add it to the screen
             self.players[index] = self.screen.blit(text, (x, y))
@@ -136,6 +139,9 @@ class WelcomeScreen:
             # Move the x coordinate
             x += x_offset
 
+        # The whole screen has to be shown
+        self.dirty_rects = [self.screen.get_rect()]
+
     def execute(self, clicked):
         """
         Method Name:
@@ -189,6 +195,25 @@ class WelcomeScreen:
 
         return self.num_players
 
+    def get_dirty_rects(self):
+        """
+        Method Name:
+        get_dirty_rects
+
+        Description:
+        Get the parts of the screen that have changed since the last call
+
+        Inputs:
+        None
+
+        Outputs:
+        List of rectangles to update on the display
+        """
+
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
+
 ################################################################################
 # Functions
 ################################################################################
@@ -0,0 +1,36 @@
+"""
+Module:
+conftest.py
+
+Author:
+Mark Nauman
+
+Description:
+Shared setup of the behaviour tests.  The game modules sit one directory
+up and are imported by name, and pygame draws off screen so the tests run
+without a display.
+
+Run the tests from the TrivialPursuit directory with "python -m pytest
+tests".
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import os
+import sys
+
+################################################################################
+# Variables
+################################################################################
+
+# Import the game modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+# Draw off screen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
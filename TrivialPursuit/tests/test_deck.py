@@ -0,0 +1,131 @@
+"""
+Module:
+test_deck.py
+
+Author:
+Mark Nauman
+
+Description:
+Behaviour tests of how the cards of a category are dealt: the shuffled
+Cursor, the AliasTable and the WeightedCursor built on it.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import random
+import pytest
+import Engine
+
+################################################################################
+# Variables
+################################################################################
+
+# Draws made to check a distribution, and how far a share of the draws
+# may be from the share expected (a dozen standard deviations or so)
+DRAWS = 70000
+TOLERANCE = 0.02
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_shares(sample, count, draws=DRAWS):
+    """
+    Function Name:
+    get_shares
+
+    Description:
+    Draw items and count how often each one comes up
+
+    Inputs:
+    sample - function drawing an item number
+    count - number of items
+    draws - number of draws
+
+    Outputs:
+    List of the share of the draws each item got
+    """
+
+    counts = [0] * count
+    for number in range(draws):
+        counts[sample()] += 1
+
+    return [float(item_count) / draws for item_count in counts]
+
+
+def check_shares(shares, weights):
+    """
+    Function Name:
+    check_shares
+
+    Description:
+    Check the shares of the draws follow the weights
+
+    Inputs:
+    shares - share of the draws each item got
+    weights - weight of each item
+
+    Outputs:
+    None
+    """
+
+    total = float(sum(weights))
+    for (share, weight) in zip(shares, weights):
+        assert abs(share - weight / total) < TOLERANCE, (shares, weights)
+
+
+def test_weighted_cursor_follows_weights():
+    weights = [1, 1, 1, 1, 10]
+    cursor = Engine.WeightedCursor(weights, random.Random(1))
+
+    check_shares(get_shares(cursor.next, len(weights)), weights)
+
+
+def test_cursor_deals_every_card_once_a_pass():
+    for count in (1, 2, 5, 40):
+        cursor = Engine.Cursor(count, random.Random(count))
+        for number in range(5):
+            assert sorted([cursor.next() for card in range(count)]) == \
+                range(count)
+
+
+def test_cursor_keeps_the_last_cards_out_of_the_next_pass():
+    count = 40
+    cursor = Engine.Cursor(count, random.Random(2))
+    held = min(Engine.Cursor.spacing, count / 2)
+
+    # A card drawn again is always more than the held cards apart
+    drawn = {}
+    for number in range(count * 50):
+        card = cursor.next()
+        if card in drawn:
+            assert number - drawn[card] > held, (card, drawn[card], number)
+        drawn[card] = number
+
+
+def test_cursor_is_uniform():
+    count = 7
+    cursor = Engine.Cursor(count, random.Random(3))
+
+    check_shares(get_shares(cursor.next, count), [1] * count)
+
+
+def test_alias_table_follows_weights():
+    weights = [0, 1, 2, 3, 10]
+    table = Engine.AliasTable(weights, random.Random(4))
+    shares = get_shares(table.sample, len(weights))
+
+    check_shares(shares, weights)
+    assert shares[0] == 0
+
+
+def test_alias_table_rejects_bad_weights():
+    for weights in ([0, 0], [1, -1, 2]):
+        with pytest.raises(ValueError):
+            Engine.AliasTable(weights, random.Random(5))
@@ -0,0 +1,126 @@
+"""
+Module:
+test_engine.py
+
+Author:
+Mark Nauman
+
+Description:
+Behaviour tests of the headless game engine
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import random
+import BenchmarkEngine
+import Engine
+import GameState
+
+################################################################################
+# Functions
+################################################################################
+
+
+def new_game(num_players, seed):
+    """
+    Function Name:
+    new_game
+
+    Description:
+    Setup a game on the stock board, with the choices of its players
+
+    Inputs:
+    num_players - number of players
+    seed - random seed
+
+    Outputs:
+    (Engine.Game object, move function, category function, answer
+    function)
+    """
+
+    rng = random.Random(seed)
+    board = Engine.Board()
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(num_players)]
+    game = Engine.Game(board, players, rng=rng)
+
+    return (game,
+            lambda game: rng.choice(game.get_choices()),
+            lambda game: rng.choice(Engine.CATEGORIES),
+            lambda game: rng.random() < 0.5)
+
+
+def play_steps(game, choose_move, choose_category, answer):
+    """
+    Function Name:
+    play_steps
+
+    Description:
+    Play a game to the end a step at a time
+
+    Inputs:
+    game - Engine.Game object
+    choose_move - function(game) returning the tile to move to
+    choose_category - function(game) returning the hub category
+    answer - function(game) returning if the answer is correct
+
+    Outputs:
+    None
+    """
+
+    while game.get_state() != Engine.OVER:
+        state = game.get_state()
+        if state == Engine.ROLL:
+            game.roll()
+        elif state == Engine.MOVE:
+            game.move(choose_move(game))
+        elif state == Engine.CATEGORY:
+            game.choose_category(choose_category(game))
+        else:
+            game.answer(answer(game))
+
+
+def test_play_matches_steps():
+    for num_players in (1, 2, 4):
+        for seed in range(10):
+            (game, choose_move, choose_category, answer) = \
+                new_game(num_players, seed)
+            play_steps(game, choose_move, choose_category, answer)
+
+            (other, choose_move, choose_category, answer) = \
+                new_game(num_players, seed)
+            winner = other.play(choose_move, choose_category, answer)
+
+            assert winner is other.get_winner()
+            assert other.turns == game.turns
+            assert GameState.pack_state(other) == \
+                GameState.pack_state(game)
+
+
+def test_play_stops_after_max_turns():
+    (game, choose_move, choose_category, answer) = new_game(3, 1)
+    game.play(choose_move, choose_category, answer, max_turns=20)
+
+    assert game.turns == 20
+    assert game.get_state() == Engine.ROLL
+
+
+def test_reachability_matches_the_recursive_walk():
+    for layout in (Engine.LAYOUT, Engine.generate_layout(17)):
+        reachable = Engine.build_reachability(layout, Engine.Dice.sides)
+
+        for row in range(len(layout)):
+            for col in range(len(layout[row])):
+                if layout[row][col] is None:
+                    continue
+                for roll in range(1, Engine.Dice.sides + 1):
+                    found = set()
+                    BenchmarkEngine.recursive_reachable(
+                        layout, (row, col), 0, 0, roll, found)
+                    assert set(reachable[(row, col, roll)]) == found, \
+                        (row, col, roll)
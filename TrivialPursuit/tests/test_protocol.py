@@ -0,0 +1,102 @@
+"""
+Module:
+test_protocol.py
+
+Author:
+Mark Nauman
+
+Description:
+Behaviour tests of the messages passed between the game server and its
+clients: each message unpacks to what was packed.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import random
+import pytest
+import Engine
+import Protocol
+
+################################################################################
+# Functions
+################################################################################
+
+
+def test_frames_split_back_into_messages():
+    messages = [(Protocol.NEW_GAME, "\x04"), (Protocol.ROLL, "\0\0\0\x07"),
+                (Protocol.STATS, ""),
+                (Protocol.STATE, "x" * Protocol.MAX_PAYLOAD)]
+    data = "".join([Protocol.encode(message_type, payload)
+                    for (message_type, payload) in messages])
+
+    assert Protocol.split_frames(data) == (messages, "")
+
+    # A frame cut short waits for the rest of its bytes
+    last = Protocol.encode(*messages[-1])
+    assert Protocol.split_frames(data[:-1]) == (messages[:-1], last[:-1])
+
+
+def test_frames_reject_bad_lengths():
+    with pytest.raises(ValueError):
+        Protocol.encode(Protocol.STATE, "x" * (Protocol.MAX_PAYLOAD + 1))
+    with pytest.raises(ValueError):
+        Protocol.split_frames("\0\0\x01")
+
+
+def test_state_round_trip():
+    rng = random.Random(1)
+    board = Engine.Board()
+    players = [Engine.Player(number + 1, board.get_hub())
+               for number in range(3)]
+    game = Engine.Game(board, players, rng=rng)
+
+    # Check every step of a game
+    while game.get_state() != Engine.OVER:
+        players = [(player.get_location(), player.get_wedges())
+                   for player in game.players]
+        assert Protocol.unpack_state(Protocol.pack_state(12, game)) == \
+            (12, game.get_state(), game.player, game.dice.get_roll(),
+             game.turns, players, tuple(game.get_choices()))
+
+        state = game.get_state()
+        if state == Engine.ROLL:
+            game.roll()
+        elif state == Engine.MOVE:
+            game.move(rng.choice(game.get_choices()))
+        elif state == Engine.CATEGORY:
+            game.choose_category(rng.choice(Engine.CATEGORIES))
+        else:
+            game.answer(rng.random() < 0.5)
+
+
+def test_question_round_trip():
+    answers = ["Paris", "Lyon", u"N\xeemes".encode("utf-8"), ""]
+    for category in Engine.CATEGORIES:
+        payload = Protocol.pack_question(7, category, "Capital?", answers)
+
+        assert Protocol.unpack_question(payload) == \
+            (7, category, "Capital?", answers)
+
+
+def test_error_round_trip():
+    assert Protocol.unpack_error(Protocol.pack_error(0, "No game 3")) == \
+        (0, "No game 3")
+
+    # Long errors are cut to fit in a message
+    (game_number, text) = Protocol.unpack_error(
+        Protocol.pack_error(5, "x" * 70000))
+    assert game_number == 5
+    assert len(Protocol.encode(Protocol.ERROR, Protocol.pack_error(
+        5, text))) <= Protocol.MAX_PAYLOAD + Protocol.HEADER.size
+
+
+def test_text_running_past_the_end_is_rejected():
+    payload = Protocol.pack_text("question")
+
+    with pytest.raises(ValueError):
+        Protocol.unpack_text(payload[:-1], 0)
@@ -0,0 +1,182 @@
+"""
+Module:
+test_storage.py
+
+Author:
+Mark Nauman
+
+Description:
+Behaviour tests of storing games: a saved game loads back and carries
+on like the game that was saved, and the event log replays the states
+the game went through, also when the game carries on from a save.
+
+Improvements/Todo:
+None at this time
+"""
+
+################################################################################
+# Dependencies
+################################################################################
+
+import random
+import shutil
+import pygame
+import pytest
+import Assets
+import Engine
+import GameBoard
+import GameLog
+import SaveGame
+
+################################################################################
+# Functions
+################################################################################
+
+
+@pytest.fixture(autouse=True)
+def display():
+    """
+    Function Name:
+    display
+
+    Description:
+    Setup the display for the game boards to draw on, and close it after
+    the test
+
+    Inputs:
+    None
+
+    Outputs:
+    None
+    """
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    Assets.clear()
+    pygame.display.quit()
+
+
+def new_board(**options):
+    """
+    Function Name:
+    new_board
+
+    Description:
+    Setup a game board with three players and a fixed seed
+
+    Inputs:
+    options - more GameBoard options (log, save)
+
+    Outputs:
+    GameBoard object
+    """
+
+    return GameBoard.GameBoard(pygame.Surface((315, 315)), 3,
+                               names=["Ann", "Bo", "Cy"], seed=3, **options)
+
+
+def play_turns(game_board, rng, turns, states=None):
+    """
+    Function Name:
+    play_turns
+
+    Description:
+    Play the game until the dice have been rolled a number of times (or
+    somebody wins), picking the tiles and the dialog buttons at random
+
+    Inputs:
+    game_board - GameBoard object
+    rng - random.Random object picking the tiles and buttons
+    turns - number of dice rolls to play to
+    states - optional dictionary the state at the end of each turn is
+             stored in {turn: GameState.GameState object}
+
+    Outputs:
+    None
+    """
+
+    while game_board.get_winner() is None:
+        dialog = game_board.dialogs.get_dialog()
+        if dialog is not None:
+            game_board.dialogs.choose(rng.choice(dialog.buttons))
+            game_board.execute(False)
+        elif game_board.game.get_state() == Engine.ROLL:
+            if states is not None:
+                states[game_board.game.turns] = game_board.get_state()
+            if game_board.game.turns >= turns:
+                break
+            game_board.execute(True, game_board.dice.rect.center)
+        else:
+            (row, col) = rng.choice(game_board.game.get_choices())
+            game_board.execute(True, game_board.board[row][col].rect.center)
+
+
+def test_loaded_save_carries_on_like_the_game(tmpdir):
+    file_name = str(tmpdir.join("game" + SaveGame.EXTENSION))
+    saved_name = str(tmpdir.join("saved" + SaveGame.EXTENSION))
+
+    # Play, keep the save and play on
+    game_board = new_board(save=file_name)
+    play_turns(game_board, random.Random(1), 40)
+    assert game_board.get_winner() is None
+    shutil.copy(file_name, saved_name)
+    state = game_board.get_state()
+    play_turns(game_board, random.Random(2), 80)
+
+    # Load the save into a new game board and play on the same way
+    save_file = SaveGame.SaveFile(saved_name)
+    loaded_board = GameBoard.GameBoard(pygame.Surface((315, 315)),
+                                       save_file.get_num_players(),
+                                       names=["X", "Y", "Z"])
+    save_file.restore(loaded_board)
+    assert loaded_board.game.turns == 40
+    assert loaded_board.get_state() == state
+    assert [player.get_name() for player in loaded_board.players] == \
+        ["Ann", "Bo", "Cy"]
+
+    play_turns(loaded_board, random.Random(2), 80)
+    assert loaded_board.game.turns == game_board.game.turns
+    assert loaded_board.get_state() == game_board.get_state()
+
+
+def test_replay_matches_the_game(tmpdir):
+    file_name = str(tmpdir.join("game" + GameLog.EXTENSION))
+    states = {}
+    game_board = new_board(log=file_name)
+    play_turns(game_board, random.Random(1), 100, states)
+    game_board.log.close()
+
+    replay = GameLog.Replay(file_name)
+    assert replay.get_turns() == game_board.game.turns
+    for (turn, state) in states.items():
+        assert replay.get_state(turn) == state, turn
+    for turn in range(1, replay.get_turns() + 1):
+        assert replay.get_events(turn)[0][0] == GameLog.ROLL, turn
+
+
+def test_replay_matches_the_game_carried_on_from_an_older_save(tmpdir):
+    file_name = str(tmpdir.join("game" + GameLog.EXTENSION))
+    save_name = str(tmpdir.join("game" + SaveGame.EXTENSION))
+    older_name = str(tmpdir.join("older" + SaveGame.EXTENSION))
+
+    # Play, keep an older save, play on and go back to the older save
+    states = {}
+    game_board = new_board(log=file_name, save=save_name)
+    play_turns(game_board, random.Random(1), 20, states)
+    shutil.copy(save_name, older_name)
+    play_turns(game_board, random.Random(1), 50)
+    game_board.log.close()
+    shutil.copy(older_name, save_name)
+
+    # The game carries on from the older save, adding to the log
+    game_board = new_board(log=file_name, save=save_name)
+    assert game_board.game.turns == 20
+    play_turns(game_board, random.Random(2), 80, states)
+    game_board.log.close()
+
+    replay = GameLog.Replay(file_name)
+    assert replay.get_turns() == game_board.game.turns
+    for (turn, state) in states.items():
+        assert replay.get_state(turn) == state, turn